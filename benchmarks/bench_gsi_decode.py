@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+GSI decode micro-benchmark: raw POST body -> GameSnapshot.
+
+Compares the original path (json.loads + GameSnapshot.from_payload) with every
+fast decoder available in this environment (orjson, msgspec typed structs) on
+either a recorded capture or synthetic match payloads (see gsi_payloads.py).
+
+Usage:
+    python benchmarks/bench_gsi_decode.py
+    python benchmarks/bench_gsi_decode.py --capture gsi_capture.jsonl.gz
+    python benchmarks/bench_gsi_decode.py --repeat 20 --output bench_decode.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+from gsi_payloads import generate_match
+
+from tickzero.core.gsi_decode import DECODER_BACKEND, DECODERS
+from tickzero.core.gsi_replay import iter_capture
+
+
+def load_bodies(capture, matches, rounds, seed):
+    """Raw bodies from a capture file, or serialized synthetic payloads."""
+    if capture:
+        return [body.encode('utf-8') for _, body in iter_capture(capture)]
+    bodies = []
+    for n in range(matches):
+        bodies.extend(json.dumps(payload).encode('utf-8')
+                      for _, payload in generate_match(rounds=rounds, seed=seed + n))
+    return bodies
+
+
+def time_decoder(decoder, bodies, repeat):
+    """Best-of-N wall time for decoding every body once."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            decoder(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Verify the decoders agree, time them and write the report."""
+    parser = argparse.ArgumentParser(description="Benchmark GSI payload decoding")
+    parser.add_argument('--capture', help="Capture file to decode (default: synthetic matches)")
+    parser.add_argument('--matches', type=int, default=5, help="Synthetic matches when no capture is given")
+    parser.add_argument('--rounds', type=int, default=24)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=10, help="Timing runs per decoder (best is kept)")
+    parser.add_argument('--output', default='bench_decode.json', help="JSON report path")
+    args = parser.parse_args()
+
+    bodies = load_bodies(args.capture, args.matches, args.rounds, args.seed)
+    if not bodies:
+        print("No payloads to decode")
+        return 1
+
+    # All backends must agree before their speed means anything
+    reference = DECODERS['json']
+    for name, decoder in DECODERS.items():
+        mismatches = sum(1 for body in bodies if decoder(body) != reference(body))
+        if mismatches:
+            print(f"✗ {name} disagrees with the json path on {mismatches} payloads")
+            return 1
+
+    results = []
+    for name, decoder in DECODERS.items():
+        elapsed = time_decoder(decoder, bodies, args.repeat)
+        results.append({
+            "name": name,
+            "elapsed_s": elapsed,
+            "payloads_per_s": len(bodies) / elapsed if elapsed else 0.0,
+            "us_per_payload": elapsed / len(bodies) * 1e6
+        })
+    baseline = results[0]['elapsed_s']
+    for result in results:
+        result["speedup"] = baseline / result['elapsed_s'] if result['elapsed_s'] else 0.0
+
+    report = {
+        "benchmark": "gsi_decode",
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "default_backend": DECODER_BACKEND,
+        "workload": {"capture": args.capture, "payloads": len(bodies),
+                     "mean_body_bytes": sum(len(b) for b in bodies) / len(bodies)},
+        "results": results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 72)
+    print(f"GSI DECODE BENCHMARK  ({len(bodies)} payloads, default backend: {DECODER_BACKEND})")
+    print("=" * 72)
+    for result in results:
+        print(f"{result['name']:<10} {result['payloads_per_s']:>10.0f} payloads/s | "
+              f"{result['us_per_payload']:.2f}us/payload | {result['speedup']:.2f}x")
+    print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
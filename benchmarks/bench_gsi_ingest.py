@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+GSI ingest benchmark: throughput, tail latency and memory growth.
+
+Drives GSIServer with synthetic match payloads (see gsi_payloads.py) through
+    - the in-process path (process_game_state called directly)
+    - the HTTP path (real POSTs against the threaded or async server)
+and writes a machine-readable JSON report for regression tracking.
+
+Usage:
+    python benchmarks/bench_gsi_ingest.py
+    python benchmarks/bench_gsi_ingest.py --matches 20 --driver http --ingest-mode async
+    python benchmarks/bench_gsi_ingest.py --output bench_results.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import platform
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from gsi_payloads import generate_match
+
+from tickzero.core.gsi_server import GSIServer
+from tickzero.core.gsi_replay import ReplayOBS
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(latencies_ns):
+    """p50/p95/p99/max in milliseconds."""
+    values = sorted(latencies_ns)
+    to_ms = 1e-6
+    return {
+        "p50_ms": percentile(values, 50) * to_ms,
+        "p95_ms": percentile(values, 95) * to_ms,
+        "p99_ms": percentile(values, 99) * to_ms,
+        "max_ms": (values[-1] if values else 0) * to_ms,
+        "mean_ms": (sum(values) / len(values) if values else 0) * to_ms
+    }
+
+
+def build_workload(matches, rounds, seed):
+    """Concatenate several synthetic matches into one payload stream."""
+    workload = []
+    for n in range(matches):
+        workload.extend(payload for _, payload in generate_match(rounds=rounds, seed=seed + n))
+    return workload
+
+
+def make_server(log_file, port=0, ingest_mode="threaded"):
+    """GSIServer wired to a fake OBS (no network round trips)."""
+    obs = ReplayOBS()
+    obs.now = time.time()
+    return GSIServer(
+        obs_manager=obs,
+        port=port,
+        log_file=log_file,
+        on_match_start=obs.start_recording,
+        on_match_end=obs.stop_recording,
+        ingest_mode=ingest_mode,
+        callback_mode="inline"
+    )
+
+
+def free_port():
+    """Ask the OS for an unused TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_in_process(workload, log_file):
+    """Call process_game_state directly and time each call."""
+    gsi = make_server(log_file)
+    latencies = []
+    start = time.perf_counter()
+    for payload in workload:
+        gsi.obs_manager.now = time.time()
+        t0 = time.perf_counter_ns()
+        gsi.process_game_state(payload)
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    gsi.save_logs()
+    return latencies, elapsed, {"events": gsi.events_logged, "ingest": gsi.get_ingest_stats()}
+
+
+def run_http(workload, log_file, ingest_mode, keep_alive=True):
+    """POST every payload to a running GSIServer and time each request."""
+    port = free_port()
+    gsi = make_server(log_file, port=port, ingest_mode=ingest_mode)
+    gsi.start()
+    bodies = [json.dumps(payload).encode('utf-8') for payload in workload]
+    headers = {'Content-Type': 'application/json'}
+    if not keep_alive:
+        headers['Connection'] = 'close'
+
+    latencies = []
+    errors = 0
+    conn = None
+    start = time.perf_counter()
+    try:
+        for body in bodies:
+            t0 = time.perf_counter_ns()
+            # Reconnect whenever the server closed the connection
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            conn.request('POST', '/', body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter_ns() - t0)
+            if response.status != 200:
+                errors += 1
+            if response.will_close:
+                conn.close()
+                conn = None
+        elapsed = time.perf_counter() - start
+    finally:
+        if conn:
+            conn.close()
+        gsi.stop()
+
+    extra = {"events": gsi.events_logged, "http_errors": errors, "ingest": gsi.get_ingest_stats()}
+    return latencies, elapsed, extra
+
+
+def run_benchmark(driver, workload, ingest_mode="threaded", keep_alive=True):
+    """
+    Run one driver under tracemalloc.
+
+    Returns:
+        dict: Report entry for this driver
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "bench_log.jsonl")
+        tracemalloc.start()
+        mem_start, _ = tracemalloc.get_traced_memory()
+        if driver == "in_process":
+            latencies, elapsed, extra = run_in_process(workload, log_file)
+        else:
+            latencies, elapsed, extra = run_http(workload, log_file, ingest_mode, keep_alive)
+        mem_end, mem_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    name = driver if driver == "in_process" else f"http_{ingest_mode}" + ("" if keep_alive else "_close")
+    return {
+        "name": name,
+        "payloads": len(latencies),
+        "elapsed_s": elapsed,
+        "payloads_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+        "memory": {
+            "growth_kb": (mem_end - mem_start) / 1024,
+            "peak_kb": (mem_peak - mem_start) / 1024,
+            "growth_bytes_per_payload": (mem_end - mem_start) / len(latencies) if latencies else 0.0
+        },
+        **extra
+    }
+
+
+def main():
+    """Parse arguments, run the selected drivers and write the report."""
+    parser = argparse.ArgumentParser(description="Benchmark GSI ingest throughput and latency")
+    parser.add_argument('--driver', choices=['in_process', 'http', 'all'], default='all')
+    parser.add_argument('--ingest-mode', choices=['threaded', 'async'], default='threaded',
+                        help="GSIServer ingest mode for the HTTP driver")
+    parser.add_argument('--no-keep-alive', action='store_true',
+                        help="Open a new connection for every HTTP payload")
+    parser.add_argument('--matches', type=int, default=10, help="Synthetic matches in the workload")
+    parser.add_argument('--rounds', type=int, default=24, help="Rounds per synthetic match")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='bench_results.json', help="JSON report path")
+    parser.add_argument('--verbose', action='store_true', help="Keep GSIServer INFO logging enabled")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # Per-event INFO logging would dominate the measurement
+        logging.getLogger('tickzero').setLevel(logging.WARNING)
+
+    workload = build_workload(args.matches, args.rounds, args.seed)
+    drivers = ['in_process', 'http'] if args.driver == 'all' else [args.driver]
+
+    results = [run_benchmark(driver, workload, args.ingest_mode, not args.no_keep_alive) for driver in drivers]
+
+    report = {
+        "benchmark": "gsi_ingest",
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workload": {"matches": args.matches, "rounds": args.rounds, "seed": args.seed,
+                     "payloads": len(workload)},
+        "results": results
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 72)
+    print(f"GSI INGEST BENCHMARK  ({len(workload)} payloads, {args.matches} matches)")
+    print("=" * 72)
+    for result in results:
+        lat = result['latency']
+        print(f"{result['name']:<14} {result['payloads_per_s']:>10.0f} payloads/s | "
+              f"p50 {lat['p50_ms']:.3f}ms  p95 {lat['p95_ms']:.3f}ms  p99 {lat['p99_ms']:.3f}ms | "
+              f"mem +{result['memory']['growth_kb']:.0f}KB")
+        ingest = result['ingest']
+        if ingest.get('connections'):
+            print(f"{'':<14} {ingest['requests']} requests over {ingest['connections']} connections "
+                  f"({ingest['requests_per_connection']:.1f} per connection)")
+        print(f"{'':<14} {ingest['snapshots_skipped']} unchanged payloads skipped "
+              f"({ingest['skip_ratio']:.0%})")
+    print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
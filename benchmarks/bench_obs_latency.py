@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+OBS round-trip latency benchmark: how OBS latency shows up in GSI ingest.
+
+Replays synthetic match payloads (see gsi_payloads.py) into GSIServer while
+it talks to a local FakeOBSServer with injected latency, once asking OBS for
+every video timestamp and once with a RecordingClock model, and writes a
+machine-readable JSON report.
+
+Usage:
+    python benchmarks/bench_obs_latency.py
+    python benchmarks/bench_obs_latency.py --latencies 0 10 50 --jitter 5
+    python benchmarks/bench_obs_latency.py --output obs_latency.json
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bench_gsi_ingest import build_workload, latency_summary
+
+from tickzero.core.fake_obs import FakeOBSServer
+from tickzero.core.gsi_server import GSIServer
+from tickzero.core.obs_async import AsyncOBSClient
+from tickzero.core.recording_clock import RecordingClock
+
+
+def run_case(workload, latency_ms, jitter_ms, use_clock, seed):
+    """
+    Replay the workload against a fake OBS with the given latency.
+
+    Returns:
+        dict: Report entry for this case
+    """
+    server = FakeOBSServer(latency=latency_ms / 1000.0, jitter=jitter_ms / 1000.0, seed=seed)
+    server.start()
+    obs = AsyncOBSClient(port=server.port, connect_retries=0)
+    obs.connect()
+    clock = None
+    if use_clock:
+        clock = RecordingClock(lambda: obs.get_current_timestamp(unavailable=None), interval=0.1)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            gsi = GSIServer(
+                obs_manager=obs,
+                log_file=str(Path(tmp) / "bench_log.jsonl"),
+                on_match_start=obs.start_recording,
+                on_match_end=obs.stop_recording,
+                recording_clock=clock
+            )
+            # Record up front so the clock has samples before the first payload
+            obs.start_recording()
+            if clock:
+                clock.start()
+                deadline = time.time() + 5.0
+                while not clock.is_synced() and time.time() < deadline:
+                    time.sleep(0.05)
+
+            latencies = []
+            start = time.perf_counter()
+            for payload in workload:
+                t0 = time.perf_counter_ns()
+                gsi.process_game_state(payload)
+                latencies.append(time.perf_counter_ns() - t0)
+            elapsed = time.perf_counter() - start
+            gsi.stop()
+    finally:
+        if clock:
+            clock.stop()
+        obs.disconnect()
+        server.stop()
+
+    stats = server.get_stats()
+    return {
+        "name": f"{latency_ms:g}ms_{'clock' if use_clock else 'direct'}",
+        "obs_latency_ms": latency_ms,
+        "obs_jitter_ms": jitter_ms,
+        "recording_clock": use_clock,
+        "payloads": len(latencies),
+        "elapsed_s": elapsed,
+        "payloads_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+        "obs_requests": sum(stats["request_counts"].values()),
+        "events": gsi.events_logged
+    }
+
+
+def main():
+    """Parse arguments, run every latency/clock combination and write the report."""
+    parser = argparse.ArgumentParser(description="Benchmark GSI ingest against a fake OBS with injected latency")
+    parser.add_argument('--latencies', type=float, nargs='+', default=[0, 5, 20, 50],
+                        help="Injected OBS latencies in milliseconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Injected jitter in milliseconds")
+    parser.add_argument('--matches', type=int, default=1, help="Synthetic matches in the workload")
+    parser.add_argument('--rounds', type=int, default=8, help="Rounds per synthetic match")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='bench_obs_latency.json', help="JSON report path")
+    parser.add_argument('--verbose', action='store_true', help="Keep INFO logging enabled")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # Per-event INFO logging would dominate the measurement
+        logging.getLogger('tickzero').setLevel(logging.WARNING)
+        logging.getLogger('websockets').setLevel(logging.WARNING)
+
+    workload = build_workload(args.matches, args.rounds, args.seed)
+    results = [run_case(workload, latency, args.jitter, use_clock, args.seed)
+               for latency in args.latencies for use_clock in (False, True)]
+
+    report = {
+        "benchmark": "obs_latency",
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workload": {"matches": args.matches, "rounds": args.rounds, "seed": args.seed,
+                     "payloads": len(workload)},
+        "results": results
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 72)
+    print(f"OBS LATENCY BENCHMARK  ({len(workload)} payloads, jitter {args.jitter:g}ms)")
+    print("=" * 72)
+    for result in results:
+        lat = result['latency']
+        print(f"{result['name']:<14} {result['payloads_per_s']:>8.0f} payloads/s | "
+              f"p50 {lat['p50_ms']:.3f}ms  p99 {lat['p99_ms']:.3f}ms  max {lat['max_ms']:.3f}ms | "
+              f"{result['obs_requests']} OBS requests")
+    print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
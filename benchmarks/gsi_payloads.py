@@ -0,0 +1,206 @@
+"""
+Synthetic CS2 GSI payload generator for benchmarks.
+
+Produces a deterministic (seeded) match timeline of realistic payloads:
+warmup, freezetime/live/over round phases, kills with headshots and weapon
+switches, damage updates, spectating a teammate after death, halftime,
+gameover and the 30 s heartbeats CS2 re-sends when nothing changes.
+"""
+import random
+
+STEAMID = "76561198000000000"
+TEAMMATE_STEAMID = "76561198000000001"
+WEAPONS = [
+    ("weapon_ak47", "Rifle"),
+    ("weapon_m4a1_silencer", "Rifle"),
+    ("weapon_awp", "SniperRifle"),
+    ("weapon_deagle", "Pistol"),
+    ("weapon_glock", "Pistol"),
+    ("weapon_knife", "Knife"),
+    ("weapon_taser", "Taser"),
+]
+HEARTBEAT = 30.0
+
+
+class _MatchState:
+    """Mutable game state that payload snapshots are taken from."""
+
+    def __init__(self, map_name):
+        self.map_phase = "warmup"
+        self.map_name = map_name
+        self.round = 0
+        self.round_phase = "freezetime"
+        self.score_ct = 0
+        self.score_t = 0
+        self.health = 100
+        self.armor = 100
+        self.kills = 0
+        self.headshot_kills = 0
+        self.deaths = 0
+        self.assists = 0
+        self.round_kills = 0
+        self.round_killhs = 0
+        self.money = 800
+        self.weapon = WEAPONS[0]
+
+    def payload(self, t):
+        """Build a full GSI payload for the current state."""
+        weapons = {
+            "weapon_0": {"name": "weapon_knife", "paintkit": "default", "type": "Knife",
+                         "state": "active" if self.weapon[0] == "weapon_knife" else "holstered"},
+            "weapon_1": {"name": "weapon_glock", "paintkit": "default", "type": "Pistol",
+                         "ammo_clip": 20, "ammo_clip_max": 20, "ammo_reserve": 120,
+                         "state": "active" if self.weapon[0] == "weapon_glock" else "holstered"},
+        }
+        if self.weapon[0] not in ("weapon_knife", "weapon_glock"):
+            weapons["weapon_2"] = {"name": self.weapon[0], "paintkit": "default", "type": self.weapon[1],
+                                   "ammo_clip": 30, "ammo_clip_max": 30, "ammo_reserve": 90,
+                                   "state": "active"}
+
+        return {
+            "provider": {
+                "name": "Counter-Strike: Global Offensive",
+                "appid": 730,
+                "version": 14000,
+                "steamid": STEAMID,
+                "timestamp": int(t)
+            },
+            "map": {
+                "mode": "competitive",
+                "name": self.map_name,
+                "phase": self.map_phase,
+                "round": self.round,
+                "team_ct": {"score": self.score_ct, "consecutive_round_losses": 0,
+                            "timeouts_remaining": 1, "matches_won_this_series": 0},
+                "team_t": {"score": self.score_t, "consecutive_round_losses": 0,
+                           "timeouts_remaining": 1, "matches_won_this_series": 0},
+                "num_matches_to_win_series": 0
+            },
+            "round": {"phase": self.round_phase, "round": self.round},
+            "player": {
+                "steamid": STEAMID,
+                "name": "BenchPlayer",
+                "observer_slot": 1,
+                "team": "CT",
+                "activity": "playing",
+                "state": {
+                    "health": self.health, "armor": self.armor, "helmet": True,
+                    "flashed": 0, "smoked": 0, "burning": 0, "money": self.money,
+                    "round_kills": self.round_kills, "round_killhs": self.round_killhs,
+                    "equip_value": 4700
+                },
+                "weapons": weapons,
+                "match_stats": {
+                    "kills": self.kills, "assists": self.assists, "deaths": self.deaths,
+                    "mvps": 0, "score": self.kills * 2 + self.assists,
+                    "headshot_kills": self.headshot_kills
+                }
+            },
+            "phase_countdowns": {"phase": self.round_phase, "phase_ends_in": "10.0"}
+        }
+
+
+def generate_match(rounds=24, seed=1, map_name="de_dust2", warmup=60.0):
+    """
+    Generate a synthetic match as a list of (timestamp, payload) tuples.
+
+    Args:
+        rounds: Number of rounds (halftime after rounds // 2)
+        seed: Random seed; the same seed always produces the same match
+        map_name: Map name reported in the payloads
+        warmup: Seconds of warmup before the match goes live
+
+    Returns:
+        list: (seconds since start, payload dict) in chronological order
+    """
+    rng = random.Random(seed)
+    state = _MatchState(map_name)
+    timeline = []
+    t = 0.0
+    last_emit = [0.0]
+
+    def emit(at, spectating=False):
+        payload = state.payload(at)
+        if spectating:
+            # After death CS2 reports the spectated teammate in "player"
+            payload["player"]["steamid"] = TEAMMATE_STEAMID
+            payload["player"]["name"] = "Teammate"
+            payload["player"]["match_stats"]["kills"] = rng.randint(0, state.round * 2)
+        timeline.append((at, payload))
+        last_emit[0] = at
+
+    def advance(to):
+        """Move the clock forward, inserting heartbeats while nothing changes."""
+        while to - last_emit[0] >= HEARTBEAT:
+            emit(last_emit[0] + HEARTBEAT)
+        return to
+
+    # Warmup
+    emit(t)
+    t = advance(t + warmup)
+
+    state.map_phase = "live"
+    for round_num in range(1, rounds + 1):
+        if round_num == rounds // 2 + 1:
+            # Halftime
+            state.map_phase = "intermission"
+            emit(t)
+            t = advance(t + 15.0)
+            state.map_phase = "live"
+
+        state.round = round_num
+        state.round_phase = "freezetime"
+        state.health, state.round_kills, state.round_killhs = 100, 0, 0
+        state.money = min(16000, state.money + rng.choice([1400, 1900, 3250]))
+        emit(t)
+        t = advance(t + 15.0)
+
+        state.round_phase = "live"
+        emit(t)
+
+        # Weapon switches, damage and kills during the round
+        round_end = t + rng.uniform(40.0, 110.0)
+        alive = True
+        kill_budget = rng.choices([0, 1, 2, 3, 4, 5], weights=[30, 30, 20, 12, 6, 2])[0]
+        while alive:
+            t = advance(t + rng.expovariate(1 / 8.0))
+            if t >= round_end:
+                break
+            action = rng.random()
+            if action < 0.35 and kill_budget > 0:
+                kill_budget -= 1
+                state.weapon = rng.choice(WEAPONS)
+                state.kills += 1
+                state.round_kills += 1
+                if rng.random() < 0.45:
+                    state.headshot_kills += 1
+                    state.round_killhs += 1
+            elif action < 0.6:
+                state.weapon = rng.choice(WEAPONS)
+            else:
+                state.health = max(0, state.health - rng.randint(8, 60))
+                if state.health == 0:
+                    state.deaths += 1
+                    alive = False
+            emit(t)
+
+        if not alive:
+            for _ in range(rng.randint(1, 3)):
+                t = advance(t + rng.uniform(2.0, 10.0))
+                if t >= round_end:
+                    break
+                emit(t, spectating=True)
+
+        t = advance(max(t, round_end))
+        state.round_phase = "over"
+        if rng.random() < 0.5:
+            state.score_ct += 1
+        else:
+            state.score_t += 1
+        emit(t)
+        t = advance(t + 7.0)
+
+    state.map_phase = "gameover"
+    emit(t)
+    advance(t + HEARTBEAT)
+    return timeline
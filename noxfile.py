@@ -13,3 +13,9 @@ def lint(session):
     session.install("ruff", "mypy")
     session.run("ruff", "check", ".")
     session.run("mypy", "src")
+
+@nox.session
+def bench(session):
+    """Run the GSI ingest benchmark and write bench_results.json."""
+    session.install(".")
+    session.run("python", "benchmarks/bench_gsi_ingest.py", *session.posargs)
@@ -10,6 +10,10 @@ import os
 import re
 from typing import List, Dict, Any, Optional
 
+from tickzero.core.highlight_scorer import prune_rounds
+from tickzero.core.match_log import iter_match_log
+from tickzero.core.response_cache import ResponseCache, make_key
+
 try:
     from google import genai
     from google.genai import types
@@ -21,6 +25,9 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Version of the ReAct prompt; bump it when the prompt changes so cached responses are not reused
+PROMPT_VERSION = 1
+
 
 class AIDirector:
     """
@@ -30,13 +37,17 @@ class AIDirector:
     Thought -> Reasoning -> Action -> Observation -> Final Output
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash-exp"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash-exp",
+                 cache: Optional[ResponseCache] = None, min_round_score: int = 0):
         """
         Initialize AI Director.
         
         Args:
             api_key: Google API Key. If None, reads from GOOGLE_API_KEY env var.
             model: Gemini model name.
+            cache: Response cache; a log analyzed before is answered from it.
+            min_round_score: Events of rounds the rule-based pre-scorer rates
+                below this are left out of the prompt (0 = keep all).
         """
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
@@ -50,31 +61,53 @@ class AIDirector:
                 logger.error(f"Failed to initialize Gemini client: {e}")
                 
         self.model_name = model
+        self.cache = cache
+        self.min_round_score = min_round_score
         
     def analyze_match_log(self, log_path: str) -> List[Dict[str, Any]]:
         """
         Analyze a match log file to identify highlights.
         
         Args:
-            log_path: Path to the match_log.json file.
+            log_path: Path to the match log (JSONL).
             
         Returns:
             List of highlight dictionaries containing start_time, end_time, label, score.
         """
-        if not self.client:
-            logger.error("AI Director cannot analyze: No API client initialized.")
-            return []
-            
         try:
-            with open(log_path, 'r') as f:
-                match_data = json.load(f)
-                
             # Optimize: If log is too large, maybe split by rounds?
             # For now, sending the whole log (or relevant events)
-            events = match_data.get('events', [])
+            events = list(iter_match_log(log_path))
             if not events:
                 logger.warning("No events found in log.")
                 return []
+            
+            # Leave rounds the local scorer rates too low out of the prompt
+            if self.min_round_score:
+                rounds: Dict[Any, List[Dict[str, Any]]] = {}
+                for e in events:
+                    rounds.setdefault(e.get('round', 0), []).append(e)
+                kept, pruned = prune_rounds(rounds, self.min_round_score)
+                if pruned:
+                    logger.info(f"Pre-scorer left {len(pruned)} rounds out of the prompt.")
+                events = [e for e in events if e.get('round', 0) in kept]
+                if not events:
+                    logger.info("No round worth analyzing.")
+                    return []
+            
+            # A log with the same relevant events was analyzed before
+            cache_key = None
+            if self.cache is not None:
+                cache_key = make_key(self.model_name, PROMPT_VERSION, self._normalize_events(events))
+                cached_text = self.cache.get(cache_key)
+                if cached_text is not None:
+                    highlights = self._parse_response(cached_text)
+                    logger.info(f"✓ AI Director reused {len(highlights)} cached highlights.")
+                    return highlights
+            
+            if not self.client:
+                logger.error("AI Director cannot analyze: No API client initialized.")
+                return []
                 
             # Construct the ReAct prompt
             prompt = self._construct_prompt(events)
@@ -93,6 +126,8 @@ class AIDirector:
             # Parse response
             highlights = self._parse_response(response.text)
             logger.info(f"✓ AI Director identified {len(highlights)} highlights.")
+            if cache_key is not None and highlights:
+                self.cache.put(cache_key, response.text, model=self.model_name)
             
             return highlights
             
@@ -100,6 +135,22 @@ class AIDirector:
             logger.error(f"Error during match analysis: {e}")
             return []
 
+    def _normalize_events(self, events: List[Dict[str, Any]]) -> List[List[Any]]:
+        """
+        Reduces events to the fields the prompt uses, so the cache key ignores the rest.
+        """
+        normalized = []
+        for e in events:
+            if e.get('type') == 'kill':
+                normalized.append(['kill', round(e.get('video_time', 0), 2), e.get('attacker_name'),
+                                   e.get('victim_name'), e.get('weapon'), bool(e.get('is_headshot'))])
+            elif e.get('type') == 'round_start':
+                normalized.append(['round_start', round(e.get('video_time', 0), 2), e.get('round_number')])
+            elif e.get('type') == 'round_end':
+                normalized.append(['round_end', round(e.get('video_time', 0), 2), e.get('round_number'),
+                                   e.get('winner')])
+        return normalized
+
     def _construct_prompt(self, events: List[Dict[str, Any]]) -> str:
         """
         Constructs the strict ReAct system prompt and inputs.
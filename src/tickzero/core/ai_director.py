@@ -1,21 +1,38 @@
 """
 AIDirector: Uses LLM to analyze game events and identify highlight-worthy segments.
-Processes match logs and returns timestamp ranges for video cuts.
+Processes match logs and returns timestamp ranges for video cuts. Rounds are
+analyzed concurrently within the model's request and token quotas, and
+responses are reused from an on-disk cache when the same round is analyzed again.
 """
 import json
 import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 from google.genai import types
 import os
 
+from .highlight_scorer import prune_rounds
+from .match_log import iter_match_log
+from .rate_limiter import RateLimiter, estimate_tokens, is_rate_limited, is_retryable, retry_delay
+from .response_cache import make_key
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tokens reserved for a round's JSON response when estimating a request
+RESPONSE_TOKENS = 512
+
+# Version of the round prompt; bump it when the prompt changes so cached responses are not reused
+PROMPT_VERSION = 1
+
 
 class AIDirector:
     """Analyzes game events using LLM to identify highlight moments."""
     
-    def __init__(self, api_key=None, model="gemini-2.5-flash"):
+    def __init__(self, api_key=None, model="gemini-2.5-flash", max_workers=4, rpm=None, tpm=None,
+                 max_retries=6, retry_initial=2.0, retry_max=60.0, cache=None, min_round_score=0):
         """
         Initialize AI Director with Google Gemini.
         
@@ -23,6 +40,16 @@ class AIDirector:
             api_key: Google API key (or set GOOGLE_API_KEY env variable)
             model: Gemini model to use (default: gemini-2.5-flash - FREE with daily quota)
                    Options: gemini-2.5-flash (fast, free), gemini-2.5-pro (more capable)
+            max_workers: Rounds analyzed at once
+            rpm: Requests per minute (default: the model's free-tier quota)
+            tpm: Tokens per minute (default: the model's free-tier quota)
+            max_retries: Retries of a round after 429 or server errors
+            retry_initial: First retry delay in seconds (when the API gives none)
+            retry_max: Upper bound of the exponential retry delay
+            cache: ResponseCache for round responses (None = always call Gemini)
+            min_round_score: Rounds the rule-based pre-scorer rates below this
+                             are not sent to Gemini (0 = send every round,
+                             1 = skip rounds without kills)
         """
         # Get API key
         if not api_key:
@@ -33,39 +60,68 @@ class AIDirector:
         # Configure Gemini client
         self.client = genai.Client(api_key=api_key)
         self.model_name = model
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        self.rate_limiter = RateLimiter.for_model(model, rpm, tpm)
+        self.cache = cache
+        self.min_round_score = min_round_score
+        self.failed_rounds = []  # Rounds of the last analysis whose LLM call failed (no highlights known)
         
     def analyze_match_log(self, log_file_path):
         """
         Analyze entire match log and identify all highlight segments.
         
         Args:
-            log_file_path: Path to match_log.json
+            log_file_path: Path to the match log (JSONL)
             
         Returns:
-            list: Highlight segments with start/end times and labels
+            list: Highlight segments with start/end times and labels (rounds
+                  whose LLM call failed are listed in failed_rounds)
         """
+        self.failed_rounds = []
         try:
-            with open(log_file_path, 'r') as f:
-                match_data = json.load(f)
-            
-            events = match_data.get('events', [])
+            # Group events by round while streaming the log
+            rounds = self._group_events_by_round(iter_match_log(log_file_path))
             
-            if not events:
+            if not rounds:
                 logger.warning("No events found in match log")
                 return []
             
-            # Group events by round
-            rounds = self._group_events_by_round(events)
+            # Rounds the local scorer rates too low cost no LLM call
+            if self.min_round_score:
+                rounds, pruned = prune_rounds(rounds, self.min_round_score)
+                if pruned:
+                    logger.info(f"⏭ Pre-scorer skipped {len(pruned)} rounds below score {self.min_round_score}")
+                if not rounds:
+                    logger.info("✓ No round worth analyzing")
+                    return []
             
-            all_highlights = []
+            # Analyze the rounds concurrently; map() keeps the results in round order
+            jobs = sorted(rounds.items())
+            logger.info(f"Analyzing {len(jobs)} rounds ({min(self.max_workers, len(jobs))} at a time)...")
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+                results = list(pool.map(lambda job: self._analyze_round(*job), jobs))
             
-            # Analyze each round
-            for round_num, round_events in rounds.items():
-                logger.info(f"Analyzing Round {round_num}...")
-                highlights = self._analyze_round(round_num, round_events)
-                all_highlights.extend(highlights)
+            all_highlights = []
+            for (round_num, _), highlights in zip(jobs, results):
+                if highlights is None:
+                    self.failed_rounds.append(round_num)
+                else:
+                    all_highlights.extend(highlights)
             
-            logger.info(f"✓ Identified {len(all_highlights)} highlight segments")
+            stats = self.rate_limiter.get_stats()
+            logger.info(f"✓ Identified {len(all_highlights)} highlight segments in "
+                        f"{len(jobs) - len(self.failed_rounds)}/{len(jobs)} rounds "
+                        f"({stats['requests']} requests, {stats['waited_s']:.1f}s waiting for quota)")
+            if self.failed_rounds:
+                logger.warning(f"⚠ {len(self.failed_rounds)} rounds could not be analyzed (highlights unknown, "
+                               f"not 'none'): {', '.join(map(str, self.failed_rounds))}")
+            if self.cache is not None:
+                cache_stats = self.cache.get_stats()
+                logger.info(f"✓ AI cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                            f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024:.0f} KB)")
             return all_highlights
             
         except Exception as e:
@@ -73,7 +129,7 @@ class AIDirector:
             return []
     
     def _group_events_by_round(self, events):
-        """Group events by round number."""
+        """Group events (any iterable) by round number."""
         rounds = {}
         for event in events:
             round_num = event.get('round', 0)
@@ -91,7 +147,8 @@ class AIDirector:
             events: List of events in this round
             
         Returns:
-            list: Highlight segments for this round
+            list: Highlight segments for this round, None if the LLM call
+                  failed (e.g. retries exhausted on 429s)
         """
         # Prepare prompt for LLM
         prompt = self._create_analysis_prompt(round_num, events)
@@ -130,19 +187,22 @@ Priority scale: 1-10 (10 = must-clip ACE, 1 = skip)"""
             # Create full prompt with system instruction
             full_prompt = f"{system_instruction}\n\n{prompt}"
             
-            # Generate response with Gemini (new API)
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    response_mime_type="application/json"
-                )
-            )
+            # Reuse the analysis of an identical round, otherwise ask Gemini
+            # (new API) within quota and with retries
+            cache_key = None
+            response_text = None
+            if self.cache is not None:
+                cache_key = make_key(self.model_name, PROMPT_VERSION,
+                                     {"round": round_num, "events": self._normalize_events(events)})
+                response_text = self.cache.get(cache_key)
+            cached = response_text is not None
+            if not cached:
+                response_text = self._generate(full_prompt, f"Round {round_num}").text
             
             # Parse LLM response
-            response_text = response.text
             result = json.loads(response_text)
+            if cache_key is not None and not cached:
+                self.cache.put(cache_key, response_text, model=self.model_name)
             
             # Handle different response formats
             highlights = result.get('highlights', result.get('clips', []))
@@ -151,7 +211,7 @@ Priority scale: 1-10 (10 = must-clip ACE, 1 = skip)"""
                 logger.info(f"  Round {round_num}: No highlights identified")
                 return []
             
-            logger.info(f"  Round {round_num}: Found {len(highlights)} highlight(s)")
+            logger.info(f"  Round {round_num}: Found {len(highlights)} highlight(s){' (cached)' if cached else ''}")
             for h in highlights:
                 logger.info(f"    • {h.get('label')} ({h.get('start'):.1f}s - {h.get('end'):.1f}s) [Priority: {h.get('priority', 5)}]")
             
@@ -159,7 +219,73 @@ Priority scale: 1-10 (10 = must-clip ACE, 1 = skip)"""
             
         except Exception as e:
             logger.error(f"Error calling LLM for round {round_num}: {e}")
-            return []
+            return None
+    
+    def _generate(self, prompt, label):
+        """
+        Call Gemini once the rate limiter admits the request, retrying 429s and server errors.
+        
+        Args:
+            prompt: Full prompt
+            label: Name of the request for logs
+            
+        Returns:
+            Gemini response
+            
+        Raises:
+            Exception: The last API error once retries are exhausted, or any
+                       error that is not worth retrying
+        """
+        estimate = estimate_tokens(prompt, RESPONSE_TOKENS)
+        delay = self.retry_initial
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(estimate)
+            try:
+                response = self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=0.3,
+                        response_mime_type="application/json"
+                    )
+                )
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                # Exponential backoff with jitter, unless the API says how long to wait
+                wait = retry_delay(e) or delay * random.uniform(0.5, 1.0)
+                delay = min(delay * 2, self.retry_max)
+                logger.warning(f"  ⚠ {label}: {getattr(e, 'code', None) or type(e).__name__}, "
+                               f"retry {attempt + 1}/{self.max_retries} in {wait:.1f}s")
+                if is_rate_limited(e):
+                    self.rate_limiter.pause(wait)  # acquire() holds back every worker, not just this one
+                else:
+                    time.sleep(wait)
+                continue
+            
+            usage = getattr(response, 'usage_metadata', None)
+            self.rate_limiter.settle(estimate, getattr(usage, 'total_token_count', None))
+            return response
+    
+    def _normalize_events(self, events):
+        """
+        Reduce a round's events to the fields the prompt uses (the cache key).
+        
+        Args:
+            events: Events in this round
+            
+        Returns:
+            list: One list per prompt line, so unrelated fields (wall-clock
+                  times, snapshots) don't change the key
+        """
+        normalized = []
+        for event in events:
+            if event['type'] == 'kill':
+                normalized.append(['kill', round(event['video_time'], 1), event['weapon'],
+                                   event['headshot'], event['health'], event['total_kills']])
+            elif event['type'] == 'round_phase_change':
+                normalized.append(['phase', round(event['video_time'], 1), event['phase']])
+        return normalized
     
     def _create_analysis_prompt(self, round_num, events):
         """
@@ -0,0 +1,136 @@
+"""
+CutPlanner: keyframe-aware clip boundaries and seek strategy.
+Uses a video's SeekIndex to move clip boundaries onto nearby keyframes when the
+clip's tolerance allows, and picks how FFmpeg should seek so that as little
+video as possible is decoded only to be thrown away.
+"""
+
+# Seek strategies
+SEEK_KEYFRAME = "keyframe"  # Start on a keyframe: nothing decoded before the cut
+SEEK_DECODE = "decode"  # Accurate seek: decode from the previous keyframe, discard up to the cut
+SEEK_UNINDEXED = "unindexed"  # No index: let FFmpeg find the keyframe (waste unknown)
+
+# Keyframe seeks aim this far past the keyframe so rounding never lands on the previous one
+KEYFRAME_EPSILON = 0.001
+
+
+class CutPlan:
+    """How to cut one clip."""
+
+    __slots__ = (
+        'start',
+        'end',
+        'requested_start',
+        'requested_end',
+        'strategy',
+        'keyframe',
+        'decode_waste',
+        'unsnapped_waste',
+    )
+
+    def __init__(self, start, end, strategy=SEEK_UNINDEXED, keyframe=None, decode_waste=None,
+                 unsnapped_waste=None, requested_start=None, requested_end=None):
+        """
+        Create a plan.
+
+        Args:
+            start: Clip start in seconds (possibly snapped)
+            end: Clip end in seconds (possibly snapped)
+            strategy: SEEK_KEYFRAME, SEEK_DECODE or SEEK_UNINDEXED
+            keyframe: Keyframe decoding starts from (None without an index)
+            decode_waste: Seconds decoded and discarded before start
+            unsnapped_waste: Seconds that would have been discarded at the requested start
+            requested_start: Start before snapping (default: start)
+            requested_end: End before snapping (default: end)
+        """
+        self.start = start
+        self.end = end
+        self.requested_start = start if requested_start is None else requested_start
+        self.requested_end = end if requested_end is None else requested_end
+        self.strategy = strategy
+        self.keyframe = keyframe
+        self.decode_waste = decode_waste
+        self.unsnapped_waste = unsnapped_waste
+
+    @property
+    def duration(self):
+        """Clip length in seconds."""
+        return self.end - self.start
+
+    def input_args(self):
+        """
+        FFmpeg arguments placed before -i.
+
+        Returns:
+            list: Seek arguments for this plan
+        """
+        if self.strategy == SEEK_KEYFRAME:
+            # Land on the keyframe and keep it (no discard before the first frame)
+            return ['-noaccurate_seek', '-ss', f"{self.keyframe + KEYFRAME_EPSILON:.6f}"]
+        return ['-ss', f"{self.start:.6f}"]
+
+    def to_dict(self):
+        """Serialize for logs and statistics."""
+        return {
+            "start": self.start,
+            "end": self.end,
+            "requested_start": self.requested_start,
+            "requested_end": self.requested_end,
+            "strategy": self.strategy,
+            "keyframe": self.keyframe,
+            "decode_waste": self.decode_waste,
+            "unsnapped_waste": self.unsnapped_waste
+        }
+
+
+def _nearest_keyframe(index, time_seconds, tolerance, prefer_later):
+    """Keyframe within tolerance of a time, preferring the side that keeps more of the clip."""
+    before = index.keyframe_before(time_seconds)
+    after = index.keyframe_after(time_seconds)
+    if after is None and prefer_later:
+        after = index.duration or None  # The end of the file is a GOP boundary too
+    candidates = [k for k in (before, after) if k is not None and abs(k - time_seconds) <= tolerance + 1e-6]
+    if not candidates:
+        return None
+    return max(candidates) if prefer_later else min(candidates)
+
+
+def plan_cut(index, start, end, tolerance=0.0, snap_end=False):
+    """
+    Plan a clip cut.
+
+    The start moves to a keyframe within tolerance (earlier keyframes first, so
+    no content is lost), which makes the seek land exactly on it; otherwise the
+    seek decodes from the previous keyframe and discards the frames before the
+    start. With snap_end the end moves to a keyframe within tolerance (later
+    first), so the clip ends on a GOP boundary; a re-encoded clip gains
+    nothing from that, so it is off by default.
+
+    Args:
+        index: SeekIndex of the video, or None
+        start: Requested start in seconds
+        end: Requested end in seconds
+        tolerance: Seconds a boundary may move (0 = only exact keyframe hits)
+        snap_end: Also move the end to a keyframe
+
+    Returns:
+        CutPlan: Boundaries, seek strategy and the decode work it avoids
+    """
+    if index is None or not index.keyframes:
+        return CutPlan(start, end)
+
+    previous = index.keyframe_before(start)
+    unsnapped_waste = max(0.0, start - previous)
+
+    snapped_start = _nearest_keyframe(index, start, tolerance, prefer_later=False)
+    snapped_end = _nearest_keyframe(index, end, tolerance, prefer_later=True) if snap_end else None
+    new_start = snapped_start if snapped_start is not None else start
+    new_end = snapped_end if snapped_end is not None and snapped_end > new_start else end
+    if index.duration:
+        new_end = min(new_end, index.duration)
+
+    if snapped_start is not None:
+        return CutPlan(new_start, new_end, SEEK_KEYFRAME, keyframe=snapped_start, decode_waste=0.0,
+                       unsnapped_waste=unsnapped_waste, requested_start=start, requested_end=end)
+    return CutPlan(new_start, new_end, SEEK_DECODE, keyframe=previous, decode_waste=unsnapped_waste,
+                   unsnapped_waste=unsnapped_waste, requested_start=start, requested_end=end)
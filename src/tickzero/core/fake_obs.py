@@ -0,0 +1,488 @@
+"""
+FakeOBSServer: local stand-in for OBS Studio's obs-websocket v5 server.
+Speaks the subset TickZero uses (record start/stop/pause/split, the replay
+buffer and their events) with injectable latency, jitter and disconnects, so
+the OBS control path can be benchmarked and the pipeline run end to end
+without OBS. Optionally renders the "recordings" with ffmpeg lavfi sources.
+
+Usage:
+    python -m tickzero.core.fake_obs --port 4455 --latency 0.02 --jitter 0.01
+    python -m tickzero.core.fake_obs --output-dir fake_recordings --ffmpeg
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import shutil
+import subprocess
+import threading
+import time
+import logging
+from datetime import datetime
+
+from .obs_async import (
+    EVENT_SUB_OUTPUTS, OP_EVENT, OP_HELLO, OP_IDENTIFIED, OP_IDENTIFY, OP_REQUEST, OP_REQUEST_RESPONSE,
+    RPC_VERSION, STATUS_OUTPUT_NOT_RUNNING, STATUS_OUTPUT_RUNNING, auth_response
+)
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Request status codes beyond the ones the client reacts to
+STATUS_SUCCESS = 100
+STATUS_UNKNOWN_REQUEST_TYPE = 204
+STATUS_OUTPUT_PAUSED = 502
+STATUS_OUTPUT_NOT_PAUSED = 503
+STATUS_RESOURCE_NOT_FOUND = 600
+
+EVENT_SUB_ALL = 0x7FF  # Default subscription when Identify omits eventSubscriptions
+CLOSE_AUTHENTICATION_FAILED = 4009
+SUBPROTOCOL_JSON = "obswebsocket.json"
+
+
+def _select_subprotocol(first, second):
+    """
+    Answer obswebsocket.json when the client offers it.
+
+    OBS also accepts clients that offer no subprotocol (JSON is the default),
+    e.g. obs-websocket-py, so the handshake never fails on a missing one.
+    websockets >= 14 passes (connection, client subprotocols), older
+    versions (client subprotocols, server subprotocols).
+    """
+    offered = first if isinstance(first, (list, tuple)) else second
+    return SUBPROTOCOL_JSON if SUBPROTOCOL_JSON in offered else None
+
+
+class FakeOBSServer:
+    """In-process obs-websocket v5 server with a simulated record output."""
+
+    def __init__(self, host="127.0.0.1", port=0, password="", latency=0.0, jitter=0.0,
+                 disconnect_every=0, disconnect_rate=0.0, output_dir="fake_obs", use_ffmpeg=False,
+                 replay_buffer_seconds=20.0, resolution="1280x720", fps=30, seed=None):
+        """
+        Configure the server (not started).
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port, see start())
+            password: Require obs-websocket authentication with this password
+            latency: Seconds added before each request is handled (round-trip cost)
+            jitter: Maximum extra random seconds added to latency
+            disconnect_every: Drop the connection instead of answering every
+                              Nth request (0 = never)
+            disconnect_rate: Probability of dropping the connection on a request
+            output_dir: Directory of the reported recording/replay paths
+            use_ffmpeg: Render finished recordings and replays with ffmpeg
+                        lavfi test sources (file events wait for the render)
+            replay_buffer_seconds: Maximum length of a saved replay
+            resolution: Rendered video size
+            fps: Rendered frame rate
+            seed: Seed for jitter and random disconnects (reproducible runs)
+        """
+        if websockets is None:
+            raise ImportError("FakeOBSServer requires the 'websockets' package (pip install websockets)")
+
+        self.host = host
+        self.port = port
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.disconnect_every = disconnect_every
+        self.disconnect_rate = disconnect_rate
+        self.output_dir = output_dir
+        self.use_ffmpeg = use_ffmpeg and shutil.which('ffmpeg') is not None
+        if use_ffmpeg and not self.use_ffmpeg:
+            logger.warning("⚠ ffmpeg not found, fake recordings will not be rendered")
+        self.replay_buffer_seconds = replay_buffer_seconds
+        self.resolution = resolution
+        self.fps = fps
+        self._random = random.Random(seed)
+
+        # Record output
+        self.recording = False
+        self.paused = False
+        self.current_path = None
+        self.last_recording_path = None
+        self._record_started = None  # time.monotonic() of StartRecord
+        self._paused_total = 0.0
+        self._paused_at = None
+        self._file_offset = 0.0  # Record duration at which the current file began
+
+        # Replay buffer output
+        self.replay_buffer_active = False
+        self.last_replay_path = None
+        self._replay_started = None
+
+        self.rendered_files = []  # Files written with ffmpeg
+        self.request_counts = {}  # requestType -> count
+        self.connections = 0
+        self.disconnects = 0  # Injected disconnects
+        self.requests = 0
+
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._clients = set()
+        self._ready = threading.Event()
+
+    def start(self):
+        """
+        Start serving on a background event loop thread.
+
+        Returns:
+            int: The port the server listens on
+        """
+        self._thread = threading.Thread(target=self._serve, name="tickzero-fake-obs", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(5):
+            raise RuntimeError("Fake OBS server did not start")
+        logger.info(f"✓ Fake OBS WebSocket listening on ws://{self.host}:{self.port}")
+        return self.port
+
+    def stop(self):
+        """Close every connection and stop the server thread."""
+        if not self.loop:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+        self.loop = None
+
+    def drop_connections(self):
+        """Close every client connection (simulates OBS restarting or a network blip)."""
+        if self.loop:
+            asyncio.run_coroutine_threadsafe(self._close_clients(), self.loop).result(timeout=5)
+
+    def record_duration(self):
+        """
+        Current record output duration (excludes paused time).
+
+        Returns:
+            float: Seconds, 0 when not recording
+        """
+        if not self.recording:
+            return 0.0
+        paused = self._paused_total
+        if self._paused_at is not None:
+            paused += time.monotonic() - self._paused_at
+        return time.monotonic() - self._record_started - paused
+
+    def get_stats(self):
+        """
+        Get server statistics.
+
+        Returns:
+            dict: Connections, requests (total and per type) and injected disconnects
+        """
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "request_counts": dict(self.request_counts),
+            "disconnects": self.disconnects,
+            "rendered_files": list(self.rendered_files)
+        }
+
+    def _serve(self):
+        """Server thread: run the event loop."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        async def listen():
+            self._server = await websockets.serve(self._handler, self.host, self.port,
+                                                  subprotocols=[SUBPROTOCOL_JSON],
+                                                  select_subprotocol=_select_subprotocol, max_size=None)
+            self.port = self._server.sockets[0].getsockname()[1]
+            self._ready.set()
+
+        self.loop.run_until_complete(listen())
+        self.loop.run_forever()
+
+    async def _shutdown(self):
+        await self._close_clients()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _close_clients(self):
+        for ws in list(self._clients):
+            await ws.close()
+
+    async def _handler(self, ws):
+        """One client: handshake, then handle requests in arrival order."""
+        self.connections += 1
+        hello = {"obsWebSocketVersion": "5.5.0", "rpcVersion": RPC_VERSION}
+        salt = challenge = None
+        if self.password:
+            salt = base64.b64encode(os.urandom(16)).decode('utf-8')
+            challenge = base64.b64encode(os.urandom(16)).decode('utf-8')
+            hello["authentication"] = {"salt": salt, "challenge": challenge}
+        await ws.send(json.dumps({"op": OP_HELLO, "d": hello}))
+
+        try:
+            identify = json.loads(await ws.recv())
+        except websockets.ConnectionClosed:
+            return
+        data = identify.get('d', {})
+        if identify.get('op') != OP_IDENTIFY or (
+                self.password and data.get('authentication') != auth_response(self.password, salt, challenge)):
+            await ws.close(CLOSE_AUTHENTICATION_FAILED, "Authentication failed")
+            return
+        ws.event_subscriptions = data.get('eventSubscriptions', EVENT_SUB_ALL)
+        await ws.send(json.dumps({"op": OP_IDENTIFIED, "d": {"negotiatedRpcVersion": RPC_VERSION}}))
+
+        self._clients.add(ws)
+        requests = asyncio.Queue()
+        worker = asyncio.ensure_future(self._work(ws, requests))
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if message.get('op') == OP_REQUEST:
+                    # Stamp arrival now so pipelined requests don't queue up latency
+                    requests.put_nowait((time.monotonic(), message.get('d', {})))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._clients.discard(ws)
+            worker.cancel()
+
+    async def _work(self, ws, requests):
+        """Answer one connection's requests in order, each after its injected delay."""
+        try:
+            while True:
+                arrived, request = await requests.get()
+                delay = self.latency + self._random.uniform(0, self.jitter)
+                remaining = arrived + delay - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                if self._should_disconnect():
+                    self.disconnects += 1
+                    await ws.close(1011, "Injected disconnect")
+                    return
+                await self._respond(ws, request)
+        except websockets.ConnectionClosed:
+            pass
+
+    def _should_disconnect(self):
+        self.requests += 1
+        if self.disconnect_every and self.requests % self.disconnect_every == 0:
+            return True
+        return self.disconnect_rate > 0 and self._random.random() < self.disconnect_rate
+
+    async def _respond(self, ws, request):
+        """Apply one request, answer it, then push the events it caused."""
+        request_type = request.get('requestType')
+        self.request_counts[request_type] = self.request_counts.get(request_type, 0) + 1
+
+        handler = getattr(self, f"_request_{request_type}", None)
+        events = []
+        if handler is None:
+            code, response_data = STATUS_UNKNOWN_REQUEST_TYPE, None
+        else:
+            code, response_data = handler(request.get('requestData') or {}, events)
+
+        status = {"result": code == STATUS_SUCCESS, "code": code}
+        response = {"requestType": request_type, "requestId": request.get('requestId'), "requestStatus": status}
+        if response_data is not None:
+            response["responseData"] = response_data
+        await ws.send(json.dumps({"op": OP_REQUEST_RESPONSE, "d": response}))
+
+        for event in events:
+            if asyncio.iscoroutine(event):
+                # Rendering: the event follows once the file is written
+                asyncio.ensure_future(event)
+            else:
+                await self._broadcast(*event)
+
+    async def _broadcast(self, event_type, event_data):
+        """Send an output event to every client subscribed to output events."""
+        message = json.dumps({"op": OP_EVENT, "d": {"eventType": event_type, "eventIntent": EVENT_SUB_OUTPUTS,
+                                                    "eventData": event_data}})
+        for ws in list(self._clients):
+            if getattr(ws, 'event_subscriptions', EVENT_SUB_ALL) & EVENT_SUB_OUTPUTS:
+                try:
+                    await ws.send(message)
+                except websockets.ConnectionClosed:
+                    pass
+
+    async def _after_render(self, path, duration, event):
+        """Render a finished file (if enabled), then push its event (if any)."""
+        if self.use_ffmpeg:
+            await self.loop.run_in_executor(None, self._render, path, duration)
+        if event:
+            await self._broadcast(*event)
+
+    def _render(self, path, duration):
+        """Write a test-pattern video with a sine tone of the given duration."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f"testsrc2=size={self.resolution}:rate={self.fps}",
+            '-f', 'lavfi', '-i', "sine=frequency=440:sample_rate=48000",
+            '-t', f"{max(duration, 0.1):.3f}",
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-g', str(self.fps * 2),
+            '-c:a', 'aac', '-shortest', path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            self.rendered_files.append(path)
+        else:
+            logger.error(f"✗ Fake OBS render failed: {result.stderr.strip()}")
+
+    def _new_path(self, prefix=""):
+        """OBS-style output name ("%CCYY-%MM-%DD %hh-%mm-%ss"), unique per server."""
+        name = f"{prefix}{datetime.now().strftime('%Y-%m-%d %H-%M-%S')}"
+        path = os.path.join(self.output_dir, f"{name}.mkv")
+        suffix = 1
+        while path in (self.current_path, self.last_recording_path, self.last_replay_path) or os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.output_dir, f"{name} ({suffix}).mkv")
+        return path
+
+    def _record_state(self, state, path=None):
+        return ("RecordStateChanged", {"outputActive": state in ("OBS_WEBSOCKET_OUTPUT_STARTED",
+                                                                 "OBS_WEBSOCKET_OUTPUT_PAUSED",
+                                                                 "OBS_WEBSOCKET_OUTPUT_RESUMED"),
+                                       "outputState": state, "outputPath": path})
+
+    def _request_GetVersion(self, data, events):
+        return STATUS_SUCCESS, {"obsVersion": "30.0.0", "obsWebSocketVersion": "5.5.0", "rpcVersion": RPC_VERSION,
+                                "platform": "fake"}
+
+    def _request_GetRecordStatus(self, data, events):
+        duration = self.record_duration()
+        seconds, millis = divmod(int(duration * 1000), 1000)
+        timecode = f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.{millis:03d}"
+        return STATUS_SUCCESS, {"outputActive": self.recording, "outputPaused": self.paused,
+                                "outputTimecode": timecode, "outputDuration": int(duration * 1000),
+                                "outputBytes": int(duration * 750000)}
+
+    def _request_StartRecord(self, data, events):
+        if self.recording:
+            return STATUS_OUTPUT_RUNNING, None
+        self.recording = True
+        self.paused = False
+        self._record_started = time.monotonic()
+        self._paused_total = 0.0
+        self._paused_at = None
+        self._file_offset = 0.0
+        self.current_path = self._new_path()
+        events.append(self._record_state("OBS_WEBSOCKET_OUTPUT_STARTED", self.current_path))
+        return STATUS_SUCCESS, None
+
+    def _request_StopRecord(self, data, events):
+        if not self.recording:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        path, duration = self.current_path, self.record_duration() - self._file_offset
+        self.recording = False
+        self.paused = False
+        self.current_path = None
+        self.last_recording_path = path
+        events.append(self._record_state("OBS_WEBSOCKET_OUTPUT_STOPPING", path))
+        events.append(self._after_render(path, duration, self._record_state("OBS_WEBSOCKET_OUTPUT_STOPPED", path)))
+        return STATUS_SUCCESS, {"outputPath": path}
+
+    def _request_PauseRecord(self, data, events):
+        if not self.recording:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        if self.paused:
+            return STATUS_OUTPUT_PAUSED, None
+        self.paused = True
+        self._paused_at = time.monotonic()
+        events.append(self._record_state("OBS_WEBSOCKET_OUTPUT_PAUSED", self.current_path))
+        return STATUS_SUCCESS, None
+
+    def _request_ResumeRecord(self, data, events):
+        if not self.recording:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        if not self.paused:
+            return STATUS_OUTPUT_NOT_PAUSED, None
+        self.paused = False
+        self._paused_total += time.monotonic() - self._paused_at
+        self._paused_at = None
+        events.append(self._record_state("OBS_WEBSOCKET_OUTPUT_RESUMED", self.current_path))
+        return STATUS_SUCCESS, None
+
+    def _request_SplitRecordFile(self, data, events):
+        if not self.recording:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        closed, duration = self.current_path, self.record_duration() - self._file_offset
+        self._file_offset += duration
+        self.current_path = self._new_path()
+        events.append(("RecordFileChanged", {"newOutputPath": self.current_path}))
+        if self.use_ffmpeg:
+            events.append(self._after_render(closed, duration, None))
+        return STATUS_SUCCESS, None
+
+    def _request_GetReplayBufferStatus(self, data, events):
+        return STATUS_SUCCESS, {"outputActive": self.replay_buffer_active}
+
+    def _request_StartReplayBuffer(self, data, events):
+        if self.replay_buffer_active:
+            return STATUS_OUTPUT_RUNNING, None
+        self.replay_buffer_active = True
+        self._replay_started = time.monotonic()
+        events.append(("ReplayBufferStateChanged", {"outputActive": True, "outputState": "OBS_WEBSOCKET_OUTPUT_STARTED"}))
+        return STATUS_SUCCESS, None
+
+    def _request_StopReplayBuffer(self, data, events):
+        if not self.replay_buffer_active:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        self.replay_buffer_active = False
+        events.append(("ReplayBufferStateChanged", {"outputActive": False, "outputState": "OBS_WEBSOCKET_OUTPUT_STOPPED"}))
+        return STATUS_SUCCESS, None
+
+    def _request_SaveReplayBuffer(self, data, events):
+        if not self.replay_buffer_active:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        path = self._new_path("Replay ")
+        self.last_replay_path = path
+        duration = min(self.replay_buffer_seconds, time.monotonic() - self._replay_started)
+        events.append(self._after_render(path, duration, ("ReplayBufferSaved", {"savedReplayPath": path})))
+        return STATUS_SUCCESS, None
+
+    def _request_GetLastReplayBufferReplay(self, data, events):
+        if not self.last_replay_path:
+            return STATUS_RESOURCE_NOT_FOUND, None
+        return STATUS_SUCCESS, {"savedReplayPath": self.last_replay_path}
+
+
+
+def main():
+    """Run a fake OBS server until interrupted."""
+    parser = argparse.ArgumentParser(description="Local fake obs-websocket v5 server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4455)
+    parser.add_argument('--password', default='')
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Maximum random extra seconds per request")
+    parser.add_argument('--disconnect-every', type=int, default=0, help="Drop the connection every Nth request")
+    parser.add_argument('--disconnect-rate', type=float, default=0.0, help="Probability of dropping per request")
+    parser.add_argument('--output-dir', default='fake_obs', help="Directory of reported recording paths")
+    parser.add_argument('--ffmpeg', action='store_true', help="Render recordings with ffmpeg test sources")
+    parser.add_argument('--replay-seconds', type=float, default=20.0, help="Replay buffer length")
+    args = parser.parse_args()
+
+    server = FakeOBSServer(host=args.host, port=args.port, password=args.password, latency=args.latency,
+                           jitter=args.jitter, disconnect_every=args.disconnect_every,
+                           disconnect_rate=args.disconnect_rate, output_dir=args.output_dir,
+                           use_ffmpeg=args.ffmpeg, replay_buffer_seconds=args.replay_seconds)
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logger.info(f"Fake OBS stopped: {server.get_stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+GameSnapshot: compact view of the GSI fields the event detectors compare.
+Replaces keeping the whole previous payload dict around and re-walking
+nested .get() chains on every POST.
+"""
+from operator import attrgetter
+
+
+# Fields compared between payloads (player_name is carried along for logging only)
+COMPARED_FIELDS = (
+    'steamid',
+    'map_phase',
+    'round_phase',
+    'round',
+    'kills',
+    'headshot_kills',
+    'deaths',
+    'assists',
+    'health',
+    'active_weapon',
+)
+
+_get_compared = attrgetter(*COMPARED_FIELDS)
+
+
+class GameSnapshot:
+    """Typed, slot-based snapshot of one GSI payload."""
+
+    __slots__ = COMPARED_FIELDS + ('player_name',)
+
+    def __init__(self, steamid=None, map_phase=None, round_phase=None, round=0,
+                 kills=None, headshot_kills=0, deaths=None, assists=None,
+                 health=0, active_weapon=None, player_name=None):
+        """
+        Create a snapshot.
+
+        Fields that are absent from a payload are None (phases, steamid,
+        kills/deaths/assists when match_stats is missing, active weapon).
+        """
+        self.steamid = steamid
+        self.map_phase = map_phase
+        self.round_phase = round_phase
+        self.round = round
+        self.kills = kills
+        self.headshot_kills = headshot_kills
+        self.deaths = deaths
+        self.assists = assists
+        self.health = health
+        self.active_weapon = active_weapon
+        self.player_name = player_name
+
+    @classmethod
+    def from_payload(cls, state):
+        """
+        Extract the compared fields from a parsed GSI payload.
+
+        Args:
+            state: Parsed JSON game state from CS2
+
+        Returns:
+            GameSnapshot: Snapshot of the payload
+        """
+        player_data = state.get('player', {})
+        round_data = state.get('round', {})
+        map_data = state.get('map', {})
+
+        active_weapon = None
+        for weapon_data in player_data.get('weapons', {}).values():
+            if weapon_data.get('state') == 'active':
+                active_weapon = weapon_data.get('name', 'unknown')
+                break
+
+        snapshot = cls(
+            steamid=player_data.get('steamid'),
+            map_phase=map_data.get('phase'),
+            round_phase=round_data.get('phase'),
+            round=round_data.get('round', 0),
+            health=player_data.get('state', {}).get('health', 0),
+            active_weapon=active_weapon,
+            player_name=player_data.get('name')
+        )
+
+        match_stats = player_data.get('match_stats')
+        if match_stats is not None:
+            snapshot.kills = match_stats.get('kills', 0)
+            snapshot.headshot_kills = match_stats.get('headshot_kills', 0)
+            snapshot.deaths = match_stats.get('deaths', 0)
+            snapshot.assists = match_stats.get('assists', 0)
+
+        return snapshot
+
+    def fingerprint(self):
+        """
+        Get a cheap, hashable key of the compared fields.
+
+        Two payloads with equal fingerprints cannot trigger any detector,
+        which is what heartbeats and throttled re-sends look like.
+
+        Returns:
+            tuple: Values of COMPARED_FIELDS in order
+        """
+        return _get_compared(self)
+
+    def diff(self, previous):
+        """
+        Get the fields that changed since a previous snapshot.
+
+        Args:
+            previous: Earlier GameSnapshot, or None for the first payload
+
+        Returns:
+            set: Names of the changed fields (all fields if previous is None)
+        """
+        if previous is None:
+            return set(COMPARED_FIELDS)
+        return {name for name in COMPARED_FIELDS if getattr(self, name) != getattr(previous, name)}
+
+    def __eq__(self, other):
+        if not isinstance(other, GameSnapshot):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"GameSnapshot({fields})"
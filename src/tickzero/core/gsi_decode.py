@@ -0,0 +1,116 @@
+"""
+GSI decode: turn a raw CS2 POST body straight into a GameSnapshot.
+Uses a schema-typed msgspec decoder when msgspec is installed (only the fields
+the detectors read are materialized), orjson when available, and the standard
+library json module otherwise.
+"""
+import json
+import logging
+
+from .game_snapshot import GameSnapshot
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _snapshot_from_dict_payload(body):
+    """Standard library path: full dict parse, then walk the keys."""
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    return GameSnapshot.from_payload(json.loads(body))
+
+
+def _snapshot_from_orjson(body):
+    """orjson path: faster full parse, same key walk."""
+    return GameSnapshot.from_payload(orjson.loads(body))
+
+
+if msgspec is not None:
+    class _Weapon(msgspec.Struct):
+        name: str = 'unknown'
+        state: str = ''
+
+    class _PlayerState(msgspec.Struct):
+        health: int = 0
+
+    class _MatchStats(msgspec.Struct):
+        kills: int = 0
+        headshot_kills: int = 0
+        deaths: int = 0
+        assists: int = 0
+
+    class _Player(msgspec.Struct):
+        steamid: str | None = None
+        name: str | None = None
+        state: _PlayerState = msgspec.field(default_factory=_PlayerState)
+        weapons: dict[str, _Weapon] = {}
+        match_stats: _MatchStats | None = None
+
+    class _Map(msgspec.Struct):
+        phase: str | None = None
+
+    class _Round(msgspec.Struct):
+        phase: str | None = None
+        round: int = 0
+
+    class _Payload(msgspec.Struct):
+        map: _Map = msgspec.field(default_factory=_Map)
+        round: _Round = msgspec.field(default_factory=_Round)
+        player: _Player = msgspec.field(default_factory=_Player)
+
+    _payload_decoder = msgspec.json.Decoder(_Payload)
+
+    def _snapshot_from_msgspec(body):
+        """msgspec path: decode only the schema fields into typed structs."""
+        try:
+            payload = _payload_decoder.decode(body)
+        except msgspec.ValidationError:
+            # Valid JSON with an unexpected shape: let the tolerant path handle it
+            return _snapshot_from_dict_payload(body)
+
+        player = payload.player
+        active_weapon = None
+        for weapon in player.weapons.values():
+            if weapon.state == 'active':
+                active_weapon = weapon.name
+                break
+
+        snapshot = GameSnapshot(
+            steamid=player.steamid,
+            map_phase=payload.map.phase,
+            round_phase=payload.round.phase,
+            round=payload.round.round,
+            health=player.state.health,
+            active_weapon=active_weapon,
+            player_name=player.name
+        )
+
+        stats = player.match_stats
+        if stats is not None:
+            snapshot.kills = stats.kills
+            snapshot.headshot_kills = stats.headshot_kills
+            snapshot.deaths = stats.deaths
+            snapshot.assists = stats.assists
+
+        return snapshot
+
+
+DECODERS = {'json': _snapshot_from_dict_payload}
+if orjson is not None:
+    DECODERS['orjson'] = _snapshot_from_orjson
+if msgspec is not None:
+    DECODERS['msgspec'] = _snapshot_from_msgspec
+
+# Fastest available backend; decode_snapshot(body) takes the raw POST body
+# (bytes or str), returns a GameSnapshot and raises ValueError on malformed JSON
+DECODER_BACKEND = 'msgspec' if msgspec is not None else 'orjson' if orjson is not None else 'json'
+decode_snapshot = DECODERS[DECODER_BACKEND]
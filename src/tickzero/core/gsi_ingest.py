@@ -0,0 +1,298 @@
+"""
+AsyncGSIIngest: asyncio-based ingest front-end for CS2 Game State Integration.
+Acknowledges every POST immediately and hands payloads to a single ordered
+consumer through a bounded queue, so slow processing never delays CS2.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ConnectionStats:
+    """Counts TCP connections vs HTTP requests to show how well keep-alive is reused."""
+
+    def __init__(self):
+        """Initialize the counters; rates are measured from now."""
+        self.started_at = time.monotonic()
+        self.connections = 0
+        self.open_connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def connection_opened(self):
+        """Record a newly accepted connection."""
+        with self._lock:
+            self.connections += 1
+            self.open_connections += 1
+
+    def connection_closed(self):
+        """Record a connection being closed."""
+        with self._lock:
+            self.open_connections -= 1
+
+    def request(self):
+        """Record one HTTP request."""
+        with self._lock:
+            self.requests += 1
+
+    def get_stats(self):
+        """
+        Get connection statistics.
+
+        Returns:
+            dict: Connection and request totals, per-second rates and the
+                  average number of requests served per connection
+        """
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "connections": self.connections,
+            "open_connections": self.open_connections,
+            "requests": self.requests,
+            "connections_per_s": self.connections / elapsed,
+            "requests_per_s": self.requests / elapsed,
+            "requests_per_connection": self.requests / self.connections if self.connections else 0.0
+        }
+
+
+def _decode_json(body):
+    """Default payload decoder: parse the body as a JSON dict."""
+    return json.loads(body.decode('utf-8'))
+
+
+class AsyncGSIIngest:
+    """Receives GSI payloads on an asyncio loop and processes them in order."""
+
+    def __init__(self, process_callback, port=3000, max_queue_size=256, late_threshold=5.0,
+                 raw_callback=None, decoder=None):
+        """
+        Initialize the async ingest server.
+
+        Args:
+            process_callback: Called as process_callback(payload, received_at)
+                              for every queued payload, one at a time
+            port: Port to listen on (default: 3000)
+            max_queue_size: Maximum number of payloads waiting to be processed.
+                            When full, the oldest waiting payload is dropped.
+            late_threshold: Seconds a payload may wait in the queue before it
+                            is counted as late (default: 5.0, the GSI timeout)
+            raw_callback: Optional raw_callback(body, received_at) called with
+                          every raw POST body before parsing (e.g. capture)
+            decoder: Optional decoder(body) turning the raw bytes into the
+                     payload handed to process_callback (default: json parse)
+        """
+        self.process_callback = process_callback
+        self.port = port
+        self.max_queue_size = max_queue_size
+        self.late_threshold = late_threshold
+        self.raw_callback = raw_callback
+        self.decoder = decoder or _decode_json
+
+        self.loop = None
+        self.queue = None
+        self.thread = None
+        self.is_running = False
+        self._stop_event = None
+        self._drain_timeout = 5.0
+        self._ready = threading.Event()
+        self._startup_error = None
+
+        # Ingest statistics
+        self.received_count = 0
+        self.processed_count = 0
+        self.dropped_count = 0
+        self.late_count = 0
+        self.error_count = 0
+        self.max_queue_depth = 0
+        self.connection_stats = ConnectionStats()
+
+    def start(self):
+        """Start the asyncio loop in a background thread and wait until it listens."""
+        self._ready.clear()
+        self._startup_error = None
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self._ready.wait()
+
+        if self._startup_error:
+            raise self._startup_error
+
+        self.is_running = True
+
+    def stop(self, drain_timeout=5.0):
+        """
+        Stop accepting payloads and drain the queue.
+
+        Args:
+            drain_timeout: Seconds to wait for queued payloads to be processed
+        """
+        if not self.is_running or not self.loop:
+            return
+
+        self._drain_timeout = drain_timeout
+        self.loop.call_soon_threadsafe(self._stop_event.set)
+        self.thread.join(timeout=drain_timeout + 1.0)
+        self.is_running = False
+
+    def get_stats(self):
+        """
+        Get ingest statistics.
+
+        Returns:
+            dict: Queue depth and payload counters
+        """
+        return {
+            "mode": "async",
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_capacity": self.max_queue_size,
+            "received": self.received_count,
+            "processed": self.processed_count,
+            "dropped": self.dropped_count,
+            "late": self.late_count,
+            "errors": self.error_count,
+            **self.connection_stats.get_stats()
+        }
+
+    def _run_loop(self):
+        """Thread entry point: run the event loop until stopped."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            logger.error(f"Async GSI ingest failed: {e}")
+            self._startup_error = e
+        finally:
+            self._ready.set()
+            self.loop.close()
+
+    async def _serve(self):
+        """Listen for connections and run the consumer until stop is requested."""
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stop_event = asyncio.Event()
+
+        server = await asyncio.start_server(self._handle_connection, host='', port=self.port)
+        # Resolve port 0 to the bound port (IPv4 first; CS2 posts to localhost)
+        sockets = sorted(server.sockets, key=lambda sock: sock.family != socket.AF_INET)
+        self.port = sockets[0].getsockname()[1]
+        consumer = asyncio.create_task(self._consume())
+        self._ready.set()
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+            # Give the consumer a chance to process what is already queued
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=self._drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stopped with {self.queue.qsize()} unprocessed GSI payloads")
+
+            consumer.cancel()
+            try:
+                await consumer
+            except asyncio.CancelledError:
+                pass
+
+    async def _handle_connection(self, reader, writer):
+        """Read HTTP requests from one connection and acknowledge them immediately."""
+        self.connection_stats.connection_opened()
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                self.connection_stats.request()
+                request_line, _, header_block = head.decode('latin-1').partition('\r\n')
+                parts = request_line.split()
+                method = parts[0] if parts else ''
+                version = parts[2] if len(parts) > 2 else 'HTTP/1.0'
+
+                headers = {}
+                for line in header_block.split('\r\n'):
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                content_length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(content_length) if content_length else b''
+                received_at = time.time()
+
+                connection = headers.get('connection', '').lower()
+                if version == 'HTTP/1.1':
+                    keep_alive = connection != 'close'
+                else:
+                    keep_alive = connection == 'keep-alive'
+
+                if method != 'POST':
+                    status = '405 Method Not Allowed'
+                else:
+                    status = self._enqueue(body, received_at)
+
+                response = f"HTTP/1.1 {status}\r\nContent-Length: 0\r\n"
+                if not keep_alive:
+                    response += "Connection: close\r\n"
+                writer.write((response + "\r\n").encode('latin-1'))
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Error handling GSI connection: {e}")
+        finally:
+            self.connection_stats.connection_closed()
+            writer.close()
+
+    def _enqueue(self, body, received_at):
+        """
+        Parse a payload and put it on the queue.
+
+        Returns:
+            str: HTTP status line for the response
+        """
+        try:
+            if self.raw_callback:
+                self.raw_callback(body, received_at)
+            game_state = self.decoder(body)
+        except Exception as e:
+            logger.error(f"Error parsing GSI data: {e}")
+            self.error_count += 1
+            return '500 Internal Server Error'
+
+        self.received_count += 1
+
+        # Keep the newest state: evict the oldest waiting payload when full
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped_count += 1
+            logger.warning(f"⚠ GSI queue full ({self.max_queue_size}), dropped oldest payload")
+
+        self.queue.put_nowait((received_at, game_state))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return '200 OK'
+
+    async def _consume(self):
+        """Process queued payloads strictly in arrival order."""
+        while True:
+            received_at, game_state = await self.queue.get()
+            try:
+                if time.time() - received_at > self.late_threshold:
+                    self.late_count += 1
+
+                # Run in a worker thread so blocking OBS calls never stall the loop
+                await asyncio.to_thread(self.process_callback, game_state, received_at)
+                self.processed_count += 1
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"Error processing queued GSI payload: {e}")
+            finally:
+                self.queue.task_done()
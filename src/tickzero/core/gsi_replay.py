@@ -0,0 +1,239 @@
+"""
+GSI capture and replay: record raw CS2 payloads and feed them back through GSIServer.
+Captures are gzip-compressed JSON Lines with the receipt timestamp of every payload,
+so detection can be regression-tested and benchmarked without launching CS2.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+import logging
+
+from .gsi_decode import decode_snapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CAPTURE_FORMAT = "tickzero-gsi-capture"
+CAPTURE_FORMAT_VERSION = 1
+
+
+class GSICaptureWriter:
+    """Writes raw GSI payloads with receipt timestamps to a compressed capture file."""
+
+    def __init__(self, path):
+        """
+        Initialize the capture writer.
+
+        Args:
+            path: Path of the capture file (conventionally *.jsonl.gz)
+        """
+        self.path = path
+        self.file = None
+        self.payload_count = 0
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Create the capture file and write the header record."""
+        self.file = gzip.open(self.path, 'wt', encoding='utf-8')
+        header = {
+            "record": "header",
+            "format": CAPTURE_FORMAT,
+            "version": CAPTURE_FORMAT_VERSION,
+            "created": time.time()
+        }
+        self.file.write(json.dumps(header) + '\n')
+
+    def write(self, body, received_at=None):
+        """
+        Append one raw payload.
+
+        Args:
+            body: Raw POST body (bytes or str) exactly as received from CS2
+            received_at: System timestamp of receipt (default: now)
+        """
+        if received_at is None:
+            received_at = time.time()
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+
+        with self._lock:
+            if not self.file:
+                self.open()
+            self.file.write(json.dumps({"t": received_at, "body": body}, separators=(',', ':')) + '\n')
+            self.payload_count += 1
+
+    def close(self):
+        """Flush and close the capture file."""
+        with self._lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+def iter_capture(path):
+    """
+    Iterate over a capture file.
+
+    Args:
+        path: Path to a capture file written by GSICaptureWriter
+
+    Yields:
+        tuple: (received_at, raw_body) for every payload, in receipt order
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping truncated record in {path}")
+                break
+            if 'record' in record:
+                continue  # Header
+            yield record['t'], record['body']
+
+
+class ReplayOBS:
+    """
+    Fake OBS timestamp source driven by the replay's virtual clock.
+
+    Provides the subset of the OBSClient/OBSManager interface GSIServer uses,
+    so video timestamps are deterministic for a given capture.
+    """
+
+    def __init__(self):
+        """Initialize the fake OBS (not recording)."""
+        self.now = 0.0
+        self.recording_start_time = None
+        self.is_recording = False
+        self.last_recording_path = None
+
+    def start_recording(self):
+        """Start the fake recording at the current virtual time."""
+        if not self.is_recording:
+            self.recording_start_time = self.now
+            self.is_recording = True
+        return self.recording_start_time
+
+    def stop_recording(self):
+        """Stop the fake recording."""
+        self.is_recording = False
+        return None
+
+    def get_current_timestamp(self):
+        """Recording position in milliseconds at the current virtual time."""
+        if not self.is_recording:
+            return 0
+        return int((self.now - self.recording_start_time) * 1000)
+
+
+class GSIReplayer:
+    """Replays a capture through GSIServer.process_snapshot."""
+
+    def __init__(self, capture_path, gsi_server, obs=None, speed=1.0):
+        """
+        Initialize the replayer.
+
+        Args:
+            capture_path: Path to the capture file
+            gsi_server: GSIServer instance to drive (its obs_manager should be
+                        the ReplayOBS passed here)
+            obs: ReplayOBS whose virtual clock follows the capture timestamps
+            speed: Replay speed multiplier (1.0 = real time, 4.0 = 4x);
+                   None or 0 replays as fast as possible
+        """
+        self.capture_path = capture_path
+        self.gsi_server = gsi_server
+        self.obs = obs
+        self.speed = speed
+
+    def run(self):
+        """
+        Replay every payload in order.
+
+        Returns:
+            dict: Replay statistics (payloads, events, wall time, throughput)
+        """
+        payload_count = 0
+        error_count = 0
+        first_t = None
+        wall_start = time.perf_counter()
+        processing_time = 0.0
+
+        for received_at, body in iter_capture(self.capture_path):
+            if first_t is None:
+                first_t = received_at
+
+            # Pace payloads according to their original spacing
+            if self.speed:
+                due = wall_start + (received_at - first_t) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            if self.obs:
+                self.obs.now = received_at
+
+            start = time.perf_counter()
+            try:
+                snapshot = decode_snapshot(body)
+            except ValueError:
+                error_count += 1
+                continue
+
+            self.gsi_server.process_snapshot(snapshot, event_time=received_at)
+            processing_time += time.perf_counter() - start
+            payload_count += 1
+
+        wall_time = time.perf_counter() - wall_start
+        return {
+            "payloads": payload_count,
+            "errors": error_count,
+            "events": self.gsi_server.events_logged,
+            "wall_time": wall_time,
+            "processing_time": processing_time,
+            "payloads_per_second": payload_count / processing_time if processing_time else 0.0
+        }
+
+
+def replay_capture(capture_path, log_file="replay_log.jsonl", speed=None):
+    """
+    Replay a capture through a fresh GSIServer against a fake OBS.
+
+    Args:
+        capture_path: Path to the capture file
+        log_file: Where the replayed match log is written (overwritten: a
+                  replay regenerates it; further matches in the capture get
+                  their own <name>_<start time>.jsonl next to it)
+        speed: Replay speed multiplier, None for as fast as possible
+
+    Returns:
+        tuple: (GSIServer, statistics dict with the match logs written in "logs")
+    """
+    from .gsi_server import GSIServer
+
+    if os.path.exists(log_file):
+        os.remove(log_file)
+    obs = ReplayOBS()
+    logs = []
+
+    def on_match_end():
+        obs.stop_recording()
+        logs.append(gsi.last_completed_log)
+
+    gsi = GSIServer(
+        obs_manager=obs,
+        log_file=log_file,
+        on_match_start=obs.start_recording,
+        on_match_end=on_match_end,
+        callback_mode="inline"  # Keep the fake recording clock deterministic
+    )
+    stats = GSIReplayer(capture_path, gsi, obs=obs, speed=speed).run()
+    gsi.save_logs()
+    if gsi.log_file not in logs and os.path.exists(gsi.log_file):
+        logs.append(gsi.log_file)  # Capture ends mid-match
+    stats["logs"] = logs
+    return gsi, stats
@@ -2,30 +2,86 @@
 GSIServer: HTTP server that receives CS2 Game State Integration payloads.
 Detects game events (kills, round changes) and logs them with video timestamps.
 """
-import json
+import os
 import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import threading
 import logging
 from datetime import datetime
 
+from .gsi_ingest import AsyncGSIIngest, ConnectionStats
+from .gsi_decode import DECODER_BACKEND, decode_snapshot
+from .lifecycle_dispatcher import LifecycleDispatcher
+from .match_log import MatchLogWriter
+from .gsi_replay import GSICaptureWriter
+from .game_snapshot import GameSnapshot
+from .round_index import RoundIndex
+from .pause_time_map import PauseTimeMap
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Highlight labels by kills in one round
+MULTI_KILL_LABELS = {1: "kill", 2: "double kill", 3: "triple kill", 4: "quad kill", 5: "ace"}
+
+# Phases with nothing worth recording (timeouts happen during freezetime)
+DOWNTIME_MAP_PHASES = ("warmup", "intermission")
+DOWNTIME_ROUND_PHASES = ("freezetime",)
+
 
 class GSIServer:
     """Receives and processes CS2 Game State Integration data."""
     
-    def __init__(self, obs_manager, port=3000, log_file="match_log.json", on_match_start=None, on_match_end=None):
+    def __init__(self, obs_manager, port=3000, log_file="match_log.jsonl", on_match_start=None, on_match_end=None,
+                 ingest_mode="threaded", max_queue_size=256, recording_clock=None, fsync_policy="interval",
+                 capture_file=None, callback_mode="executor", callback_timeout=30.0, log_dir=None,
+                 on_highlight=None, highlight_delay=3.0, highlight_min_kills=1, pause_downtime=False,
+                 split_rounds=False):
         """
         Initialize GSI server.
         
         Args:
             obs_manager: OBSManager instance for timestamp synchronization
             port: Port to listen on (default: 3000)
-            log_file: Path to save match log JSON
+            log_file: Path of the streaming match log (JSONL); ignored when log_dir is set.
+                      A match that finds an earlier log there writes
+                      <name>_<start time>.jsonl instead of truncating it
             on_match_start: Callback function called when match starts
             on_match_end: Callback function called when match ends
+            ingest_mode: "threaded" (process inside the HTTP request) or
+                         "async" (acknowledge immediately, process from a bounded queue)
+            max_queue_size: Maximum queued payloads in async ingest mode
+            recording_clock: Optional RecordingClock used to compute video
+                             timestamps locally instead of querying OBS per event
+            fsync_policy: Match log durability: "none", "interval" or "event"
+            capture_file: Optional path to record every raw payload (gzip JSONL)
+                          for later replay with GSIReplayer
+            callback_mode: "executor" (run on_match_start/on_match_end on a
+                           dedicated thread so ingest never waits on OBS or the
+                           database) or "inline" (synchronous, for replays)
+            callback_timeout: Seconds a lifecycle callback may run before it
+                              is reported as timed out (the next callback
+                              still waits for it)
+            log_dir: Optional directory for one log per match
+                     (match_<match_id>.jsonl, published by atomic rename when
+                     the match ends), so a finished log can be processed while
+                     the next match is being recorded
+            on_highlight: Optional callback(highlight) run (on the lifecycle
+                          dispatcher) highlight_delay seconds after the main
+                          player's last kill of a spree, e.g. to save the OBS
+                          replay buffer; highlight is a dict with round, kills,
+                          headshots, label, first/last kill time and match_id
+            highlight_delay: Seconds to wait after a kill before triggering, so
+                             the clip includes the aftermath and further kills
+                             in the same round extend one multi-kill highlight
+            highlight_min_kills: Minimum kills in a round that trigger a highlight
+            pause_downtime: Pause the OBS recording during warmup, freezetime
+                            (and timeouts) and halftime, and resume it when play
+                            continues; event video times are then computed from
+                            a PauseTimeMap of the paused file
+            split_rounds: Ask OBS to start a new recording file at every round
+                          boundary (SplitRecordFile) and keep a segment index
+                          (round, file, start offset) in recording_segments
         """
         self.port = port
         self.log_file = log_file
@@ -33,39 +89,123 @@ class GSIServer:
         self.server = None
         self.server_thread = None
         self.is_running = False
+        self.ingest_mode = ingest_mode
+        self.max_queue_size = max_queue_size
+        self.ingest = None  # AsyncGSIIngest instance in async mode
+        self.connection_stats = ConnectionStats()  # Threaded mode keep-alive reuse
+        self._process_lock = threading.Lock()  # Serializes payloads from concurrent connections
+        self.recording_clock = recording_clock
+        self.log_dir = log_dir
+        self.fsync_policy = fsync_policy
+        self.match_id = None  # ID (and log name) of the current match in log_dir mode
+        self.last_completed_log = None  # Log of the most recently finished match
+        self.last_completed_match_id = None  # match_id of that log
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self.log_writer = MatchLogWriter(log_file, fsync_policy=fsync_policy)
+        self.capture = GSICaptureWriter(capture_file) if capture_file else None
         self.on_match_start = on_match_start
         self.on_match_end = on_match_end
+        self.dispatcher = LifecycleDispatcher(timeout=callback_timeout, inline=(callback_mode == "inline"))
+        self.recording_metadata_pending = False  # Recording (re)started, update the log header
+        self.on_highlight = on_highlight
+        self.highlight_delay = highlight_delay
+        self.highlight_min_kills = highlight_min_kills
+        self.pending_highlight = None  # Kill spree waiting for highlight_delay to pass
+        self.highlights_triggered = 0
+        self._highlight_timer = None
+        self._highlight_lock = threading.Lock()
+        self.pause_downtime = pause_downtime
+        self.time_map = PauseTimeMap() if pause_downtime else None  # Anchored once recording starts
+        self.pause_requested = False  # Last pause/resume dispatched for the current match
+        self.split_rounds = split_rounds
+        if split_rounds and not hasattr(obs_manager, 'split_recording'):
+            logger.warning(f"⚠ split_rounds is set but {type(obs_manager).__name__} cannot split recordings: "
+                           f"recording into a single file")
+            self.split_rounds = False
+        self.recording_segments = []  # Segment dicts of the current match, filled by the dispatcher
+        self.last_completed_segments = []  # Segments of the most recently finished match
+        self.segment_round = None  # Round of the current segment
         
         # Match state tracking
-        self.previous_state = {}
+        self.previous_snapshot = None  # GameSnapshot of the last payload
+        self.previous_fingerprint = None  # previous_snapshot.fingerprint()
+        self.snapshots_processed = 0  # Payloads that ran the detectors
+        self.snapshots_skipped = 0  # Unchanged payloads (heartbeats, re-sends)
         self.match_events = []
+        self.round_index = RoundIndex()  # Round -> events and summary, updated per event
+        self.events_logged = 0  # Total events across all matches
         self.current_round = 0
         self.last_round_phase = None
         self.last_map_phase = None  # Track map-level phase (warmup, live, gameover)
         self.match_started = False  # Track if match has started
         self.match_in_progress = False  # Track if match is currently ongoing
         self.match_ended = False
+        self.match_end_pending = False  # Gameover seen, end match after the current payload
+        self.new_match_pending = False  # Previous match finished, its log is closed
         self.rounds_since_event = 0  # Track inactivity
         self.main_player_steamid = None  # Track the main player's SteamID
         
     def start(self):
         """Start the GSI HTTP server in a separate thread."""
+        if self.ingest_mode == "async":
+            self.ingest = AsyncGSIIngest(
+                process_callback=self.process_snapshot,
+                port=self.port,
+                max_queue_size=self.max_queue_size,
+                raw_callback=self.capture.write if self.capture else None,
+                decoder=decode_snapshot
+            )
+            self.ingest.start()
+            self.is_running = True
+            
+            logger.info(f"✓ GSI Server listening on port {self.port} (async ingest, queue size {self.max_queue_size}, "
+                        f"{DECODER_BACKEND} decoder)")
+            logger.info(f"  Events will be logged to: {self.log_dir or self.log_file}")
+            return
+        
         handler = self._create_handler()
-        self.server = HTTPServer(('', self.port), handler)
+        # One thread per persistent connection, so an idle keep-alive client
+        # never blocks another one (payload processing is still serialized)
+        self.server = ThreadingHTTPServer(('', self.port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.connection_stats = ConnectionStats()
         self.is_running = True
         
         self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         self.server_thread.start()
         
-        logger.info(f"✓ GSI Server listening on port {self.port}")
-        logger.info(f"  Events will be logged to: {self.log_file}")
+        logger.info(f"✓ GSI Server listening on port {self.port} ({DECODER_BACKEND} decoder)")
+        logger.info(f"  Events will be logged to: {self.log_dir or self.log_file}")
     
     def stop(self):
         """Stop the GSI server and save logs."""
+        if self.ingest:
+            self.ingest.stop()
+            self.is_running = False
+            logger.info(f"GSI Server stopped ({self.ingest.dropped_count} dropped, {self.ingest.late_count} late payloads)")
+        
         if self.server:
             self.server.shutdown()
+            self.server.server_close()
             self.is_running = False
-            logger.info("GSI Server stopped")
+            stats = self.connection_stats.get_stats()
+            logger.info(f"GSI Server stopped ({stats['requests']} requests over {stats['connections']} connections)")
+        
+        if self.capture:
+            self.capture.close()
+            logger.info(f"✓ Captured {self.capture.payload_count} payloads to {self.capture.path}")
+        
+        # Don't lose a spree that was still waiting for its delay
+        self._flush_highlight()
+        self.dispatcher.stop()
+        if self.highlights_triggered:
+            logger.info(f"  Triggered {self.highlights_triggered} highlight captures")
+        
+        if self.snapshots_skipped:
+            total = self.snapshots_processed + self.snapshots_skipped
+            logger.info(f"  Skipped {self.snapshots_skipped}/{total} unchanged payloads")
         
         self.save_logs()
     
@@ -74,26 +214,52 @@ class GSIServer:
         gsi_server = self
         
         class GSIRequestHandler(BaseHTTPRequestHandler):
+            # Persistent connections: CS2 reuses one socket instead of
+            # reconnecting for every payload
+            protocol_version = "HTTP/1.1"
+            timeout = 60  # Close keep-alive connections idle for longer than this
+            
+            def setup(self):
+                super().setup()
+                gsi_server.connection_stats.connection_opened()
+            
+            def finish(self):
+                gsi_server.connection_stats.connection_closed()
+                super().finish()
+            
             def do_POST(self):
                 """Handle incoming POST requests from CS2."""
-                content_length = int(self.headers['Content-Length'])
+                gsi_server.connection_stats.request()
+                content_length = int(self.headers.get('Content-Length', 0))
                 post_data = self.rfile.read(content_length)
+                received_at = time.time()
                 
                 try:
-                    # Parse CS2 JSON payload
-                    game_state = json.loads(post_data.decode('utf-8'))
+                    if gsi_server.capture:
+                        gsi_server.capture.write(post_data, received_at)
+                    
+                    # Decode CS2 JSON payload straight into a snapshot
+                    snapshot = decode_snapshot(post_data)
                     
                     # Process the game state
-                    gsi_server.process_game_state(game_state)
+                    with gsi_server._process_lock:
+                        gsi_server.process_snapshot(snapshot, received_at)
                     
                     # Send 200 OK response
-                    self.send_response(200)
-                    self.end_headers()
+                    self._respond(200)
                     
                 except Exception as e:
                     logger.error(f"Error processing GSI data: {e}")
-                    self.send_response(500)
-                    self.end_headers()
+                    self._respond(500)
+            
+            def _respond(self, status):
+                """Send an empty response; Content-Length keeps the connection usable."""
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                if self.close_connection:
+                    # Client sent "Connection: close" or spoke HTTP/1.0
+                    self.send_header('Connection', 'close')
+                self.end_headers()
             
             def log_message(self, format, *args):
                 """Suppress default HTTP server logging."""
@@ -101,73 +267,138 @@ class GSIServer:
         
         return GSIRequestHandler
     
-    def process_game_state(self, state):
+    def process_game_state(self, state, event_time=None):
         """
         Process incoming game state and detect events.
         
         Args:
             state: Parsed JSON game state from CS2
+            event_time: System timestamp when the payload was received
+                        (defaults to now; set by the async ingest queue)
         """
-        event_time = time.time()  # Capture system timestamp immediately
+        if event_time is None:
+            event_time = time.time()  # Capture system timestamp immediately
         
         try:
-            # Extract key data from game state
-            player_data = state.get('player', {})
-            round_data = state.get('round', {})
-            map_data = state.get('map', {})
+            snapshot = GameSnapshot.from_payload(state)
+        except Exception as e:
+            logger.error(f"Error processing game state: {e}")
+            return
+        
+        self.process_snapshot(snapshot, event_time)
+    
+    def process_snapshot(self, snapshot, event_time=None):
+        """
+        Detect events from an already decoded game state.
+        
+        Args:
+            snapshot: GameSnapshot of the payload (see gsi_decode.decode_snapshot)
+            event_time: System timestamp when the payload was received
+        """
+        if event_time is None:
+            event_time = time.time()
+        
+        # Replays (and a missed timer) fire due highlights by payload time
+        pending = self.pending_highlight
+        if pending is not None and event_time >= pending['due_time']:
+            self._flush_highlight()
+        
+        # Heartbeats and throttled re-sends carry nothing the detectors compare
+        fingerprint = snapshot.fingerprint()
+        if fingerprint == self.previous_fingerprint:
+            self.snapshots_skipped += 1
+            return
+        self.snapshots_processed += 1
+        
+        try:
+            changed = snapshot.diff(self.previous_snapshot)
+            previous = self.previous_snapshot
             
             # Capture main player's SteamID on first valid payload
-            if not self.main_player_steamid and 'steamid' in player_data:
-                self.main_player_steamid = player_data['steamid']
-                player_name = player_data.get('name', 'Unknown')
+            if not self.main_player_steamid and snapshot.steamid:
+                self.main_player_steamid = snapshot.steamid
+                player_name = snapshot.player_name or 'Unknown'
                 logger.info(f"👤 Main player locked: {player_name} (SteamID: {self.main_player_steamid})")
             
             # Detect map phase changes (for match-level events like gameover)
-            if 'phase' in map_data:
-                current_map_phase = map_data['phase']
-                if current_map_phase != self.last_map_phase:
-                    self._check_map_phase(event_time, current_map_phase, map_data)
-                    self.last_map_phase = current_map_phase
+            if 'map_phase' in changed and snapshot.map_phase is not None:
+                if snapshot.map_phase != self.last_map_phase:
+                    self._check_map_phase(event_time, snapshot.map_phase)
+                    self.last_map_phase = snapshot.map_phase
             
             # Detect round phase changes
-            if 'phase' in round_data:
-                current_phase = round_data['phase']
-                previous_phase = self.previous_state.get('round', {}).get('phase')
-                
-                if current_phase != previous_phase:
-                    self._log_round_phase_change(event_time, current_phase, round_data)
+            if 'round_phase' in changed and snapshot.round_phase is not None:
+                self._log_round_phase_change(event_time, snapshot.round_phase, snapshot.round)
+            
+            if self.time_map is not None and self.match_in_progress:
+                self._update_recording_pause(snapshot)
+            
+            if self.split_rounds and self.match_in_progress:
+                self._update_segments(snapshot, changed)
+            
+            # Kill/death counters only compare within the same player's stats;
+            # switching to a spectated teammate swaps in their counters
+            same_player = previous is not None and 'steamid' not in changed
+            is_main_player = not self.main_player_steamid or snapshot.steamid == self.main_player_steamid
             
             # Detect kills (by checking match_stats changes)
-            if 'match_stats' in player_data:
-                current_kills = player_data['match_stats'].get('kills', 0)
-                previous_kills = self.previous_state.get('player', {}).get('match_stats', {}).get('kills', 0)
-                
-                if current_kills > previous_kills:
+            if 'kills' in changed and snapshot.kills is not None and same_player:
+                if snapshot.kills > (previous.kills or 0):
                     # Verify this kill is from the main player, not a spectated teammate
-                    current_steamid = player_data.get('steamid')
-                    if self.main_player_steamid and current_steamid != self.main_player_steamid:
+                    if not is_main_player:
                         # Kill from spectated player - ignore it
-                        spectated_name = player_data.get('name', 'Unknown')
-                        logger.debug(f"⏭️  Ignored kill from spectated player: {spectated_name} (SteamID: {current_steamid})")
+                        spectated_name = snapshot.player_name or 'Unknown'
+                        logger.debug(f"⏭️  Ignored kill from spectated player: {spectated_name} (SteamID: {snapshot.steamid})")
                     else:
                         # Kill from main player - log it
-                        self._log_kill_event(event_time, player_data, round_data)
+                        self._log_kill_event(event_time, snapshot, previous)
+            
+            # Detect deaths of the main player
+            if 'deaths' in changed and snapshot.deaths is not None and same_player and is_main_player:
+                if snapshot.deaths > (previous.deaths or 0):
+                    self._log_death_event(event_time, snapshot)
             
-            # Update previous state for next comparison
-            self.previous_state = state
+            # Update previous snapshot for next comparison
+            self.previous_snapshot = snapshot
+            self.previous_fingerprint = fingerprint
+            
+            if self.match_end_pending:
+                self.match_end_pending = False
+                # The last spree must be saved before recording stops
+                self._flush_highlight()
+                self._trigger_match_end()
             
         except Exception as e:
             logger.error(f"Error processing game state: {e}")
     
-    def _check_map_phase(self, event_time, map_phase, map_data):
-        """Check map-level phase changes for match start/end detection."""
+    def _get_video_timestamp(self, event_time):
+        """
+        Get the recording position (seconds) for an event.
+        
+        Uses the pause-aware time map when downtime is paused, else the local
+        RecordingClock model when it is synced, otherwise asks OBS.
+        """
+        if self.time_map is not None:
+            video_timestamp = self.time_map.video_time_at(event_time)
+            if video_timestamp is not None:
+                return video_timestamp
+        
+        if self.recording_clock:
+            video_timestamp = self.recording_clock.video_time_at(event_time)
+            if video_timestamp is not None:
+                return video_timestamp
+        
         # Try to get timestamp from OBS using new OBSClient interface
         if hasattr(self.obs_manager, 'get_current_timestamp'):
             timestamp_ms = self.obs_manager.get_current_timestamp()
-            video_timestamp = timestamp_ms / 1000.0 if timestamp_ms > 0 else 0.0
-        else:
-            # Fallback for old OBSManager
-            video_timestamp = self.obs_manager.calculate_video_timestamp(event_time)
+            return timestamp_ms / 1000.0 if timestamp_ms > 0 else 0.0
+        
+        # Fallback for old OBSManager
+        return self.obs_manager.calculate_video_timestamp(event_time)
+    
+    def _check_map_phase(self, event_time, map_phase):
+        """Check map-level phase changes for match start/end detection."""
+        video_timestamp = self._get_video_timestamp(event_time)
         
         logger.info(f"🗺️  Map Phase: {map_phase} | Video Time: {video_timestamp:.2f}s")
         
@@ -176,22 +407,19 @@ class GSIServer:
             logger.info("🎮 MATCH STARTED - Map is now live")
             self.match_started = True
             self.match_in_progress = True
-            if self.on_match_start:
-                self.on_match_start()
+            # Recording has (re)started once the callback returns: keep the log
+            # header's recording metadata current (written from the ingest thread)
+            self.dispatcher.dispatch("match_start", self.on_match_start, on_done=self._recording_started)
         
         # Detect match end: "gameover" phase (OFFICIAL METHOD per Valve docs)
         elif map_phase == "gameover" and self.match_in_progress:
             logger.info("🏁 MATCH ENDED - Map phase: gameover")
-            self._trigger_match_end()
+            # Finish processing this payload first so its events land in this match's log
+            self.match_end_pending = True
     
-    def _log_round_phase_change(self, event_time, phase, round_data):
+    def _log_round_phase_change(self, event_time, phase, current_round):
         """Log round phase changes."""
-        if hasattr(self.obs_manager, 'get_current_timestamp'):
-            timestamp_ms = self.obs_manager.get_current_timestamp()
-            video_timestamp = timestamp_ms / 1000.0 if timestamp_ms > 0 else 0.0
-        else:
-            video_timestamp = self.obs_manager.calculate_video_timestamp(event_time)
-        current_round = round_data.get('round', 0)
+        video_timestamp = self._get_video_timestamp(event_time)
         
         event = {
             "type": "round_phase_change",
@@ -202,14 +430,14 @@ class GSIServer:
             "round": current_round
         }
         
-        self.match_events.append(event)
+        self._append_event(event)
         logger.info(f"📍 Round Phase: {phase} | Round: {current_round} | Video Time: {video_timestamp:.2f}s")
         
         # Update tracking
         self.current_round = current_round
         self.last_round_phase = phase
     
-    def _log_kill_event(self, event_time, player_data, round_data):
+    def _log_kill_event(self, event_time, snapshot, previous):
         """
         Log kill events with detailed context.
         
@@ -219,63 +447,304 @@ class GSIServer:
         - Health remaining
         - Current round number
         """
-        if hasattr(self.obs_manager, 'get_current_timestamp'):
-            timestamp_ms = self.obs_manager.get_current_timestamp()
-            video_timestamp = timestamp_ms / 1000.0 if timestamp_ms > 0 else 0.0
-        else:
-            video_timestamp = self.obs_manager.calculate_video_timestamp(event_time)
-        
-        # Extract weapon and state information
-        weapons = player_data.get('weapons', {})
-        active_weapon = None
-        for weapon_key, weapon_data in weapons.items():
-            if weapon_data.get('state') == 'active':
-                active_weapon = weapon_data.get('name', 'unknown')
-                break
-        
-        state_data = player_data.get('state', {})
-        match_stats = player_data.get('match_stats', {})
+        video_timestamp = self._get_video_timestamp(event_time)
         
         event = {
             "type": "kill",
             "system_time": event_time,
             "video_time": video_timestamp,
             "datetime": datetime.fromtimestamp(event_time).strftime('%H:%M:%S.%f'),
-            "round": round_data.get('round', 0),
-            "weapon": active_weapon or "unknown",
-            "headshot": match_stats.get('headshot_kills', 0) > self.previous_state.get('player', {}).get('match_stats', {}).get('headshot_kills', 0),
-            "health": state_data.get('health', 0),
-            "total_kills": match_stats.get('kills', 0)
+            "round": snapshot.round,
+            "weapon": snapshot.active_weapon or "unknown",
+            "headshot": snapshot.headshot_kills > (previous.headshot_kills if previous else 0),
+            "health": snapshot.health,
+            "total_kills": snapshot.kills
         }
         
-        self.match_events.append(event)
+        self._append_event(event)
         logger.info(f"💀 Kill | Weapon: {event['weapon']} | HS: {event['headshot']} | HP: {event['health']} | Video Time: {video_timestamp:.2f}s")
+        
+        if self.on_highlight:
+            self._queue_highlight(event_time, event)
+    
+    def _queue_highlight(self, event_time, event):
+        """Start or extend the pending highlight; it fires highlight_delay after the last kill."""
+        with self._highlight_lock:
+            pending = self.pending_highlight
+            if pending is not None and pending['round'] != event['round']:
+                # New round: the previous spree is over
+                self._fire_highlight()
+                pending = None
+            
+            if pending is None:
+                pending = self.pending_highlight = {
+                    "round": event['round'],
+                    "kills": 0,
+                    "headshots": 0,
+                    "first_kill_time": event_time,
+                    "video_time": event['video_time'],
+                    "match_id": self.match_id
+                }
+            pending['kills'] += 1
+            pending['headshots'] += 1 if event['headshot'] else 0
+            pending['last_kill_time'] = event_time
+            pending['due_time'] = event_time + self.highlight_delay
+            
+            if not self.dispatcher.inline:
+                if self._highlight_timer:
+                    self._highlight_timer.cancel()
+                self._highlight_timer = threading.Timer(self.highlight_delay, self._flush_highlight)
+                self._highlight_timer.daemon = True
+                self._highlight_timer.start()
+    
+    def _flush_highlight(self):
+        """Trigger the pending highlight now (timer thread, payload clock or match end)."""
+        with self._highlight_lock:
+            self._fire_highlight()
+    
+    def _fire_highlight(self):
+        """Dispatch the pending highlight (caller holds _highlight_lock)."""
+        highlight, self.pending_highlight = self.pending_highlight, None
+        if self._highlight_timer:
+            self._highlight_timer.cancel()
+            self._highlight_timer = None
+        if highlight is None or highlight['kills'] < self.highlight_min_kills:
+            return
+        
+        del highlight['due_time']
+        highlight['label'] = MULTI_KILL_LABELS.get(highlight['kills'], f"{highlight['kills']}k")
+        self.highlights_triggered += 1
+        logger.info(f"🎬 Highlight: {highlight['label']} in round {highlight['round']}")
+        self.dispatcher.dispatch("highlight", lambda: self.on_highlight(highlight))
+    
+    def _log_death_event(self, event_time, snapshot):
+        """Log the main player's deaths."""
+        video_timestamp = self._get_video_timestamp(event_time)
+        
+        event = {
+            "type": "death",
+            "system_time": event_time,
+            "video_time": video_timestamp,
+            "datetime": datetime.fromtimestamp(event_time).strftime('%H:%M:%S.%f'),
+            "round": snapshot.round,
+            "weapon": snapshot.active_weapon or "unknown",
+            "total_deaths": snapshot.deaths
+        }
+        
+        self._append_event(event)
+        logger.info(f"☠️  Death | Round: {snapshot.round} | Video Time: {video_timestamp:.2f}s")
     
     def _trigger_match_end(self):
         """Trigger match end callback."""
-        if not self.match_ended and self.on_match_end:
+        # Per-match logs rotate at every match end, even without a callback
+        if not self.match_ended and (self.on_match_end or self.log_dir):
             self.match_ended = True
             self.match_in_progress = False
             self.save_logs()
-            # Call the callback (will trigger processing in background)
-            self.on_match_end()
-            # Reset for next match
-            self.match_events = []
+            self.last_completed_log = self.log_file
+            self.last_completed_match_id = self.match_id
+            if self.split_rounds:
+                # Filled in by split jobs still queued ahead of match_end
+                self.last_completed_segments = self.recording_segments
+                self.recording_segments = []
+                self.segment_round = None
+            if self.time_map is not None:
+                paused = self.time_map.paused_seconds(time.time())
+                if paused:
+                    logger.info(f"⏸️  Skipped {paused:.0f}s of downtime in the recording")
+                # Unanchored until the next recording starts
+                self.time_map = PauseTimeMap()
+                self.pause_requested = False
+            if self.log_dir:
+                self.match_id = None  # The next event starts a new match log
+            # Stop recording / hand off for processing without blocking ingest
+            self.dispatcher.dispatch("match_end", self.on_match_end)
+            # Reset for next match (events are cleared when the next match logs its first event)
+            self.new_match_pending = True
             self.match_ended = False
             self.match_started = False
     
+    def _append_event(self, event):
+        """Record an event in memory and append it to the streaming match log."""
+        if self.new_match_pending:
+            # First event after a finished match: start a fresh log
+            self.new_match_pending = False
+            self.match_events = []
+            self.round_index = RoundIndex()
+        
+        if self.log_dir and self.match_id is None:
+            self._begin_match_log()
+        
+        self.match_events.append(event)
+        self.round_index.add(len(self.match_events) - 1, event)
+        self.events_logged += 1
+        try:
+            if not self.log_writer.is_open:
+                if not self.log_dir:
+                    self._claim_log_file()
+                self.recording_metadata_pending = False
+                self.log_writer.open(self._log_metadata())
+            elif self.recording_metadata_pending:
+                self.recording_metadata_pending = False
+                self.log_writer.write_metadata(self._log_metadata())
+            self.log_writer.append(event)
+        except Exception as e:
+            logger.error(f"✗ Failed to append event to {self.log_file}: {e}")
+    
+    def _begin_match_log(self):
+        """Allocate a match ID and a fresh per-match log writer in log_dir."""
+        match_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.log_dir, f"match_{match_id}.jsonl")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.log_dir, f"match_{match_id}_{suffix}.jsonl")
+        if suffix > 1:
+            match_id = f"{match_id}_{suffix}"
+        
+        self.match_id = match_id
+        self.log_file = path
+        self.log_writer = MatchLogWriter(path, fsync_policy=self.fsync_policy, atomic=True)
+        logger.info(f"📝 Match {match_id}: logging to {path}")
+    
+    def _claim_log_file(self):
+        """
+        Keep an earlier match log at the fixed log_file path.
+
+        Opening the writer truncates its file, so when log_file already holds
+        a log (a previous match of this session or a leftover from the last
+        one, possibly not analyzed yet) this match logs to a new file next to
+        it, named after the match start time.
+        """
+        if not os.path.exists(self.log_file) or os.path.getsize(self.log_file) == 0:
+            return
+        root, ext = os.path.splitext(self.log_file)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = f"{root}_{stamp}{ext}"
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = f"{root}_{stamp}_{suffix}{ext}"
+        
+        logger.warning(f"⚠ {self.log_file} holds an earlier match log, logging this match to {path}")
+        self.log_file = path
+        self.log_writer = MatchLogWriter(path, fsync_policy=self.fsync_policy)
+    
+    def _recording_started(self):
+        """Dispatcher completion handler for on_match_start."""
+        if self.time_map is not None:
+            self._anchor_time_map(self.time_map)
+        self.recording_metadata_pending = True
+    
+    def _update_recording_pause(self, snapshot):
+        """Pause the recording when downtime starts, resume it when play continues."""
+        downtime = snapshot.map_phase in DOWNTIME_MAP_PHASES or snapshot.round_phase in DOWNTIME_ROUND_PHASES
+        if downtime == self.pause_requested:
+            return
+        self.pause_requested = downtime
+        time_map = self.time_map
+        if downtime:
+            self.dispatcher.dispatch("pause_recording", lambda: self._pause_recording(time_map))
+        else:
+            self.dispatcher.dispatch("resume_recording", lambda: self._resume_recording(time_map))
+    
+    def _pause_recording(self, time_map):
+        """Dispatcher job: pause OBS and note when it took effect."""
+        if time_map.start_time is None:
+            # Recording started without on_match_start (manual mode)
+            self._anchor_time_map(time_map)
+        before = time.time()
+        if self.obs_manager.pause_recording():
+            time_map.pause((before + time.time()) / 2)
+            logger.info("⏸️  Recording paused (downtime)")
+    
+    def _resume_recording(self, time_map):
+        """Dispatcher job: resume OBS and note when it took effect."""
+        if not time_map.is_paused:
+            return
+        before = time.time()
+        if self.obs_manager.resume_recording():
+            time_map.resume((before + time.time()) / 2)
+            logger.info("▶️  Recording resumed")
+    
+    def _update_segments(self, snapshot, changed):
+        """Start a new recording file when a new round's freezetime begins."""
+        segments = self.recording_segments
+        round_number = snapshot.round
+        if self.segment_round is None:
+            # First payload of the match: the recording's first file is this round's segment
+            self.segment_round = round_number
+            self.dispatcher.dispatch("split_recording", lambda: self._begin_segments(segments, round_number))
+        elif ('round_phase' in changed and snapshot.round_phase == "freezetime"
+              and round_number != self.segment_round):
+            self.segment_round = round_number
+            self.dispatcher.dispatch("split_recording", lambda: self._split_recording(segments, round_number))
+    
+    def _begin_segments(self, segments, round_number):
+        """Dispatcher job: register the file the recording started in."""
+        segments.append({
+            "index": 0,
+            "round": round_number,
+            "path": getattr(self.obs_manager, 'current_output_path', None),  # Filled at the first split if unknown
+            "start": 0.0,
+            "end": None
+        })
+    
+    def _split_recording(self, segments, round_number):
+        """Dispatcher job: split the recording file and index the new segment."""
+        closed_path = getattr(self.obs_manager, 'current_output_path', None)
+        before = time.time()
+        path = self.obs_manager.split_recording()
+        if not path:
+            return  # The round continues in the current file
+        
+        start = self._get_video_timestamp((before + time.time()) / 2)
+        if segments:
+            segments[-1]["path"] = segments[-1]["path"] or closed_path
+            segments[-1]["end"] = start
+        segments.append({"index": len(segments), "round": round_number, "path": path, "start": start, "end": None})
+        logger.info(f"✂️  Round {round_number}: recording continues in {path} (at {start:.2f}s)")
+    
+    def _anchor_time_map(self, time_map):
+        """Anchor the time map to the start of the current recording."""
+        start_time = getattr(self.obs_manager, 'recording_start_time', None)
+        if start_time is None and hasattr(self.obs_manager, 'get_current_timestamp'):
+            # Derive it from the recording position, halving the round trip
+            before = time.time()
+            duration_ms = self.obs_manager.get_current_timestamp()
+            if duration_ms:
+                start_time = (before + time.time()) / 2 - duration_ms / 1000.0
+        time_map.reset(start_time if start_time is not None else time.time())
+    
+    def _log_metadata(self):
+        """Recording metadata stored in the match log header."""
+        recording_start_time = getattr(self.obs_manager, 'recording_start_time', None)
+        return {
+            "recording_start_time": recording_start_time,
+            "recording_start_datetime": datetime.fromtimestamp(recording_start_time).isoformat() if recording_start_time else None,
+            "player_steamid": self.main_player_steamid,
+            "match_id": self.match_id
+        }
+    
     def save_logs(self):
-        """Save all logged events to JSON file."""
+        """Write the round summaries, then flush and close the streaming match log."""
         try:
-            log_data = {
-                "recording_start_time": self.obs_manager.recording_start_time,
-                "recording_start_datetime": datetime.fromtimestamp(self.obs_manager.recording_start_time).isoformat() if self.obs_manager.recording_start_time else None,
-                "total_events": len(self.match_events),
-                "events": self.match_events
-            }
-            
-            with open(self.log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            if self.log_writer.is_open:
+                if self.recording_metadata_pending:
+                    self.recording_metadata_pending = False
+                    self.log_writer.write_metadata(self._log_metadata())
+                summary = {
+                    "total_events": len(self.match_events),
+                    "duration": self.match_events[-1].get('video_time', 0) if self.match_events else 0,
+                    "rounds": self.round_index.summaries()
+                }
+                if self.time_map is not None:
+                    summary["recording_pauses"] = self.time_map.to_list()
+                self.log_writer.write_summary(summary)
+            elif not self.log_dir and not os.path.exists(self.log_file):
+                # No events yet: still leave a valid (header-only) log behind
+                self.log_writer.open(self._log_metadata())
+            self.log_writer.close()
             
             logger.info(f"✓ Saved {len(self.match_events)} events to {self.log_file}")
             
@@ -292,4 +761,42 @@ class GSIServer:
         Returns:
             list: Events from specified round
         """
-        return [event for event in self.match_events if event.get('round') == round_number]
+        return self.round_index.events(self.match_events, round_number)
+    
+    def get_round_summaries(self):
+        """
+        Get per-round statistics for the current match.
+        
+        Returns:
+            list: Dicts with kills, headshots, deaths, lowest HP, first/last
+                  kill time and event range for every round
+        """
+        return self.round_index.summaries()
+    
+    def get_callback_stats(self):
+        """
+        Get lifecycle callback statistics.
+        
+        Returns:
+            dict: Callback name -> calls, errors, timeouts and latency (ms)
+        """
+        return self.dispatcher.get_stats()
+    
+    def get_ingest_stats(self):
+        """
+        Get ingest statistics.
+        
+        Returns:
+            dict: Processed vs skipped (unchanged) payloads, connection vs
+                  request counts and rates, plus queue depth and
+                  received/processed/dropped/late counters in async mode
+        """
+        total = self.snapshots_processed + self.snapshots_skipped
+        snapshot_stats = {
+            "snapshots_processed": self.snapshots_processed,
+            "snapshots_skipped": self.snapshots_skipped,
+            "skip_ratio": self.snapshots_skipped / total if total else 0.0
+        }
+        if self.ingest:
+            return {**self.ingest.get_stats(), **snapshot_stats}
+        return {"mode": self.ingest_mode, **self.connection_stats.get_stats(), **snapshot_stats}
@@ -0,0 +1,220 @@
+"""
+HighlightScorer: deterministic rule-based highlight detection.
+Scans a round's events once, groups the kills into windows (kills at most
+MULTI_KILL_GAP seconds apart) and rates each window from its multi-kill size,
+headshot streak, low-HP kills and knife/zeus kills. The AI Director uses the
+round scores to skip rounds not worth an LLM call, and RuleDirector turns the
+same windows into highlights so the pipeline also works without an LLM.
+"""
+import logging
+
+from .match_log import iter_match_log
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Kills further apart than this start a new window (and a new clip)
+MULTI_KILL_GAP = 10.0
+
+# Health at or below which a kill counts as a low-HP kill
+LOW_HP = 20
+
+# Clip timing around a window (same rules as the LLM prompt)
+CLIP_LEAD = 3.0
+CLIP_TAIL = 3.0
+MIN_CLIP = 8.0
+
+# Base priority by kills in a window (5+ = ace)
+KILL_PRIORITY = {1: 3, 2: 5, 3: 7, 4: 9, 5: 10}
+
+# Weapon name fragment -> tag of kills worth a clip on their own
+SPECIAL_WEAPONS = (
+    ('knife', 'knife'),
+    ('bayonet', 'knife'),
+    ('taser', 'zeus'),
+)
+SPECIAL_MIN_PRIORITY = 6
+
+# Headshot kills in a row that earn a bonus when not every kill was one
+HEADSHOT_STREAK = 3
+
+
+def _special_tag(weapon):
+    """Tag of a knife or zeus weapon, None for anything else."""
+    weapon = (weapon or "").lower()
+    for fragment, tag in SPECIAL_WEAPONS:
+        if fragment in weapon:
+            return tag
+    return None
+
+
+def _new_window(event):
+    """Open a kill window at a kill."""
+    return {
+        "first_kill_time": event.get('video_time', 0),
+        "last_kill_time": event.get('video_time', 0),
+        "kills": 0,
+        "headshots": 0,
+        "streak": 0,
+        "best_streak": 0,
+        "low_hp": False,
+        "special": None
+    }
+
+
+def find_windows(events):
+    """
+    Group a round's kills into multi-kill windows in one pass.
+
+    Args:
+        events: Events of one round in logged order
+
+    Returns:
+        list: Window dicts (first/last kill time, kills, headshots, longest
+              headshot streak, whether a kill was at low HP, knife/zeus tag)
+    """
+    windows = []
+    window = None
+    for event in events:
+        if event.get('type') != 'kill':
+            continue
+        video_time = event.get('video_time', 0)
+        if window is None or video_time - window['last_kill_time'] > MULTI_KILL_GAP:
+            window = _new_window(event)
+            windows.append(window)
+
+        window['kills'] += 1
+        window['last_kill_time'] = video_time
+        if event.get('headshot'):
+            window['headshots'] += 1
+            window['streak'] += 1
+            window['best_streak'] = max(window['best_streak'], window['streak'])
+        else:
+            window['streak'] = 0
+        health = event.get('health')
+        if health is not None and health <= LOW_HP:
+            window['low_hp'] = True
+        window['special'] = window['special'] or _special_tag(event.get('weapon'))
+    return windows
+
+
+def rate_window(window):
+    """
+    Priority and label of a kill window.
+
+    Args:
+        window: Window from find_windows()
+
+    Returns:
+        tuple: (priority 1-10, label such as "3k_headshot_lowhp")
+    """
+    kills = window['kills']
+    priority = KILL_PRIORITY.get(kills, KILL_PRIORITY[5])
+    tags = []
+    if window['headshots'] == kills:
+        tags.append("headshot")
+        if kills >= 2:
+            priority += 1
+    elif window['best_streak'] >= HEADSHOT_STREAK:
+        tags.append("hs_streak")
+        priority += 1
+    if window['low_hp']:
+        tags.append("lowhp")
+        priority += 1
+    if window['special']:
+        tags.append(window['special'])
+        priority = max(priority + 1, SPECIAL_MIN_PRIORITY)
+    return min(priority, 10), "_".join([f"{kills}k"] + tags)
+
+
+def score_round(round_num, events):
+    """
+    Rate a round and build its highlights.
+
+    Args:
+        round_num: Round number
+        events: Events of the round in logged order
+
+    Returns:
+        tuple: (round score = best window priority, 0 without kills;
+                list of highlight dicts with start, end, label, priority, round)
+    """
+    highlights = []
+    for window in find_windows(events):
+        priority, label = rate_window(window)
+        start = max(0.0, window['first_kill_time'] - CLIP_LEAD)
+        end = max(window['last_kill_time'] + CLIP_TAIL, start + MIN_CLIP)
+        highlights.append({
+            "start": start,
+            "end": end,
+            "label": label,
+            "priority": priority,
+            "round": round_num
+        })
+    score = max((highlight['priority'] for highlight in highlights), default=0)
+    return score, highlights
+
+
+def prune_rounds(rounds, min_score):
+    """
+    Drop rounds whose score is below a threshold.
+
+    Args:
+        rounds: Round number -> events
+        min_score: Lowest round score kept (1 keeps every round with a kill)
+
+    Returns:
+        tuple: (kept rounds dict, list of pruned round numbers)
+    """
+    kept = {}
+    pruned = []
+    for round_num, events in rounds.items():
+        if score_round(round_num, events)[0] >= min_score:
+            kept[round_num] = events
+        else:
+            pruned.append(round_num)
+    return kept, pruned
+
+
+class RuleDirector:
+    """Offline director: highlights from the rule-based scorer, no LLM."""
+
+    def analyze_match_log(self, log_file_path):
+        """
+        Score every round of a match log.
+
+        Args:
+            log_file_path: Path to the match log (JSONL)
+
+        Returns:
+            list: Highlight segments in round order
+        """
+        rounds = {}
+        for event in iter_match_log(log_file_path):
+            rounds.setdefault(event.get('round', 0), []).append(event)
+
+        all_highlights = []
+        for round_num in sorted(rounds):
+            highlights = score_round(round_num, rounds[round_num])[1]
+            for h in highlights:
+                logger.info(f"  Round {round_num}: {h['label']} ({h['start']:.1f}s - {h['end']:.1f}s) "
+                            f"[Priority: {h['priority']}]")
+            all_highlights.extend(highlights)
+
+        logger.info(f"✓ Rule-based director identified {len(all_highlights)} highlight segments")
+        return all_highlights
+
+    def filter_highlights_by_priority(self, highlights, min_priority=6):
+        """
+        Filter highlights by minimum priority score.
+
+        Args:
+            highlights: List of highlight segments
+            min_priority: Minimum priority (1-10)
+
+        Returns:
+            list: Filtered highlights
+        """
+        filtered = [h for h in highlights if h.get('priority', 5) >= min_priority]
+        logger.info(f"Filtered to {len(filtered)}/{len(highlights)} highlights (min priority: {min_priority})")
+        return filtered
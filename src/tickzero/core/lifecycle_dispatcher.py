@@ -0,0 +1,200 @@
+"""
+LifecycleDispatcher: runs match lifecycle callbacks off the ingest thread.
+Callbacks (start/stop recording, database writes) run one at a time in the
+order they were dispatched and their latency is recorded, so a slow OBS or
+SQLite call never holds up a CS2 POST. A callback that overruns its timeout
+is reported, but the next one still waits for it: callbacks never overlap.
+"""
+import queue
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CallbackStats:
+    """Latency and outcome counters for one named callback."""
+
+    __slots__ = ('calls', 'errors', 'timeouts', 'total_ms', 'max_ms', 'last_ms', 'max_queue_ms')
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.max_queue_ms = 0.0  # Longest wait between dispatch and start
+
+    def to_dict(self):
+        """
+        Serialize the counters.
+
+        Returns:
+            dict: Call counts and latency in milliseconds
+        """
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "mean_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "max_ms": self.max_ms,
+            "last_ms": self.last_ms,
+            "max_queue_ms": self.max_queue_ms
+        }
+
+
+class LifecycleDispatcher:
+    """Ordered, timed execution of lifecycle callbacks on a dedicated thread."""
+
+    def __init__(self, timeout=30.0, inline=False):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            timeout: Seconds a callback may run before it is reported as timed
+                     out (the dispatcher keeps waiting for it before starting the
+                     next one, so a slow match_end never overlaps the next
+                     match_start)
+            inline: Run callbacks synchronously in dispatch() instead of on the
+                    dispatcher thread (deterministic, used for replays)
+        """
+        self.timeout = timeout
+        self.inline = inline
+        self.stats = {}  # callback name -> CallbackStats
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def dispatch(self, name, callback, on_done=None):
+        """
+        Schedule a callback.
+
+        Callbacks run in dispatch order: a match start dispatched before a
+        match end always starts first.
+
+        Args:
+            name: Name used for statistics and logging (e.g. "match_start")
+            callback: Callable taking no arguments
+            on_done: Optional callable run after the callback returned
+                     successfully (also when it returned after its timeout,
+                     not after an error)
+        """
+        if callback is None:
+            return
+        if self.inline:
+            self._run(name, callback, on_done, time.monotonic())
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="tickzero-lifecycle", daemon=True)
+                self._thread.start()
+        self._queue.put((name, callback, on_done, time.monotonic()))
+
+    def wait_idle(self, timeout=None):
+        """
+        Wait until every dispatched callback has finished.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if the dispatcher is idle
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=None):
+        """
+        Let pending callbacks finish, then stop the dispatcher thread.
+
+        Args:
+            timeout: Maximum seconds to wait (default: one callback timeout per
+                     pending callback)
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+
+        if timeout is None:
+            timeout = self.timeout * (self._queue.qsize() + 1)
+        self._queue.put(None)
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            logger.warning("⚠ Lifecycle callbacks still running at shutdown")
+
+    def get_stats(self):
+        """
+        Get per-callback statistics.
+
+        Returns:
+            dict: Callback name -> call count, errors, timeouts and latency
+        """
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def _worker(self):
+        """Dispatcher thread: run queued callbacks one at a time."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._run(*item)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, name, callback, on_done, dispatched_at):
+        """Run one callback with the timeout and record its latency."""
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = CallbackStats()
+
+        started = time.monotonic()
+        stats.max_queue_ms = max(stats.max_queue_ms, (started - dispatched_at) * 1000)
+        outcome = {}
+
+        def target():
+            try:
+                callback()
+                outcome['ok'] = True
+            except Exception as e:
+                outcome['error'] = e
+
+        if self.inline:
+            target()
+        else:
+            runner = threading.Thread(target=target, name=f"tickzero-{name}", daemon=True)
+            runner.start()
+            runner.join(timeout=self.timeout)
+            if runner.is_alive():
+                stats.timeouts += 1
+                logger.error(f"✗ {name} callback still running after {self.timeout:.0f}s, "
+                             f"holding back {self._queue.qsize()} queued callbacks until it returns")
+                runner.join()
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.last_ms = elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+        if 'error' in outcome:
+            stats.errors += 1
+            logger.error(f"✗ {name} callback failed: {outcome['error']}")
+        else:
+            logger.debug(f"{name} callback finished in {elapsed_ms:.1f}ms")
+            if on_done:
+                try:
+                    on_done()
+                except Exception as e:
+                    logger.error(f"✗ {name} completion handler failed: {e}")
@@ -0,0 +1,259 @@
+"""
+MatchLog: append-only streaming match log (JSON Lines).
+The first line is a header record with recording metadata; every following
+line is one game event, appended and flushed as soon as it is logged.
+"""
+import json
+import os
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = "tickzero-jsonl"
+LOG_FORMAT_VERSION = 1
+
+FSYNC_POLICIES = ("none", "interval", "event")
+PARTIAL_SUFFIX = ".partial"  # Atomic mode: in-progress log name until close
+
+
+class MatchLogWriter:
+    """Appends events to a JSONL match log with a configurable fsync policy."""
+
+    def __init__(self, path, fsync_policy="interval", fsync_interval=1.0, atomic=False):
+        """
+        Initialize the log writer.
+
+        Args:
+            path: Path of the log file
+            fsync_policy: "none" (flush to the OS only), "interval" (fsync at most
+                          every fsync_interval seconds) or "event" (fsync every event)
+            fsync_interval: Seconds between fsyncs with the "interval" policy
+            atomic: Write to "<path>.partial" and rename it to path on close, so
+                    the final path only ever holds a complete log
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy} (expected one of {FSYNC_POLICIES})")
+
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.atomic = atomic
+        self.write_path = path + PARTIAL_SUFFIX if atomic else path
+        self.file = None
+        self.event_count = 0
+        self._last_fsync = 0.0
+
+    @property
+    def is_open(self):
+        """Whether the log file is currently open for appending."""
+        return self.file is not None
+
+    def open(self, metadata=None):
+        """
+        Create (or truncate) the log file and write the header record.
+
+        Args:
+            metadata: Extra header fields (e.g. recording_start_time)
+        """
+        self.close()
+
+        header = {
+            "record": "header",
+            "format": LOG_FORMAT,
+            "version": LOG_FORMAT_VERSION,
+            "created": time.time()
+        }
+        header.update(metadata or {})
+
+        self.file = open(self.write_path, 'w', encoding='utf-8')
+        self.event_count = 0
+        self._write_line(header)
+        self._sync(force=True)
+
+    def append(self, event):
+        """
+        Append one event and flush it.
+
+        Args:
+            event: Event dictionary
+        """
+        if not self.file:
+            self.open()
+
+        self._write_line(event)
+        self.event_count += 1
+        self._sync()
+
+    def write_metadata(self, metadata):
+        """
+        Append a metadata record that updates the header fields.
+
+        Used when recording metadata (e.g. the recording start time) only
+        becomes known after the first events were logged.
+
+        Args:
+            metadata: Header fields to update
+        """
+        if not self.file:
+            self.open(metadata)
+            return
+
+        record = {"record": "metadata"}
+        record.update(metadata)
+        self._write_line(record)
+        self._sync()
+
+    def write_summary(self, summary):
+        """
+        Append the end-of-match summary record (per-round statistics).
+
+        Args:
+            summary: Summary fields (e.g. rounds, total_events, duration)
+        """
+        if not self.file:
+            self.open()
+
+        record = {"record": "summary"}
+        record.update(summary)
+        self._write_line(record)
+        self._sync(force=True)
+
+    def close(self):
+        """Flush, fsync and close the log file (and publish it in atomic mode)."""
+        if not self.file:
+            return
+        try:
+            self._sync(force=True)
+        finally:
+            self.file.close()
+            self.file = None
+        if self.atomic:
+            os.replace(self.write_path, self.path)
+
+    def _write_line(self, record):
+        """Serialize a record as a single line and flush it to the OS."""
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.file.flush()
+
+    def _sync(self, force=False):
+        """Apply the fsync policy."""
+        if self.fsync_policy == "none" and not force:
+            return
+
+        now = time.monotonic()
+        if force or self.fsync_policy == "event" or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self._last_fsync = now
+
+
+def _is_jsonl(path):
+    """Check whether a log file uses the JSONL format (vs a legacy JSON document)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        first_line = f.readline()
+    try:
+        record = json.loads(first_line)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(record, dict) and record.get('record') == 'header'
+
+
+def read_match_log_header(path):
+    """
+    Read the header record of a match log.
+
+    Later metadata records are merged into the header.
+
+    Args:
+        path: Path to the match log (JSONL, or legacy JSON document)
+
+    Returns:
+        dict: Header fields (recording metadata)
+    """
+    if _is_jsonl(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            for line in f:
+                # Only metadata records need decoding
+                if line.startswith('{"record":"metadata"'):
+                    try:
+                        header.update({k: v for k, v in json.loads(line).items() if k != 'record'})
+                    except json.JSONDecodeError:
+                        continue
+        return header
+
+    # Legacy format: everything except the events list
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {k: v for k, v in data.items() if k != 'events'}
+
+
+def iter_match_log(path):
+    """
+    Iterate over the events of a match log without loading the whole file.
+
+    A truncated final line (crash while writing) is skipped.
+
+    Args:
+        path: Path to the match log (JSONL, or legacy JSON document)
+
+    Yields:
+        dict: Events in the order they were logged
+    """
+    if not _is_jsonl(path):
+        # Legacy format: a single JSON document has to be loaded in full
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data.get('events', [])
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        f.readline()  # Header
+        for line_number, line in enumerate(f, start=2):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable line {line_number} in {path}")
+                continue
+            if 'record' in record:
+                continue  # Metadata record, not an event
+            yield record
+
+
+def read_match_log_summary(path, max_tail_bytes=4 * 1024 * 1024):
+    """
+    Read the end-of-match summary record without reading the events.
+
+    The summary is the last record of a finished log, so only the tail of
+    the file is read.
+
+    Args:
+        path: Path to the match log
+        max_tail_bytes: Give up if the summary is not within this many bytes
+
+    Returns:
+        dict: Summary (rounds, total_events, duration), or None if the log has
+              none (legacy format, or the match did not finish cleanly)
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        tail = 64 * 1024
+        while True:
+            tail = min(tail, size, max_tail_bytes)
+            f.seek(size - tail)
+            lines = f.read(tail).splitlines()
+            for line in reversed(lines):
+                if line.startswith(b'{"record":"summary"'):
+                    try:
+                        summary = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Line cut by the tail window; read more
+                    summary.pop('record', None)
+                    return summary
+            if tail >= size or tail >= max_tail_bytes:
+                return None
+            tail *= 2
@@ -0,0 +1,688 @@
+"""
+AsyncOBSClient: event-driven obs-websocket v5 client.
+Keeps one persistent WebSocket open on a background asyncio loop, pipelines
+requests by requestId and follows RecordStateChanged/RecordFileChanged and
+replay buffer events, so recording state, the output path and saved replay
+clips are pushed by OBS instead of polled.
+"""
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import threading
+import time
+import logging
+
+from .obs_health import ConnectionMonitor
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# obs-websocket v5 opcodes
+OP_HELLO = 0
+OP_IDENTIFY = 1
+OP_IDENTIFIED = 2
+OP_EVENT = 5
+OP_REQUEST = 6
+OP_REQUEST_RESPONSE = 7
+
+RPC_VERSION = 1
+EVENT_SUB_GENERAL = 1 << 0
+EVENT_SUB_OUTPUTS = 1 << 6  # RecordStateChanged, RecordFileChanged, ReplayBufferSaved
+
+# Request status codes we react to
+STATUS_OUTPUT_RUNNING = 500
+STATUS_OUTPUT_NOT_RUNNING = 501
+
+
+class OBSRequestError(Exception):
+    """OBS answered a request with requestStatus.result == false."""
+
+    def __init__(self, request_type, code, comment=None):
+        super().__init__(f"{request_type} failed ({code}): {comment or 'no comment'}")
+        self.request_type = request_type
+        self.code = code
+        self.comment = comment
+
+
+def auth_response(password, salt, challenge):
+    """
+    Compute the obs-websocket v5 authentication string.
+
+    Args:
+        password: Server password
+        salt: Salt from the Hello message
+        challenge: Challenge from the Hello message
+
+    Returns:
+        str: base64(sha256(base64(sha256(password + salt)) + challenge))
+    """
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode('utf-8')).digest()).decode('utf-8')
+    return base64.b64encode(hashlib.sha256((secret + challenge).encode('utf-8')).digest()).decode('utf-8')
+
+
+class AsyncOBSClient:
+    """
+    Persistent, pipelined obs-websocket v5 client.
+
+    Coroutines (request) run on the client's own event loop; the blocking
+    methods (start_recording, stop_recording, get_current_timestamp, ...) are
+    drop-in replacements for OBSClient/OBSManager and can be called from any
+    other thread.
+    """
+
+    def __init__(self, host="localhost", port=4455, password="", request_timeout=5.0,
+                 connect_retries=3, retry_delay=2.0, health_check_interval=2.0):
+        """
+        Initialize the client (not connected).
+
+        Args:
+            host: OBS WebSocket host
+            port: OBS WebSocket port (default: 4455 for OBS 28+)
+            password: WebSocket password if configured
+            request_timeout: Seconds to wait for a request's response
+            connect_retries: Extra connection attempts in connect()
+            retry_delay: Seconds between connection attempts
+            health_check_interval: Seconds between background pings once the
+                                   health monitor runs (started by the context manager)
+        """
+        if websockets is None:
+            raise ImportError("AsyncOBSClient requires the 'websockets' package (pip install websockets)")
+
+        self.host = host
+        self.port = port
+        self.password = password
+        self.request_timeout = request_timeout
+        self.retries = connect_retries
+        self.retry_delay = retry_delay
+        self.health_check_interval = health_check_interval
+        self.monitor = None
+
+        # Recording state, kept current by RecordStateChanged/RecordFileChanged
+        self.is_recording = False
+        self.is_paused = False
+        self.recording_start_time = None  # System time of the OBS_WEBSOCKET_OUTPUT_STARTED event
+        self.current_output_path = None  # File being written right now
+        self.last_recording_path = None  # File of the last finished recording
+        self.replay_buffer_active = False  # Kept current by ReplayBufferStateChanged
+        self.last_replay_path = None  # File of the last ReplayBufferSaved event
+
+        self.loop = None
+        self.thread = None
+        self.round_trips = 0  # Requests sent (for measuring control-path cost)
+        self._ws = None
+        self._reader = None
+        self._pending = {}  # requestId -> asyncio.Future
+        self._request_ids = itertools.count(1)
+        self._event_handlers = {}  # eventType -> [handler(event_data)]
+        self._recording_stopped = threading.Event()
+        self._replay_saved = threading.Event()
+        self._file_changed = threading.Event()
+
+    def __enter__(self):
+        """Context manager entry - establishes connection and starts the health monitor."""
+        self.connect()
+        self.start_health_monitor()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - closes connection."""
+        self.stop_health_monitor()
+        self.disconnect()
+
+    def start_health_monitor(self):
+        """
+        Supervise the connection from a background thread.
+
+        Lost connections are re-established with backoff in the background;
+        recording calls made while OBS is unreachable return immediately.
+        """
+        if self.monitor:
+            return
+        self._ensure_loop()
+        self.monitor = ConnectionMonitor(
+            connect=lambda: self._run(self._connect(), timeout=self.request_timeout * 2),
+            ping=lambda: self.call("GetVersion"),
+            on_down=lambda: self._run(self._close(), timeout=self.request_timeout),
+            interval=self.health_check_interval
+        )
+        self.monitor.start(connected=self.is_connected)
+
+    def stop_health_monitor(self):
+        """Stop the background health monitor (back to inline reconnects)."""
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor = None
+
+    def get_health_stats(self):
+        """
+        Get connection health statistics.
+
+        Returns:
+            dict: State, ping RTT histogram, reconnects and downtime (just the
+                  state when the monitor is not running)
+        """
+        if not self.monitor:
+            return {"state": "connected" if self.is_connected else "disconnected"}
+        return self.monitor.get_stats()
+
+    @property
+    def is_connected(self):
+        """Whether the WebSocket is identified and open."""
+        return self._ws is not None
+
+    def connect(self):
+        """
+        Connect and identify, with retries.
+
+        Returns:
+            bool: True if connected
+        """
+        if self.is_connected:
+            return True
+        self._ensure_loop()
+
+        for attempt in range(1, self.retries + 2):
+            try:
+                self._run(self._connect(), timeout=self.request_timeout * 2)
+                logger.info(f"✓ Connected to OBS WebSocket at {self.host}:{self.port} (async client)")
+                return True
+            except Exception as e:
+                logger.warning(f"Failed to connect to OBS (attempt {attempt}): {e}")
+                if attempt <= self.retries:
+                    time.sleep(self.retry_delay)
+
+        logger.error("✗ Could not connect to OBS after multiple attempts")
+        return False
+
+    def ensure_connection(self):
+        """
+        Reconnect if the connection was lost.
+
+        Returns:
+            bool: True if connected
+        """
+        if self.is_connected:
+            return True
+        if self.monitor:
+            # Never block the caller; the monitor is already reconnecting
+            self.monitor.reject()
+            return False
+        logger.info("Connection lost, attempting to reconnect...")
+        return self.connect()
+
+    def disconnect(self):
+        """Close the WebSocket and stop the event loop thread."""
+        if not self.loop:
+            return
+        try:
+            self._run(self._close(), timeout=self.request_timeout)
+        except Exception as e:
+            logger.error(f"Error disconnecting from OBS: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+        self.loop = None
+        self.thread = None
+        logger.info("Disconnected from OBS")
+
+    def on_event(self, event_type, handler):
+        """
+        Subscribe to a pushed OBS event.
+
+        Handlers run on the client's event loop thread and must not block
+        (and must not call the blocking methods of this client).
+
+        Args:
+            event_type: obs-websocket event type (e.g. "RecordStateChanged")
+            handler: Callable taking the eventData dict
+        """
+        self._event_handlers.setdefault(event_type, []).append(handler)
+
+    async def request(self, request_type, request_data=None):
+        """
+        Send a request and wait for its response (coroutine, client loop only).
+
+        Any number of requests may be in flight at once; responses are matched
+        by requestId.
+
+        Args:
+            request_type: obs-websocket request type (e.g. "GetRecordStatus")
+            request_data: Optional requestData dict
+
+        Returns:
+            dict: responseData (empty if the request returns none)
+
+        Raises:
+            OBSRequestError: If OBS rejected the request
+            ConnectionError: If the connection is not open or drops
+        """
+        if self._ws is None:
+            raise ConnectionError("Not connected to OBS")
+
+        request_id = str(next(self._request_ids))
+        future = self.loop.create_future()
+        self._pending[request_id] = future
+        message = {"requestType": request_type, "requestId": request_id}
+        if request_data:
+            message["requestData"] = request_data
+        try:
+            await self._ws.send(json.dumps({"op": OP_REQUEST, "d": message}))
+            self.round_trips += 1
+            return await asyncio.wait_for(future, timeout=self.request_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def call_nowait(self, request_type, request_data=None):
+        """
+        Pipeline a request from another thread without waiting for it.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the responseData dict
+        """
+        self._check_caller_thread()
+        if not self.loop:
+            raise ConnectionError("Not connected to OBS")
+        return asyncio.run_coroutine_threadsafe(self.request(request_type, request_data), self.loop)
+
+    def call(self, request_type, request_data=None):
+        """
+        Send a request from another thread and block for the response.
+
+        Returns:
+            dict: responseData
+        """
+        return self.call_nowait(request_type, request_data).result(timeout=self.request_timeout + 1.0)
+
+    def start_recording(self):
+        """
+        Start recording: one round trip, none if OBS already reported it recording.
+        The start time is kept in recording_start_time.
+
+        Returns:
+            bool: True if recording started or was already active, False on error
+        """
+        if not self.ensure_connection():
+            return False
+        if self.is_recording:
+            logger.info("OBS is already recording")
+            return True
+
+        self.recording_start_time = None
+        try:
+            self.call("StartRecord")
+        except OBSRequestError as e:
+            if e.code != STATUS_OUTPUT_RUNNING:
+                logger.error(f"✗ Failed to start recording: {e}")
+                return False
+            logger.info("OBS is already recording")
+        except Exception as e:
+            logger.error(f"✗ Failed to start recording: {e}")
+            return False
+
+        self.is_recording = True
+        self._recording_stopped.clear()
+        if self.recording_start_time is None:
+            # Provisional until the OUTPUT_STARTED event refines it
+            self.recording_start_time = time.time()
+        logger.info("✓ OBS recording started")
+        return True
+
+    def stop_recording(self):
+        """
+        Stop recording: one round trip; StopRecord returns the output path.
+
+        Returns:
+            str: Path of the finished recording, None if not recording, on error
+                 or if OBS did not report one
+        """
+        if not self.ensure_connection():
+            return None
+        if not self.is_recording:
+            logger.warning("OBS is not recording, nothing to stop")
+            return None
+
+        try:
+            response = self.call("StopRecord")
+        except OBSRequestError as e:
+            if e.code != STATUS_OUTPUT_NOT_RUNNING:
+                logger.error(f"✗ Failed to stop recording: {e}")
+                return None
+            response = {}
+        except Exception as e:
+            logger.error(f"✗ Failed to stop recording: {e}")
+            return None
+
+        self.is_recording = False
+        self.is_paused = False
+        path = response.get('outputPath')
+        if path:
+            self.last_recording_path = path
+            logger.info(f"✓ OBS recording stopped: {path}")
+        else:
+            logger.warning("⚠ OBS recording stopped without reporting an output path")
+        return path
+
+    def pause_recording(self):
+        """
+        Pause the recording: one round trip, none if OBS reported it paused.
+
+        Returns:
+            bool: True if the recording is paused
+        """
+        return self._set_paused(True)
+
+    def resume_recording(self):
+        """
+        Resume the recording: one round trip, none if OBS reported it running.
+
+        Returns:
+            bool: True if the recording is running
+        """
+        return self._set_paused(False)
+
+    def _set_paused(self, paused):
+        """Send PauseRecord/ResumeRecord unless the pushed state already matches."""
+        if not self.ensure_connection() or not self.is_recording:
+            return False
+        if self.is_paused == paused:
+            return True
+        try:
+            self.call("PauseRecord" if paused else "ResumeRecord")
+        except Exception as e:
+            logger.error(f"✗ Failed to {'pause' if paused else 'resume'} recording: {e}")
+            return False
+        self.is_paused = paused
+        return True
+
+    def split_recording(self, timeout=5.0):
+        """
+        Close the current recording file and continue in a new one
+        (SplitRecordFile, obs-websocket 5.5+).
+
+        Args:
+            timeout: Seconds to wait for the RecordFileChanged event
+
+        Returns:
+            str: Path of the new file, None if not recording, on error or timeout
+        """
+        if not self.ensure_connection() or not self.is_recording:
+            return None
+        self._file_changed.clear()
+        try:
+            self.call("SplitRecordFile")
+        except Exception as e:
+            logger.error(f"✗ Failed to split recording: {e}")
+            return None
+        if not self._file_changed.wait(timeout):
+            logger.warning("⚠ OBS did not report a new recording file")
+            return None
+        return self.current_output_path
+
+    def start_replay_buffer(self):
+        """
+        Start the OBS replay buffer.
+
+        Returns:
+            bool: True if the replay buffer started or was already active
+        """
+        if not self.ensure_connection():
+            return False
+        try:
+            self.call("StartReplayBuffer")
+        except OBSRequestError as e:
+            if e.code != STATUS_OUTPUT_RUNNING:
+                logger.error(f"✗ Failed to start replay buffer (is it enabled in OBS output settings?): {e}")
+                return False
+        except Exception as e:
+            logger.error(f"✗ Failed to start replay buffer: {e}")
+            return False
+        self.replay_buffer_active = True
+        logger.info("✓ OBS replay buffer started")
+        return True
+
+    def stop_replay_buffer(self):
+        """
+        Stop the OBS replay buffer.
+
+        Returns:
+            bool: True if the replay buffer was stopped or not running
+        """
+        if not self.ensure_connection():
+            return False
+        try:
+            self.call("StopReplayBuffer")
+        except OBSRequestError as e:
+            if e.code != STATUS_OUTPUT_NOT_RUNNING:
+                logger.error(f"✗ Failed to stop replay buffer: {e}")
+                return False
+        except Exception as e:
+            logger.error(f"✗ Failed to stop replay buffer: {e}")
+            return False
+        self.replay_buffer_active = False
+        logger.info("✓ OBS replay buffer stopped")
+        return True
+
+    def save_replay_buffer(self, timeout=5.0):
+        """
+        Save the replay buffer: one round trip, then wait for ReplayBufferSaved.
+
+        Args:
+            timeout: Seconds to wait for OBS to finish writing the clip
+
+        Returns:
+            str: Path of the saved clip, None on error or timeout
+        """
+        if not self.ensure_connection():
+            return None
+        self._replay_saved.clear()
+        try:
+            self.call("SaveReplayBuffer")
+        except Exception as e:
+            logger.error(f"✗ Failed to save replay buffer: {e}")
+            return None
+        if not self._replay_saved.wait(timeout):
+            logger.warning("⚠ OBS did not report the saved replay in time")
+            return None
+        logger.info(f"✓ Replay buffer saved: {self.last_replay_path}")
+        return self.last_replay_path
+
+    def wait_for_recording_stopped(self, timeout=10.0):
+        """
+        Block until OBS reports the recording output fully stopped (file closed).
+
+        Returns:
+            bool: True if the stop event arrived within the timeout
+        """
+        return self._recording_stopped.wait(timeout)
+
+    def get_current_timestamp(self, unavailable=0):
+        """
+        Get the recording position from OBS.
+
+        Args:
+            unavailable: Value returned when OBS cannot be reached (default 0;
+                         pass None to tell "unreachable" apart from "not recording")
+
+        Returns:
+            int: outputDuration in milliseconds, 0 if not recording (no round trip)
+        """
+        if not self.is_recording:
+            return 0
+        if not self.ensure_connection():
+            return unavailable
+        try:
+            return self.call("GetRecordStatus").get('outputDuration', 0)
+        except Exception as e:
+            logger.error(f"Error getting timestamp: {e}")
+            return unavailable
+
+    def get_last_recording_path(self):
+        """Get the path to the last recorded file (pushed by OBS, never guessed)."""
+        if not self.last_recording_path:
+            logger.warning("Recording path not available yet (no recording has finished)")
+        return self.last_recording_path
+
+    def get_recording_status(self):
+        """
+        Get the recording status from the event-driven state (no round trip).
+
+        Returns:
+            dict: Recording status information
+        """
+        return {
+            "is_recording": self.is_recording,
+            "recording_paused": self.is_paused,
+            "start_time": self.recording_start_time,
+            "output_path": self.current_output_path
+        }
+
+    def calculate_video_timestamp(self, event_time):
+        """
+        Convert a system timestamp to seconds from the recording start.
+
+        Args:
+            event_time: System timestamp (time.time()) of the event
+
+        Returns:
+            float: Video timestamp, 0.0 if not recording
+        """
+        if not self.recording_start_time:
+            return 0.0
+        return max(0.0, event_time - self.recording_start_time)
+
+    def _ensure_loop(self):
+        """Start the background event loop thread if needed."""
+        if self.loop:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="tickzero-obs", daemon=True)
+        self.thread.start()
+
+    def _check_caller_thread(self):
+        if self.thread is not None and threading.current_thread() is self.thread:
+            raise RuntimeError("Blocking AsyncOBSClient calls are not allowed on its event loop; await request()")
+
+    def _run(self, coro, timeout):
+        """Run a coroutine on the client loop from another thread."""
+        self._check_caller_thread()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout=timeout)
+
+    async def _connect(self):
+        """Open the socket, identify and read the initial recording state."""
+        ws = await websockets.connect(f"ws://{self.host}:{self.port}", subprotocols=["obswebsocket.json"],
+                                      max_size=None)
+        try:
+            hello = json.loads(await ws.recv())
+            if hello.get('op') != OP_HELLO:
+                raise ConnectionError(f"Expected Hello, got op {hello.get('op')}")
+
+            identify = {"rpcVersion": RPC_VERSION, "eventSubscriptions": EVENT_SUB_GENERAL | EVENT_SUB_OUTPUTS}
+            auth = hello['d'].get('authentication')
+            if auth:
+                identify["authentication"] = auth_response(self.password, auth['salt'], auth['challenge'])
+            await ws.send(json.dumps({"op": OP_IDENTIFY, "d": identify}))
+
+            identified = json.loads(await ws.recv())
+            if identified.get('op') != OP_IDENTIFIED:
+                raise ConnectionError("OBS did not accept Identify (wrong password?)")
+        except Exception:
+            await ws.close()
+            raise
+
+        self._ws = ws
+        self._reader = asyncio.create_task(self._read_loop(ws))
+
+        # One request for the initial state; events keep it current from here on
+        status = await self.request("GetRecordStatus")
+        self.is_recording = bool(status.get('outputActive'))
+        self.is_paused = bool(status.get('outputPaused'))
+        if self.is_recording and self.recording_start_time is None:
+            self.recording_start_time = time.time() - status.get('outputDuration', 0) / 1000.0
+
+    async def _close(self):
+        """Close the socket and wait for the reader to finish."""
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            await ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+
+    async def _read_loop(self, ws):
+        """Dispatch responses to waiting requests and events to handlers."""
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                op = message.get('op')
+                data = message.get('d', {})
+                if op == OP_REQUEST_RESPONSE:
+                    self._resolve(data)
+                elif op == OP_EVENT:
+                    self._handle_event(data.get('eventType'), data.get('eventData') or {})
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"OBS WebSocket reader failed: {e}")
+        finally:
+            if self._ws is ws:
+                self._ws = None
+                logger.warning("⚠ OBS WebSocket connection closed")
+                if self.monitor:
+                    self.monitor.report_failure()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("OBS connection closed"))
+            self._pending.clear()
+
+    def _resolve(self, data):
+        """Complete the future of a request response."""
+        future = self._pending.get(data.get('requestId'))
+        if future is None or future.done():
+            return
+        status = data.get('requestStatus', {})
+        if status.get('result'):
+            future.set_result(data.get('responseData') or {})
+        else:
+            future.set_exception(OBSRequestError(data.get('requestType'), status.get('code'), status.get('comment')))
+
+    def _handle_event(self, event_type, event_data):
+        """Update recording state from pushed events, then run subscribers."""
+        if event_type == "RecordStateChanged":
+            state = event_data.get('outputState')
+            if state == "OBS_WEBSOCKET_OUTPUT_STARTED":
+                self.is_recording = True
+                self.is_paused = False
+                self.recording_start_time = time.time()
+                self.current_output_path = event_data.get('outputPath') or self.current_output_path
+                self._recording_stopped.clear()
+            elif state == "OBS_WEBSOCKET_OUTPUT_STOPPED":
+                self.is_recording = False
+                self.is_paused = False
+                self.last_recording_path = event_data.get('outputPath') or self.current_output_path
+                self.current_output_path = None
+                self._recording_stopped.set()
+            elif state == "OBS_WEBSOCKET_OUTPUT_PAUSED":
+                self.is_paused = True
+            elif state == "OBS_WEBSOCKET_OUTPUT_RESUMED":
+                self.is_paused = False
+        elif event_type == "RecordFileChanged":
+            self.current_output_path = event_data.get('newOutputPath')
+            self._file_changed.set()
+        elif event_type == "ReplayBufferStateChanged":
+            self.replay_buffer_active = bool(event_data.get('outputActive'))
+        elif event_type == "ReplayBufferSaved":
+            self.last_replay_path = event_data.get('savedReplayPath')
+            self._replay_saved.set()
+
+        for handler in self._event_handlers.get(event_type, ()):
+            try:
+                handler(event_data)
+            except Exception as e:
+                logger.error(f"OBS event handler for {event_type} failed: {e}")
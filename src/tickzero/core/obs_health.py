@@ -0,0 +1,243 @@
+"""
+ConnectionMonitor: background health checks and reconnection for the OBS link.
+Pings on a fixed interval, records round-trip times in a histogram and
+reconnects with exponential backoff, so callers on the GSI hot path only
+check a flag instead of reconnecting inline.
+"""
+import bisect
+import random
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the RTT histogram buckets; the last bucket is open-ended
+RTT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+
+class RTTHistogram:
+    """Fixed-bucket histogram of round-trip times."""
+
+    def __init__(self, bounds=RTT_BUCKETS_MS):
+        """
+        Create an empty histogram.
+
+        Args:
+            bounds: Sorted bucket upper bounds in milliseconds
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, rtt_ms):
+        """Record one round trip."""
+        self.counts[bisect.bisect_left(self.bounds, rtt_ms)] += 1
+        self.count += 1
+        self.total_ms += rtt_ms
+        self.max_ms = max(self.max_ms, rtt_ms)
+
+    def percentile(self, pct):
+        """
+        Approximate a percentile as the upper bound of its bucket.
+
+        Returns:
+            float: RTT in milliseconds (max_ms for the open-ended bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(self.bounds[i]) if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        """
+        Serialize the histogram.
+
+        Returns:
+            dict: Bucket labels ("<=5ms", ">2000ms") -> counts, plus summary values
+        """
+        buckets = {f"<={bound}ms": n for bound, n in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "buckets": buckets
+        }
+
+
+class ConnectionMonitor:
+    """Supervisor thread that keeps a connection alive."""
+
+    def __init__(self, connect, ping, on_down=None, interval=2.0, backoff_initial=0.5, backoff_max=30.0,
+                 name="OBS"):
+        """
+        Initialize the monitor.
+
+        Args:
+            connect: Callable that (re)connects and raises on failure
+            ping: Callable doing one lightweight round trip; raises on failure
+            on_down: Optional callable run when the connection is found dead
+                     (e.g. to drop the broken socket)
+            interval: Seconds between pings while connected
+            backoff_initial: First reconnect delay in seconds
+            backoff_max: Upper bound of the exponential reconnect delay
+            name: Name used in log messages and the thread name
+        """
+        self.connect = connect
+        self.ping = ping
+        self.on_down = on_down
+        self.interval = interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.name = name
+
+        self.state = "disconnected"  # "connected", "reconnecting", "disconnected"
+        self.rtt = RTTHistogram()
+        self.last_rtt_ms = None
+        self.pings = 0
+        self.ping_failures = 0
+        self.reconnects = 0  # Successful reconnections
+        self.reconnect_attempts = 0
+        self.unavailable_calls = 0  # Hot-path calls answered "unavailable"
+        self.downtime = 0.0  # Seconds spent disconnected since start
+        self._down_since = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    @property
+    def available(self):
+        """Whether the connection is currently believed healthy."""
+        return self.state == "connected"
+
+    def start(self, connected=False):
+        """
+        Start the supervisor thread.
+
+        Args:
+            connected: Whether the caller already established the connection
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        if connected:
+            self.state = "connected"
+        else:
+            self._mark_down()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"tickzero-{self.name.lower()}-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the supervisor thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def report_failure(self):
+        """
+        Tell the monitor a call on the connection just failed.
+
+        The next health check runs immediately instead of after the interval.
+        """
+        self._wake.set()
+
+    def reject(self):
+        """Count a hot-path call that was answered "unavailable"."""
+        self.unavailable_calls += 1
+
+    def get_stats(self):
+        """
+        Get connection health statistics.
+
+        Returns:
+            dict: State, ping/reconnect counters, downtime and the RTT histogram
+        """
+        downtime = self.downtime
+        if self._down_since is not None:
+            downtime += time.monotonic() - self._down_since
+        return {
+            "state": self.state,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "reconnects": self.reconnects,
+            "reconnect_attempts": self.reconnect_attempts,
+            "unavailable_calls": self.unavailable_calls,
+            "downtime_s": downtime,
+            "last_rtt_ms": self.last_rtt_ms,
+            "rtt": self.rtt.to_dict()
+        }
+
+    def _run(self):
+        """Ping while connected, reconnect with backoff while not."""
+        delay = self.backoff_initial
+        while not self._stop.is_set():
+            if self.state == "connected":
+                delay = self.backoff_initial
+                self._sleep(self.interval)
+                if not self._stop.is_set():
+                    self._check()
+                continue
+
+            self.state = "reconnecting"
+            self.reconnect_attempts += 1
+            try:
+                self.connect()
+            except Exception as e:
+                logger.debug(f"{self.name} reconnect failed: {e}")
+                # Exponential backoff with jitter so retries don't synchronize
+                self._sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.backoff_max)
+                continue
+
+            self.reconnects += 1
+            self._mark_up()
+            logger.info(f"✓ {self.name} connection restored")
+
+    def _check(self):
+        """Run one ping and record its round-trip time."""
+        start = time.perf_counter()
+        try:
+            self.ping()
+        except Exception as e:
+            self.ping_failures += 1
+            logger.warning(f"⚠ {self.name} health check failed: {e}")
+            self._mark_down()
+            return
+        self.last_rtt_ms = (time.perf_counter() - start) * 1000
+        self.rtt.add(self.last_rtt_ms)
+        self.pings += 1
+
+    def _sleep(self, seconds):
+        """Wait, waking early on stop() or report_failure()."""
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _mark_down(self):
+        if self.state == "connected" and self.on_down:
+            try:
+                self.on_down()
+            except Exception as e:
+                logger.debug(f"{self.name} on_down handler failed: {e}")
+        self.state = "disconnected"
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+
+    def _mark_up(self):
+        self.state = "connected"
+        if self._down_since is not None:
+            self.downtime += time.monotonic() - self._down_since
+            self._down_since = None
@@ -2,14 +2,18 @@
 OBSManager: Handles OBS WebSocket connection and recording control.
 Captures precise recording start timestamp for video synchronization.
 """
+import threading
 import time
 from datetime import datetime
-from obswebsocket import obsws, requests as obs_requests
+from obswebsocket import obsws, events as obs_events, requests as obs_requests
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds start_recording() waits for OBS to report the new recording file
+OUTPUT_STARTED_TIMEOUT = 2.0
+
 
 class OBSManager:
     """Manages OBS WebSocket connection and recording operations."""
@@ -30,12 +34,17 @@ class OBSManager:
         self.recording_start_time = None  # System timestamp when recording started (T=0)
         self.is_recording = False
         self.last_recording_path = None  # Path to last recorded file
+        self.current_output_path = None  # File being written right now (RecordStateChanged/RecordFileChanged)
+        self._file_changed = threading.Event()  # Set by RecordFileChanged
+        self._output_started = threading.Event()  # Set by RecordStateChanged(STARTED)
         
     def connect(self):
         """Establish connection to OBS WebSocket."""
         try:
             self.ws = obsws(self.host, self.port, self.password)
             self.ws.connect()
+            self.ws.register(self._on_record_state_changed, obs_events.RecordStateChanged)
+            self.ws.register(self._on_record_file_changed, obs_events.RecordFileChanged)
             logger.info(f"✓ Connected to OBS WebSocket at {self.host}:{self.port}")
             return True
         except Exception as e:
@@ -62,12 +71,15 @@ class OBSManager:
             if status.getOutputActive():
                 logger.warning("Recording already in progress")
                 self.is_recording = True
+                if not self.current_output_path and isinstance(status.datain, dict):
+                    self.current_output_path = status.datain.get('outputPath')
                 # If we don't have a start time, use current time as reference
                 if not self.recording_start_time:
                     self.recording_start_time = time.time()
                 return self.recording_start_time
             
             # Start recording
+            self._output_started.clear()
             self.ws.call(obs_requests.StartRecord())
             
             # Capture the EXACT moment recording started
@@ -75,6 +87,10 @@ class OBSManager:
             self.recording_start_time = time.time()
             self.is_recording = True
             
+            # The output path arrives with the STARTED event, shortly after the response
+            if not self._output_started.wait(OUTPUT_STARTED_TIMEOUT):
+                logger.debug("OBS did not report the recording file yet")
+            
             logger.info(f"✓ Recording started at {datetime.fromtimestamp(self.recording_start_time).strftime('%H:%M:%S.%f')}")
             logger.info(f"  Reference timestamp (T=0): {self.recording_start_time}")
             
@@ -135,6 +151,147 @@ class OBSManager:
             logger.error(f"✗ Failed to stop recording: {e}")
             return False
     
+    def pause_recording(self):
+        """
+        Pause the recording (OBS stops the recording clock while paused).
+        
+        Returns:
+            bool: True if the recording was paused
+        """
+        try:
+            response = self.ws.call(obs_requests.PauseRecord())
+        except Exception as e:
+            logger.error(f"✗ Failed to pause recording: {e}")
+            return False
+        if response.status is False:
+            logger.error(f"✗ OBS refused to pause the recording: {response.datain}")
+            return False
+        return True
+    
+    def resume_recording(self):
+        """
+        Resume a paused recording.
+        
+        Returns:
+            bool: True if the recording was resumed
+        """
+        try:
+            response = self.ws.call(obs_requests.ResumeRecord())
+        except Exception as e:
+            logger.error(f"✗ Failed to resume recording: {e}")
+            return False
+        if response.status is False:
+            logger.error(f"✗ OBS refused to resume the recording: {response.datain}")
+            return False
+        return True
+    
+    def split_recording(self, timeout=5.0):
+        """
+        Close the current recording file and continue in a new one
+        (SplitRecordFile, OBS 30+ / obs-websocket 5.5+).
+        
+        Args:
+            timeout: Seconds to wait for the RecordFileChanged event
+            
+        Returns:
+            str: Path of the new file, None if not recording, on error or timeout
+        """
+        if not self.is_recording:
+            return None
+        self._file_changed.clear()
+        try:
+            response = self.ws.call(obs_requests.SplitRecordFile())
+        except Exception as e:
+            logger.error(f"✗ Failed to split recording: {e}")
+            return None
+        if response.status is False:
+            logger.error(f"✗ OBS refused to split the recording (needs OBS 30+ / obs-websocket 5.5+): {response.datain}")
+            return None
+        if not self._file_changed.wait(timeout):
+            logger.warning("⚠ OBS did not report a new recording file")
+            return None
+        return self.current_output_path
+    
+    def _on_record_state_changed(self, event):
+        """Track the file being written from RecordStateChanged."""
+        state = event.datain.get('outputState')
+        if state == "OBS_WEBSOCKET_OUTPUT_STARTED":
+            self.current_output_path = event.datain.get('outputPath') or self.current_output_path
+            self._output_started.set()
+        elif state == "OBS_WEBSOCKET_OUTPUT_STOPPED":
+            self.last_recording_path = event.datain.get('outputPath') or self.last_recording_path
+            self.current_output_path = None
+    
+    def _on_record_file_changed(self, event):
+        """Track the new file after a split from RecordFileChanged."""
+        self.current_output_path = event.datain.get('newOutputPath')
+        self._file_changed.set()
+    
+    def start_replay_buffer(self):
+        """
+        Start the OBS replay buffer (must be enabled in OBS output settings).
+        
+        Returns:
+            bool: True if the replay buffer started or was already active
+        """
+        try:
+            status = self.ws.call(obs_requests.GetReplayBufferStatus())
+            if not status.getOutputActive():
+                self.ws.call(obs_requests.StartReplayBuffer())
+            logger.info("✓ Replay buffer active")
+            return True
+        except Exception as e:
+            logger.error(f"✗ Failed to start replay buffer: {e}")
+            return False
+    
+    def stop_replay_buffer(self):
+        """Stop the OBS replay buffer."""
+        try:
+            self.ws.call(obs_requests.StopReplayBuffer())
+            logger.info("✓ Replay buffer stopped")
+            return True
+        except Exception as e:
+            logger.error(f"✗ Failed to stop replay buffer: {e}")
+            return False
+    
+    def save_replay_buffer(self, timeout=5.0):
+        """
+        Save the replay buffer and wait for OBS to report the new clip.
+        
+        Args:
+            timeout: Seconds to wait for the saved file
+            
+        Returns:
+            str: Path of the saved clip, None on error or timeout
+        """
+        try:
+            previous = self._last_replay_path()
+            self.ws.call(obs_requests.SaveReplayBuffer())
+            
+            # OBS writes the clip asynchronously: poll until the path changes
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                path = self._last_replay_path()
+                if path and path != previous:
+                    logger.info(f"✓ Replay saved to: {path}")
+                    return path
+                time.sleep(0.1)
+            logger.warning("⚠ OBS did not report the saved replay in time")
+            return None
+        except Exception as e:
+            logger.error(f"✗ Failed to save replay buffer: {e}")
+            return None
+    
+    def _last_replay_path(self):
+        """Path of the last saved replay (None before the first save)."""
+        try:
+            response = self.ws.call(obs_requests.GetLastReplayBufferReplay())
+        except Exception:
+            return None
+        if hasattr(response, 'datain') and isinstance(response.datain, dict):
+            return response.datain.get('savedReplayPath')
+        return None
+    
     def get_last_recording_path(self):
         """Get the path to the last recorded file."""
         if not self.last_recording_path:
@@ -0,0 +1,126 @@
+"""
+PauseTimeMap: wall-clock to video position mapping for a paused recording.
+OBS stops the recording clock while paused, so an event's position in the
+file is its time since the recording started minus every pause before it.
+"""
+import bisect
+import threading
+
+
+class PauseTimeMap:
+    """Pause intervals of one recording, in system time."""
+
+    def __init__(self, start_time=None):
+        """
+        Create a map.
+
+        Args:
+            start_time: System time the recording started (None until known)
+        """
+        self.start_time = start_time
+        self._pause_starts = []  # System time of each pause, ascending
+        self._resumes = []  # Matching resume times (None while paused)
+        self._paused_before = []  # Total paused seconds before each pause
+        self._lock = threading.Lock()
+
+    @property
+    def is_paused(self):
+        """Whether the last pause has not been resumed yet."""
+        return bool(self._resumes) and self._resumes[-1] is None
+
+    def reset(self, start_time):
+        """
+        Anchor the map to a new recording.
+
+        Args:
+            start_time: System time the recording started
+        """
+        with self._lock:
+            self.start_time = start_time
+            self._pause_starts = []
+            self._resumes = []
+            self._paused_before = []
+
+    def pause(self, wall_time):
+        """Record that the recording was paused at wall_time (ignored if already paused)."""
+        with self._lock:
+            if self.is_paused:
+                return
+            self._paused_before.append(self._total_paused())
+            self._pause_starts.append(wall_time)
+            self._resumes.append(None)
+
+    def resume(self, wall_time):
+        """Record that the recording was resumed at wall_time (ignored if not paused)."""
+        with self._lock:
+            if self.is_paused:
+                self._resumes[-1] = max(wall_time, self._pause_starts[-1])
+
+    def paused_seconds(self, wall_time=None):
+        """
+        Total paused time.
+
+        Args:
+            wall_time: Count an open pause up to this time (default: closed pauses only)
+
+        Returns:
+            float: Seconds the recording was paused
+        """
+        with self._lock:
+            total = self._total_paused()
+            if self.is_paused and wall_time is not None:
+                total += max(0.0, wall_time - self._pause_starts[-1])
+            return total
+
+    def video_time_at(self, wall_time):
+        """
+        Position in the recording of an event.
+
+        Events that happened while paused map to the point where the
+        recording was paused (the next frame in the file).
+
+        Args:
+            wall_time: System time (time.time()) of the event
+
+        Returns:
+            float: Seconds into the recording, None if the map is not anchored
+        """
+        with self._lock:
+            if self.start_time is None:
+                return None
+            elapsed = wall_time - self.start_time
+            i = bisect.bisect_right(self._pause_starts, wall_time) - 1
+            if i < 0:
+                return max(0.0, elapsed)
+
+            pause_start = self._pause_starts[i]
+            resume = self._resumes[i]
+            paused = self._paused_before[i]
+            if resume is None or wall_time < resume:
+                return max(0.0, pause_start - self.start_time - paused)
+            return max(0.0, elapsed - paused - (resume - pause_start))
+
+    def to_list(self):
+        """
+        Serialize the pauses.
+
+        Returns:
+            list: Dicts with the video position of each pause and its duration
+                  in seconds (None while still paused)
+        """
+        with self._lock:
+            if self.start_time is None:
+                return []
+            return [{
+                "video_time": pause_start - self.start_time - paused,
+                "duration": resume - pause_start if resume is not None else None
+            } for pause_start, resume, paused in zip(self._pause_starts, self._resumes, self._paused_before)]
+
+    def _total_paused(self):
+        """Seconds of closed pauses (caller holds the lock)."""
+        if not self._resumes:
+            return 0.0
+        last = self._paused_before[-1]
+        if self._resumes[-1] is None:
+            return last
+        return last + self._resumes[-1] - self._pause_starts[-1]
@@ -0,0 +1,223 @@
+"""
+RateLimiter: token-bucket limits for LLM requests and tokens per minute.
+Concurrent callers wait for both the request and the token budget before each
+call, so a burst of round analyses stays inside the API quota instead of
+collecting 429 errors. A 429 that still gets through pauses every caller for
+the delay the API asks for.
+"""
+import logging
+import re
+import threading
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Gemini API free-tier quotas: model -> (requests per minute, tokens per minute)
+FREE_TIER_QUOTAS = {
+    'gemini-2.5-pro': (5, 250_000),
+    'gemini-2.5-flash': (10, 250_000),
+    'gemini-2.5-flash-lite': (15, 250_000),
+    'gemini-2.0-flash': (15, 1_000_000),
+    'gemini-2.0-flash-lite': (30, 1_000_000),
+}
+DEFAULT_QUOTA = (10, 250_000)
+
+# Share of a minute's budget that may be spent at once
+BURST_FRACTION = 0.1
+
+# HTTP status codes worth retrying (rate limited, server busy or failing)
+RETRYABLE_CODES = (429, 500, 502, 503, 504)
+
+_RETRY_DELAY = re.compile(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s")
+
+
+class TokenBucket:
+    """Continuously refilled budget that never allows more than its limit per minute."""
+
+    def __init__(self, per_minute, burst=None):
+        """
+        Create a bucket.
+
+        The bucket holds at most burst units and refills with per_minute - burst
+        units per minute, so no 60 second window sees more than per_minute.
+
+        Args:
+            per_minute: Limit per minute
+            burst: Units available at once (default: BURST_FRACTION of the
+                   limit, at least 1)
+        """
+        self.per_minute = per_minute
+        self.capacity = burst if burst is not None else max(1.0, per_minute * BURST_FRACTION)
+        self.rate = max(per_minute - self.capacity, per_minute * BURST_FRACTION) / 60.0  # Units per second
+        self.level = self.capacity
+        self.updated = None
+
+    def refill(self, now):
+        """Add the units earned since the last update."""
+        if self.updated is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """
+        Seconds until amount can be taken (after refill).
+
+        Amounts above the capacity only wait for a full bucket and leave it in
+        debt, so large requests are not blocked forever.
+        """
+        needed = min(amount, self.capacity) - self.level
+        if needed <= 1e-9 * self.capacity:  # Rounding left over from the last refill
+            return 0.0
+        return needed / self.rate
+
+    def take(self, amount):
+        """Spend units (the level may go negative)."""
+        self.level -= amount
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by concurrent callers."""
+
+    def __init__(self, rpm, tpm=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Create a limiter.
+
+        Args:
+            rpm: Requests per minute
+            tpm: Tokens per minute (None = unlimited)
+            clock: Monotonic clock in seconds (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.stats = {"requests": 0, "tokens": 0, "waits": 0, "waited_s": 0.0, "pauses": 0}
+
+    @classmethod
+    def for_model(cls, model, rpm=None, tpm=None, **kwargs):
+        """
+        Create a limiter with a model's free-tier quota.
+
+        Args:
+            model: Gemini model name
+            rpm: Requests per minute (default: the model's free-tier limit)
+            tpm: Tokens per minute (default: the model's free-tier limit)
+
+        Returns:
+            RateLimiter: Limiter for the model
+        """
+        default_rpm, default_tpm = FREE_TIER_QUOTAS.get(model, DEFAULT_QUOTA)
+        return cls(rpm or default_rpm, tpm or default_tpm, **kwargs)
+
+    def acquire(self, tokens=0):
+        """
+        Block until one request with an estimated token count may be sent.
+
+        Args:
+            tokens: Estimated tokens of the request (prompt and response)
+
+        Returns:
+            float: Seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.requests.refill(now)
+                wait = max(self.requests.wait_time(1), self._paused_until - now)
+                if self.tokens is not None:
+                    self.tokens.refill(now)
+                    wait = max(wait, self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    self.requests.take(1)
+                    if self.tokens is not None:
+                        self.tokens.take(tokens)
+                    self.stats["requests"] += 1
+                    self.stats["tokens"] += tokens
+                    if waited:
+                        self.stats["waits"] += 1
+                        self.stats["waited_s"] += waited
+                    return waited
+            self._sleep(wait)
+            waited += wait
+
+    def settle(self, estimated, actual):
+        """
+        Correct the token budget once a request's real usage is known.
+
+        Args:
+            estimated: Tokens passed to acquire()
+            actual: Tokens the API reported
+        """
+        if self.tokens is None or not actual:
+            return
+        with self._lock:
+            self.tokens.take(actual - estimated)
+            self.stats["tokens"] += actual - estimated
+
+    def pause(self, seconds):
+        """
+        Hold back every caller, e.g. after a 429.
+
+        Args:
+            seconds: Pause length
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self.stats["pauses"] += 1
+
+    def get_stats(self):
+        """
+        Get limiter statistics.
+
+        Returns:
+            dict: Requests and tokens admitted, calls that had to wait, total
+                  seconds waited and pauses after rate-limit errors
+        """
+        with self._lock:
+            return dict(self.stats)
+
+
+def error_code(error):
+    """HTTP status code of an API error, or None."""
+    code = getattr(error, 'code', None)
+    return code if isinstance(code, int) else None
+
+
+def is_rate_limited(error):
+    """Whether an API error is a 429 / RESOURCE_EXHAUSTED."""
+    return error_code(error) == 429 or 'RESOURCE_EXHAUSTED' in str(error)
+
+
+def is_retryable(error):
+    """Whether an API error is worth retrying."""
+    return is_rate_limited(error) or error_code(error) in RETRYABLE_CODES
+
+
+def retry_delay(error):
+    """
+    Delay an API error asks for before retrying.
+
+    Returns:
+        float: Seconds from the error's RetryInfo, or None if it has none
+    """
+    match = _RETRY_DELAY.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def estimate_tokens(text, response_tokens=0):
+    """
+    Rough token count of a prompt (about four characters per token).
+
+    Args:
+        text: Prompt text
+        response_tokens: Tokens allowed for the response
+
+    Returns:
+        int: Estimated tokens of the request
+    """
+    return len(text) // 4 + 1 + response_tokens
@@ -0,0 +1,253 @@
+"""
+RecordingClock: local model of the OBS recording clock.
+Samples OBS outputDuration in the background, fits it against time.monotonic()
+and answers video timestamps locally instead of asking OBS on every event.
+"""
+import math
+import threading
+import time
+import logging
+from collections import deque
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RecordingClock:
+    """Linear fit of OBS recording time against the local monotonic clock."""
+
+    def __init__(self, sample_source, interval=1.0, window=30, max_rtt=0.25,
+                 resync_threshold=0.5, residual_history=10000):
+        """
+        Initialize the clock model.
+
+        Args:
+            sample_source: Callable returning the current recording duration in
+                           milliseconds (e.g. OBSClient.get_current_timestamp),
+                           0 when OBS is not recording, or None when OBS is
+                           unreachable (the model keeps extrapolating)
+            interval: Seconds between background samples (default: 1.0)
+            window: Number of recent samples used for the fit (default: 30)
+            max_rtt: Samples whose round trip took longer than this (seconds)
+                     are discarded as too imprecise (default: 0.25)
+            resync_threshold: Prediction error (seconds) above which the model is
+                              considered broken (pause, restart) and refitted
+            residual_history: Number of residuals kept for sync verification
+        """
+        self.sample_source = sample_source
+        self.interval = interval
+        self.window = window
+        self.max_rtt = max_rtt
+        self.resync_threshold = resync_threshold
+
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)  # (monotonic, video_seconds)
+        self._slope = 1.0
+        self._intercept = None  # video_seconds = intercept + slope * monotonic
+        self._last_sample_time = None
+
+        self.thread = None
+        self._stop_event = threading.Event()
+
+        # Sync accuracy tracking (out-of-sample prediction error per sample)
+        self.residuals = deque(maxlen=residual_history)
+        self.residual_count = 0
+        self._residual_sum_sq = 0.0
+        self.max_abs_residual = 0.0
+        self.resync_count = 0
+        self.rejected_samples = 0
+        self.unavailable_samples = 0
+        self.last_rtt = None
+
+    def start(self):
+        """Start background sampling."""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info(f"✓ Recording clock sampling every {self.interval:.1f}s")
+
+    def stop(self):
+        """Stop background sampling."""
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1.0)
+            self.thread = None
+
+    def _run(self):
+        """Sampling loop."""
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"Recording clock sample failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def sample(self):
+        """
+        Take one sample from OBS and update the model.
+
+        Returns:
+            bool: True if the sample was accepted
+        """
+        before = time.monotonic()
+        duration_ms = self.sample_source()
+        after = time.monotonic()
+
+        rtt = after - before
+
+        if duration_ms is None:
+            # OBS unreachable: the recording itself continues, keep the model
+            self.unavailable_samples += 1
+            return False
+
+        self.last_rtt = rtt
+
+        if not duration_ms or duration_ms <= 0:
+            # Not recording: the model is meaningless until recording restarts
+            self.reset()
+            return False
+
+        if rtt > self.max_rtt:
+            self.rejected_samples += 1
+            return False
+
+        # OBS answered somewhere inside the round trip; assume the midpoint
+        self.add_sample(before + rtt / 2.0, duration_ms / 1000.0)
+        return True
+
+    def add_sample(self, mono, video_seconds):
+        """
+        Add an (monotonic, video time) observation and refit.
+
+        Args:
+            mono: time.monotonic() value the observation refers to
+            video_seconds: Recording duration in seconds at that instant
+        """
+        with self._lock:
+            if self._intercept is not None:
+                residual = video_seconds - (self._intercept + self._slope * mono)
+                if abs(residual) > self.resync_threshold:
+                    # Recording was paused, restarted or the clock jumped
+                    logger.info(f"Recording clock resync (error {residual * 1000:.0f}ms)")
+                    self.resync_count += 1
+                    self._samples.clear()
+                else:
+                    self._record_residual(residual)
+
+            self._samples.append((mono, video_seconds))
+            self._last_sample_time = mono
+            self._fit()
+
+    def _record_residual(self, residual):
+        """Track prediction error statistics."""
+        self.residuals.append(residual)
+        self.residual_count += 1
+        self._residual_sum_sq += residual * residual
+        self.max_abs_residual = max(self.max_abs_residual, abs(residual))
+
+    def _fit(self):
+        """Least-squares fit over the sample window (slope 1 with a single sample)."""
+        n = len(self._samples)
+        if n == 0:
+            self._intercept = None
+            self._slope = 1.0
+            return
+
+        mean_x = sum(x for x, _ in self._samples) / n
+        mean_y = sum(y for _, y in self._samples) / n
+
+        slope = 1.0
+        if n >= 2:
+            var_x = sum((x - mean_x) ** 2 for x, _ in self._samples)
+            # Need a span of at least a few seconds before trusting the drift
+            if var_x > 1.0:
+                cov_xy = sum((x - mean_x) * (y - mean_y) for x, y in self._samples)
+                slope = cov_xy / var_x
+
+        self._slope = slope
+        self._intercept = mean_y - slope * mean_x
+
+    def reset(self):
+        """Discard all samples (recording stopped)."""
+        with self._lock:
+            self._samples.clear()
+            self._intercept = None
+            self._slope = 1.0
+            self._last_sample_time = None
+
+    def is_synced(self, mono=None):
+        """
+        Check whether the model can answer timestamps.
+
+        Args:
+            mono: Monotonic time to check against (default: now)
+
+        Returns:
+            bool: True if fitted and sampled recently
+        """
+        if mono is None:
+            mono = time.monotonic()
+        with self._lock:
+            if self._intercept is None or self._last_sample_time is None:
+                return False
+            # Stale model: sampling stopped working (OBS gone or recording stopped)
+            return mono - self._last_sample_time <= max(5.0 * self.interval, 5.0)
+
+    def video_time(self, mono=None):
+        """
+        Compute the recording position for a monotonic instant.
+
+        Args:
+            mono: time.monotonic() value (default: now)
+
+        Returns:
+            float: Seconds from recording start, or None if not synced
+        """
+        if mono is None:
+            mono = time.monotonic()
+        if not self.is_synced(mono):
+            return None
+        with self._lock:
+            return max(0.0, self._intercept + self._slope * mono)
+
+    def video_time_at(self, event_time):
+        """
+        Compute the recording position for a wall-clock timestamp.
+
+        Args:
+            event_time: System timestamp (time.time()) of the event
+
+        Returns:
+            float: Seconds from recording start, or None if not synced
+        """
+        mono = time.monotonic() - (time.time() - event_time)
+        return self.video_time(mono)
+
+    def get_stats(self):
+        """
+        Get model parameters and sync accuracy.
+
+        Returns:
+            dict: Offset, drift, residual error and sampling counters
+        """
+        with self._lock:
+            synced = self._intercept is not None
+            now = time.monotonic()
+            # Offset between the recording clock and the monotonic clock right now
+            offset = self._intercept + (self._slope - 1.0) * now if synced else None
+            rms = math.sqrt(self._residual_sum_sq / self.residual_count) if self.residual_count else None
+            return {
+                "synced": synced,
+                "samples": len(self._samples),
+                "offset_s": offset,
+                "drift_ppm": (self._slope - 1.0) * 1e6,
+                "residual_count": self.residual_count,
+                "rms_residual_ms": rms * 1000.0 if rms is not None else None,
+                "max_residual_ms": self.max_abs_residual * 1000.0,
+                "resyncs": self.resync_count,
+                "rejected_samples": self.rejected_samples,
+                "unavailable_samples": self.unavailable_samples,
+                "last_rtt_ms": self.last_rtt * 1000.0 if self.last_rtt is not None else None
+            }
@@ -0,0 +1,200 @@
+"""
+ResponseCache: content-addressed SQLite cache of LLM responses.
+Responses are keyed by a hash of the model, the prompt version and the
+normalized input events, so re-processing a match (e.g. with another minimum
+priority) reuses the earlier analysis instead of calling the API again.
+Entries expire after a maximum age, and the least recently used ones are
+evicted once the cache outgrows its size limit.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "ai_cache.db"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def make_key(model, prompt_version, payload):
+    """
+    Content address of an LLM request.
+
+    Args:
+        model: Model name
+        prompt_version: Version of the prompt template (bump it when the prompt changes)
+        payload: JSON-serializable normalized input (e.g. a round's events)
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    document = json.dumps({"model": model, "prompt_version": prompt_version, "payload": payload},
+                          sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(document.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Persistent LLM response cache with age- and size-based LRU eviction."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS,
+                 bypass=False):
+        """
+        Open (or create) a cache.
+
+        Args:
+            path: SQLite database file
+            max_bytes: Total response size kept before the least recently
+                       used entries are evicted
+            max_age_days: Days an entry stays valid after it was stored
+                          (None = forever)
+            bypass: Ignore cached entries (every lookup misses) but still
+                    store fresh responses, replacing the old ones
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "writes": 0, "evictions": 0}
+        self.init_database()
+
+    def _connect(self):
+        """Open a connection (one per call, so worker threads can share the cache)."""
+        return sqlite3.connect(self.path, timeout=10)
+
+    def init_database(self):
+        """Create the cache table if it doesn't exist."""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def get(self, key):
+        """
+        Look up a response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            str: Cached response text, or None on a miss (or with bypass)
+        """
+        if self.bypass:
+            self._count("bypassed")
+            return None
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT response, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None and self.max_age is not None and now - row[1] > self.max_age:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                conn.commit()
+                self._count("evictions")
+                row = None
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠ AI cache lookup failed: {e}")
+            self._count("misses")
+            return None
+        finally:
+            conn.close()
+
+        self._count("hits")
+        return row[0]
+
+    def put(self, key, response, model=None):
+        """
+        Store a response and evict entries over the limits.
+
+        Args:
+            key: Key from make_key()
+            response: Response text
+            model: Model name (informational)
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         (key, model, response, len(response.encode('utf-8')), now, now))
+            conn.commit()
+            self._count("writes")
+            self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠ Could not store AI response in cache: {e}")
+        finally:
+            conn.close()
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then the least recently used ones until the cache fits max_bytes."""
+        evicted = 0
+        if self.max_age is not None:
+            evicted += conn.execute('DELETE FROM responses WHERE created < ?', (now - self.max_age,)).rowcount
+
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if self.max_bytes is not None and total > self.max_bytes:
+            doomed = []
+            for key, size in conn.execute('SELECT key, size FROM responses ORDER BY last_used ASC'):
+                if total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+            conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+            evicted += len(doomed)
+
+        if evicted:
+            conn.commit()
+            self._count("evictions", evicted)
+
+    def clear(self):
+        """Delete every entry."""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM responses')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hits, misses, bypassed lookups, writes and evictions of this
+                  instance, plus the entries and bytes currently stored
+        """
+        conn = self._connect()
+        try:
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({"entries": entries, "bytes": size})
+        return stats
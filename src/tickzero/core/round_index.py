@@ -0,0 +1,147 @@
+"""
+RoundIndex: per-round index and summaries maintained as events arrive.
+Gives O(1) lookup of a round's events and typed per-round statistics that are
+exported with the match log, so later stages can pick or skip rounds without
+re-scanning every event.
+"""
+
+
+class RoundSummary:
+    """Statistics for one round."""
+
+    __slots__ = (
+        'round',
+        'event_indices',
+        'kills',
+        'headshots',
+        'deaths',
+        'lowest_hp',
+        'first_kill_time',
+        'last_kill_time',
+        'start_time',
+        'end_time',
+    )
+
+    def __init__(self, round_number):
+        """
+        Create an empty summary.
+
+        Args:
+            round_number: Round number this summary describes
+        """
+        self.round = round_number
+        self.event_indices = []  # Positions of this round's events in the match event list
+        self.kills = 0
+        self.headshots = 0
+        self.deaths = 0
+        self.lowest_hp = None  # Lowest health at the moment of a kill
+        self.first_kill_time = None
+        self.last_kill_time = None
+        self.start_time = None
+        self.end_time = None
+
+    def add(self, index, event):
+        """
+        Account for one event of this round.
+
+        Args:
+            index: Position of the event in the match event list
+            event: Event dictionary
+        """
+        self.event_indices.append(index)
+        video_time = event.get('video_time', 0)
+        if self.start_time is None:
+            self.start_time = video_time
+        self.end_time = video_time
+
+        event_type = event.get('type')
+        if event_type == 'kill':
+            self.kills += 1
+            if event.get('headshot'):
+                self.headshots += 1
+            health = event.get('health')
+            if health is not None and (self.lowest_hp is None or health < self.lowest_hp):
+                self.lowest_hp = health
+            if self.first_kill_time is None:
+                self.first_kill_time = video_time
+            self.last_kill_time = video_time
+        elif event_type == 'death':
+            self.deaths += 1
+
+    def to_dict(self):
+        """
+        Serialize for the match log.
+
+        Returns:
+            dict: Summary fields; the event range is exported as first/last index
+        """
+        return {
+            "round": self.round,
+            "event_count": len(self.event_indices),
+            "first_event": self.event_indices[0] if self.event_indices else None,
+            "last_event": self.event_indices[-1] if self.event_indices else None,
+            "kills": self.kills,
+            "headshots": self.headshots,
+            "deaths": self.deaths,
+            "lowest_hp": self.lowest_hp,
+            "first_kill_time": self.first_kill_time,
+            "last_kill_time": self.last_kill_time,
+            "start_time": self.start_time,
+            "end_time": self.end_time
+        }
+
+
+class RoundIndex:
+    """Maps round numbers to their events and summaries."""
+
+    def __init__(self):
+        """Create an empty index."""
+        self.rounds = {}  # round number -> RoundSummary (insertion order = first seen)
+
+    def add(self, index, event):
+        """
+        Index one event.
+
+        Args:
+            index: Position of the event in the match event list
+            event: Event dictionary
+        """
+        round_number = event.get('round', 0)
+        summary = self.rounds.get(round_number)
+        if summary is None:
+            summary = self.rounds[round_number] = RoundSummary(round_number)
+        summary.add(index, event)
+
+    def get(self, round_number):
+        """
+        Get the summary of a round.
+
+        Returns:
+            RoundSummary: Summary, or None if the round has no events
+        """
+        return self.rounds.get(round_number)
+
+    def events(self, match_events, round_number):
+        """
+        Get the events of a round without scanning the whole match.
+
+        Args:
+            match_events: The event list the indices refer to
+            round_number: Round number
+
+        Returns:
+            list: Events of the round in logged order
+        """
+        summary = self.rounds.get(round_number)
+        if summary is None:
+            return []
+        return [match_events[i] for i in summary.event_indices]
+
+    def summaries(self):
+        """
+        Get all round summaries.
+
+        Returns:
+            list: Summary dicts in the order rounds were first seen
+        """
+        return [summary.to_dict() for summary in self.rounds.values()]
@@ -0,0 +1,291 @@
+"""
+SeekIndex: persistent keyframe index of a recording, built after it is stopped.
+OBS records MKV, or MP4 with the index at the end of the file. The stage here
+remuxes the recording into a faststart MP4 (stream copy) and stores the video
+keyframes found by ffprobe next to the file, so clip extraction can look up the
+keyframe before any point in O(log n) instead of probing the container.
+"""
+import bisect
+import json
+import logging
+import os
+import struct
+import subprocess
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".seekidx.json"
+INDEX_VERSION = 3
+
+# Containers that can be rewritten as a faststart MP4
+REMUX_SOURCES = (".mkv", ".mp4", ".mov", ".m4v", ".flv", ".ts")
+
+
+class SeekIndex:
+    """Video keyframes and packet statistics of one file."""
+
+    def __init__(self, video_path, size, mtime, duration, keyframes, packets=0, stream=None):
+        """
+        Create an index.
+
+        Args:
+            video_path: File the index describes
+            size: File size in bytes when indexed
+            mtime: File modification time when indexed
+            duration: Duration in seconds
+            keyframes: Ascending list of (pts seconds, byte position, packet number)
+            packets: Number of video packets
+            stream: Video stream info (codec, profile, level, reference
+                    frames, size, frame rate, time base, pixel format and
+                    colour parameters)
+        """
+        self.video_path = str(video_path)
+        self.size = size
+        self.mtime = mtime
+        self.duration = duration
+        self.keyframes = keyframes
+        self.packets = packets
+        self.stream = stream or {}
+        self._times = [keyframe[0] for keyframe in keyframes]
+
+    @staticmethod
+    def index_path(video_path):
+        """Path of the index file stored next to a video."""
+        return f"{video_path}{INDEX_SUFFIX}"
+
+    def is_current(self):
+        """Whether the video still has the size and mtime it was indexed with."""
+        try:
+            stat = os.stat(self.video_path)
+        except OSError:
+            return False
+        return stat.st_size == self.size and abs(stat.st_mtime - self.mtime) < 1e-3
+
+    def keyframe_before(self, time_seconds):
+        """
+        Latest keyframe at or before a time.
+
+        Args:
+            time_seconds: Position in the file in seconds
+
+        Returns:
+            float: Keyframe time in seconds (the first keyframe if time_seconds
+                   precedes it, None if the index has no keyframes)
+        """
+        if not self._times:
+            return None
+        i = bisect.bisect_right(self._times, time_seconds + 1e-6) - 1
+        return self._times[max(i, 0)]
+
+    def keyframe_after(self, time_seconds):
+        """
+        Earliest keyframe at or after a time.
+
+        Returns:
+            float: Keyframe time in seconds, None if there is none
+        """
+        i = bisect.bisect_left(self._times, time_seconds - 1e-6)
+        return self._times[i] if i < len(self._times) else None
+
+    def to_dict(self):
+        """Serialize for the index file."""
+        return {
+            "version": INDEX_VERSION,
+            "video": os.path.basename(self.video_path),
+            "size": self.size,
+            "mtime": self.mtime,
+            "duration": self.duration,
+            "packets": self.packets,
+            "stream": self.stream,
+            "keyframes": self.keyframes
+        }
+
+    def save(self):
+        """Write the index next to the video."""
+        path = self.index_path(self.video_path)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(temp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, video_path):
+        """
+        Load the index of a video.
+
+        Returns:
+            SeekIndex: The index, or None if there is none or the video
+                       changed since it was built
+        """
+        try:
+            with open(cls.index_path(video_path), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+
+        index = cls(video_path, data['size'], data['mtime'], data['duration'],
+                    [tuple(keyframe) for keyframe in data['keyframes']], data.get('packets', 0), data.get('stream'))
+        return index if index.is_current() else None
+
+    @classmethod
+    def build(cls, video_path, timeout=600):
+        """
+        Index a video's keyframes with ffprobe (reads packet headers only, no decoding).
+
+        Returns:
+            SeekIndex: The index, or None if ffprobe failed
+        """
+        stat = os.stat(video_path)
+        info_cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                    '-show_entries', 'stream=codec_name,profile,level,refs,width,height,avg_frame_rate,r_frame_rate,'
+                                     'time_base,pix_fmt,color_range,color_space,color_transfer,color_primaries'
+                                     ':format=duration',
+                    '-of', 'json', str(video_path)]
+        packets_cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                       '-show_entries', 'packet=pts_time,pos,flags', '-of', 'compact=p=0', str(video_path)]
+        try:
+            info = json.loads(subprocess.run(info_cmd, capture_output=True, text=True, timeout=60, check=True).stdout)
+            result = subprocess.run(packets_cmd, capture_output=True, text=True, timeout=timeout, check=True)
+        except Exception as e:
+            logger.error(f"✗ Could not index {video_path}: {e}")
+            return None
+
+        keyframes = []
+        packets = 0
+        for line in result.stdout.splitlines():
+            fields = dict(field.split('=', 1) for field in line.split('|') if '=' in field)
+            if 'flags' not in fields:
+                continue
+            packets += 1
+            if 'K' in fields['flags'] and fields.get('pts_time', 'N/A') != 'N/A':
+                pos = fields.get('pos', 'N/A')
+                keyframes.append((float(fields['pts_time']), int(pos) if pos != 'N/A' else None, packets - 1))
+        keyframes.sort(key=lambda keyframe: keyframe[0])
+
+        streams = info.get('streams') or [{}]
+        duration = float(info.get('format', {}).get('duration') or 0.0)
+        return cls(video_path, stat.st_size, stat.st_mtime, duration, keyframes, packets, streams[0])
+
+
+def load_or_build_index(video_path):
+    """
+    Get a video's index, building and saving it if it is missing or stale.
+
+    Returns:
+        SeekIndex: The index, or None if the video could not be indexed
+    """
+    index = SeekIndex.load(video_path)
+    if index is not None:
+        return index
+
+    index = SeekIndex.build(video_path)
+    if index is not None:
+        try:
+            index.save()
+        except OSError as e:
+            logger.warning(f"⚠ Could not save seek index of {video_path}: {e}")
+    return index
+
+
+def is_faststart(video_path):
+    """
+    Check whether an MP4/MOV file has its index (moov) before the media data.
+
+    Returns:
+        bool: True if moov precedes mdat
+    """
+    with open(video_path, 'rb') as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return False
+            size, box_type = struct.unpack('>I4s', header)
+            if box_type == b'moov':
+                return True
+            if box_type == b'mdat':
+                return False
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0] - 8
+            elif size < 8:
+                return False  # Box runs to the end of the file (0) or is corrupt
+            f.seek(size - 8, os.SEEK_CUR)
+
+
+def remux_for_seeking(video_path, keep_source=True, timeout=600):
+    """
+    Stream-copy a recording into a faststart MP4.
+
+    MKV and other containers become <name>.mp4 next to the source; MP4s without
+    faststart are rewritten in place. Text tracks are converted to mov_text.
+
+    Args:
+        video_path: Finished recording
+        keep_source: Keep the original file when the container changes
+        timeout: Seconds the remux may take
+
+    Returns:
+        str: Path of the seek-friendly file (the source itself if it already
+             is one or could not be remuxed)
+    """
+    path = Path(video_path)
+    suffix = path.suffix.lower()
+    if suffix not in REMUX_SOURCES:
+        return str(path)
+    if suffix in (".mp4", ".mov", ".m4v") and is_faststart(path):
+        return str(path)
+
+    target = path if suffix == ".mp4" else path.with_suffix(".mp4")
+    if target != path and target.exists():
+        logger.warning(f"⚠ {target} already exists, keeping {path}")
+        return str(path)
+    temp_file = target.with_name(f"{target.stem}.remux.mp4")
+
+    cmd = ['ffmpeg', '-y', '-i', str(path),
+           '-map', '0', '-map', '-0:d?',  # MP4 chapter tracks are rebuilt from the chapters
+           '-c', 'copy', '-c:s', 'mov_text',
+           '-movflags', '+faststart+use_metadata_tags', str(temp_file)]
+    try:
+        logger.info(f"📦 Remuxing {path.name} for seeking...")
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0 or not temp_file.exists():
+            logger.error(f"✗ Remux failed, keeping {path.name}: {result.stderr}")
+            return str(path)
+        os.replace(temp_file, target)
+        if target != path and not keep_source:
+            path.unlink()
+        logger.info(f"✓ Seek-friendly recording: {target}")
+        return str(target)
+    except subprocess.TimeoutExpired:
+        logger.error(f"✗ Remux timeout (>{timeout}s), keeping {path.name}")
+        return str(path)
+    except Exception as e:
+        logger.error(f"✗ Error remuxing {path.name}: {e}")
+        return str(path)
+    finally:
+        if temp_file.exists():
+            temp_file.unlink()
+
+
+def prepare_recording(video_path, remux=True, keep_source=True):
+    """
+    Post-recording stage: remux for seeking, then index the keyframes.
+
+    Args:
+        video_path: Finished recording
+        remux: Remux into a faststart MP4 first
+        keep_source: Keep the original file when the container changes
+
+    Returns:
+        tuple: (path of the prepared file, SeekIndex or None)
+    """
+    if remux:
+        video_path = remux_for_seeking(video_path, keep_source=keep_source)
+    index = load_or_build_index(video_path)
+    if index is not None:
+        logger.info(f"🗂️  Indexed {len(index.keyframes)} keyframes ({index.packets} packets) of {Path(video_path).name}")
+    return video_path, index
@@ -0,0 +1,362 @@
+"""
+SmartCut: clip extraction that re-encodes only the partial GOPs at the cut points.
+Every whole GOP inside the clip is stream-copied from the source. The fragment
+before the first keyframe (head) and the one after the last keyframe (tail)
+are re-encoded with the source's codec, profile, level, reference frames,
+pixel format and colour parameters, plus the settings x264 stored in the
+stream when the recording comes from x264, so the fragments get the same
+parameter sets (SPS/PPS) as the copied GOPs. Every piece repeats its
+parameter sets in-band at each keyframe; if a fragment's extradata still
+differs from the source's the clip is re-encoded in full instead. The pieces
+stay MP4 files (raw Annex B has no timestamps, which loses the B-frame order)
+and are joined with FFmpeg's concat demuxer. The audio is encoded once over
+the whole clip, so it has no seams at the piece boundaries.
+"""
+import logging
+import os
+import re
+import subprocess
+import tempfile
+from fractions import Fraction
+from pathlib import Path
+
+from .cut_planner import KEYFRAME_EPSILON
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Source codec -> encoder producing fragments the copied GOPs can follow
+SMART_CUT_ENCODERS = {
+    'h264': 'libx264',
+    'hevc': 'libx265',
+}
+
+# Encoder -> FFmpeg option taking its native parameters
+ENCODER_PARAMS_OPTIONS = {
+    'libx264': '-x264-params',
+    'libx265': '-x265-params',
+}
+
+# Source codec -> bitstream filter writing the parameter sets in front of every copied keyframe
+ANNEXB_FILTERS = {
+    'h264': 'h264_mp4toannexb',
+    'hevc': 'hevc_mp4toannexb',
+}
+
+# Profile as ffprobe names it -> encoder profile
+ENCODER_PROFILES = {
+    'h264': {'Constrained Baseline': 'baseline', 'Baseline': 'baseline', 'Main': 'main', 'High': 'high',
+             'High 10': 'high10', 'High 4:2:2': 'high422', 'High 4:4:4 Predictive': 'high444'},
+    'hevc': {'Main': 'main', 'Main 10': 'main10', 'Main Still Picture': 'mainstillpicture'},
+}
+
+# ffprobe level -> level number (H.264 stores 10x the level, HEVC 30x)
+LEVEL_SCALE = {
+    'h264': 10,
+    'hevc': 30,
+}
+
+# Settings x264 writes into an SEI message of the first frame
+X264_SETTINGS_SEI = re.compile(rb'x264 - core \d+.*? options: ([ -~]+)')
+
+# x264 settings that shape the SPS/PPS (as x264 names them in that SEI)
+X264_HEADER_OPTIONS = (
+    'cabac', 'ref', 'bframes', 'b_pyramid', 'weightb', 'weightp', '8x8dct', 'keyint', 'open_gop',
+    'interlaced', 'constrained_intra', 'intra_refresh', 'bluray_compat', 'direct', 'chroma_qp_offset',
+    'nal_hrd', 'vbv_maxrate', 'vbv_bufsize',
+)
+
+# Stream fields copied onto the fragments (ffprobe name -> FFmpeg option)
+COLOR_OPTIONS = (
+    ('color_range', '-color_range'),
+    ('color_space', '-colorspace'),
+    ('color_transfer', '-color_trc'),
+    ('color_primaries', '-color_primaries'),
+)
+
+# Fragments are at most one GOP long, so they can afford near-transparent quality
+# (x264 sources keep their own rate control, which their PPS depends on)
+FRAGMENT_CRF = 16
+
+# Piece kinds
+PIECE_ENCODE = "encode"
+PIECE_COPY = "copy"
+
+
+def frame_rate(stream):
+    """
+    Frame rate of a stream from its ffprobe fields.
+
+    Returns:
+        float: Frames per second, or None if unknown
+    """
+    for key in ('avg_frame_rate', 'r_frame_rate'):
+        try:
+            rate = Fraction(stream.get(key, ''))
+        except (ValueError, ZeroDivisionError):
+            continue
+        if rate > 0:
+            return float(rate)
+    return None
+
+
+def source_encoder_options(source, stream, timeout=60):
+    """
+    Settings the source's encoder stored in the stream (x264 writes them into
+    an SEI message of the first frame).
+
+    Args:
+        source: Source video
+        stream: Video stream info of the source (SeekIndex.stream)
+        timeout: Seconds FFmpeg may take
+
+    Returns:
+        dict: Option name -> value, or None if the stream carries no x264 settings
+    """
+    if stream.get('codec_name') != 'h264':
+        return None
+    cmd = ['ffmpeg', '-v', 'error', '-i', source, '-map', '0:v:0', '-c:v', 'copy',
+           '-frames:v', '1', '-f', 'h264', '-']
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    match = X264_SETTINGS_SEI.search(result.stdout)
+    if not match:
+        return None
+    options = match.group(1).decode('ascii').split()
+    return dict(option.split('=', 1) for option in options if '=' in option)
+
+
+def x264_header_params(options):
+    """
+    x264 parameters reproducing the SPS/PPS of a stream x264 encoded.
+
+    Args:
+        options: Settings from source_encoder_options()
+
+    Returns:
+        dict: x264 parameter -> value
+    """
+    # With psy off x264 keeps chroma_qp_offset as given; the stored value already includes the psy adjustment
+    params = {'psy': 0}
+    for name in X264_HEADER_OPTIONS:
+        if name in options:
+            params[name.replace('_', '-')] = options[name]
+    # The PPS initial QP follows the rate control
+    rate_control = options.get('rc')
+    if rate_control == 'crf' and 'crf' in options:
+        params['crf'] = options['crf']
+    elif rate_control == 'cqp' and 'qp' in options:
+        params['qp'] = options['qp']
+    elif 'bitrate' in options:
+        params['bitrate'] = options['bitrate']
+    return params
+
+
+def fragment_encoder_args(stream, encoder_options=None):
+    """
+    FFmpeg encoding arguments for head/tail fragments matching a source stream.
+
+    Args:
+        stream: Video stream info of the source (SeekIndex.stream)
+        encoder_options: x264 settings stored in the source (source_encoder_options()),
+                         used instead of the default rate control when given
+
+    Returns:
+        list: Encoder arguments, or None if the codec cannot be smart-cut
+    """
+    codec = stream.get('codec_name')
+    encoder = SMART_CUT_ENCODERS.get(codec)
+    if encoder is None:
+        return None
+
+    args = ['-c:v', encoder, '-preset', 'medium']
+    profile = ENCODER_PROFILES[codec].get(stream.get('profile'))
+    if profile:
+        args.extend(['-profile:v', profile])
+    if stream.get('pix_fmt'):
+        args.extend(['-pix_fmt', stream['pix_fmt']])
+    for key, option in COLOR_OPTIONS:
+        value = stream.get(key)
+        if value and value != 'unknown':
+            args.extend([option, value])
+
+    params = {}
+    level = stream.get('level')
+    if isinstance(level, int) and level > 0:
+        params['level' if encoder == 'libx264' else 'level-idc'] = f"{level / LEVEL_SCALE[codec]:.1f}"
+    if stream.get('refs'):
+        params['ref'] = stream['refs']
+    if encoder == 'libx264' and encoder_options:
+        params.update(x264_header_params(encoder_options))
+    else:
+        args.extend(['-crf', str(FRAGMENT_CRF)])
+    # Parameter sets in-band at every keyframe, not only in the container header
+    params['repeat-headers'] = 1
+    args.extend([ENCODER_PARAMS_OPTIONS[encoder], ':'.join(f"{name}={value}" for name, value in params.items())])
+    return args
+
+
+def _timescale_args(stream):
+    """Keep the source's track timescale so copied timestamps are not rounded."""
+    time_base = stream.get('time_base', '')
+    if '/' not in time_base:
+        return []
+    return ['-video_track_timescale', time_base.split('/', 1)[1]]
+
+
+def _extradata_hash(path, timeout):
+    """Hash of a video's codec extradata (its parameter sets), None if ffprobe failed."""
+    cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=extradata_hash',
+           '-show_data_hash', 'sha256', '-of', 'csv=p=0', path]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def plan_pieces(index, start, end):
+    """
+    Split a clip into re-encoded fragments and stream-copied GOPs.
+
+    Args:
+        index: SeekIndex of the source video
+        start: Clip start in seconds
+        end: Clip end in seconds
+
+    Returns:
+        list: (kind, start, end, frames) tuples in order, frames being the
+              number of video packets of a copied piece (None for encoded
+              ones), or None if the clip contains no whole GOP
+    """
+    fps = frame_rate(index.stream)
+    if not index.keyframes or not fps:
+        return None
+    half_frame = 0.5 / fps
+
+    first = index.keyframe_after(start - half_frame)
+    last = index.keyframe_before(end + half_frame)
+    packet_numbers = {keyframe[0]: keyframe[2] for keyframe in index.keyframes}
+    if first is None or last is None or last < first:
+        return None
+
+    # A clip running to the end of the file has no partial GOP at its tail
+    to_file_end = bool(index.duration) and end >= index.duration - half_frame
+    if to_file_end:
+        frames = index.packets - packet_numbers[first]
+        copy_end = index.duration
+    else:
+        frames = packet_numbers[last] - packet_numbers[first]
+        copy_end = last
+    if frames <= 0:
+        return None
+
+    pieces = []
+    if first - start > half_frame:
+        pieces.append((PIECE_ENCODE, start, first, None))
+    pieces.append((PIECE_COPY, first, copy_end, frames))
+    if not to_file_end and end - last > half_frame:
+        pieces.append((PIECE_ENCODE, last, end, None))
+    return pieces
+
+
+def _piece_command(source, piece, encoder_args, annexb_filter, timescale_args, half_frame, output_path):
+    """FFmpeg command writing one video-only piece."""
+    kind, start, end, frames = piece
+    cmd = ['ffmpeg', '-y']
+    if kind == PIECE_COPY:
+        # Copying always starts on a keyframe: aim just past it so it is not the previous one
+        cmd.extend(['-noaccurate_seek', '-ss', f"{start + KEYFRAME_EPSILON:.6f}", '-i', source,
+                    '-frames:v', str(frames), '-c:v', 'copy', '-bsf:v', annexb_filter,
+                    '-avoid_negative_ts', 'make_zero'])
+    else:
+        # Decode from the previous keyframe, keep [start, end) and stop half a frame short of end
+        cmd.extend(['-ss', f"{start:.6f}", '-i', source,
+                    '-t', f"{end - start - half_frame:.6f}"])
+        cmd.extend(encoder_args)
+    cmd.extend(['-map', '0:v:0', '-an', '-sn', '-dn'])
+    cmd.extend(timescale_args)
+    cmd.append(output_path)
+    return cmd
+
+
+def smart_cut(source, start, end, output_path, index, timeout=300):
+    """
+    Cut a clip, stream-copying its whole GOPs and re-encoding only the edges.
+
+    The video keeps the source's resolution and codec. The audio is encoded to
+    AAC over the exact clip range.
+
+    Args:
+        source: Source video
+        start: Clip start in seconds
+        end: Clip end in seconds
+        output_path: MP4 file to write
+        index: SeekIndex of the source (keyframes, packets and stream info)
+        timeout: Seconds each FFmpeg step may take
+
+    Returns:
+        dict: Seconds stream-copied and re-encoded and the number of pieces,
+              or None if the clip cannot be smart-cut (no whole GOP inside,
+              unsupported codec, fragments whose parameter sets differ from
+              the source's, or an FFmpeg step failed)
+    """
+    if index is None:
+        return None
+    pieces = plan_pieces(index, start, end)
+    if pieces is None or index.stream.get('codec_name') not in SMART_CUT_ENCODERS:
+        return None
+    encoder_args = fragment_encoder_args(index.stream, source_encoder_options(source, index.stream))
+    annexb_filter = ANNEXB_FILTERS[index.stream['codec_name']]
+
+    half_frame = 0.5 / frame_rate(index.stream)
+    timescale_args = _timescale_args(index.stream)
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+
+    try:
+        with tempfile.TemporaryDirectory(prefix=".smartcut_", dir=output_dir) as work_dir:
+            piece_paths = []
+            for i, piece in enumerate(pieces):
+                piece_path = os.path.join(work_dir, f"piece_{i:02d}.mp4")
+                cmd = _piece_command(source, piece, encoder_args, annexb_filter, timescale_args, half_frame,
+                                     piece_path)
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+                if result.returncode != 0 or not os.path.exists(piece_path):
+                    logger.error(f"  ✗ Smart cut {piece[0]} piece failed: {result.stderr}")
+                    return None
+                piece_paths.append(piece_path)
+
+            # The joined file has one sample description: every piece must share its parameter sets
+            hashes = {_extradata_hash(piece_path, timeout) for piece_path in piece_paths}
+            if len(hashes) != 1 or None in hashes:
+                logger.warning("  ⚠ Re-encoded fragments do not match the source's parameter sets")
+                return None
+
+            list_path = os.path.join(work_dir, "pieces.txt")
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for piece_path in piece_paths:
+                    f.write(f"file '{Path(piece_path).as_posix()}'\n")
+
+            cmd = ['ffmpeg', '-y',
+                   '-f', 'concat', '-safe', '0', '-i', list_path,
+                   '-ss', f"{start:.6f}", '-t', f"{end - start:.6f}", '-i', source,
+                   '-map', '0:v', '-map', '1:a?',
+                   '-c:v', 'copy',
+                   '-c:a', 'aac', '-b:a', '192k']
+            cmd.extend(timescale_args)
+            cmd.extend(['-movflags', '+faststart', output_path])
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            if result.returncode != 0 or not os.path.exists(output_path):
+                logger.error(f"  ✗ Smart cut concat failed: {result.stderr}")
+                return None
+    except subprocess.TimeoutExpired:
+        logger.error(f"  ✗ Smart cut timeout (>{timeout}s)")
+        return None
+    except OSError as e:
+        logger.error(f"  ✗ Smart cut error: {e}")
+        return None
+
+    copied = sum(piece_end - piece_start for kind, piece_start, piece_end, _ in pieces if kind == PIECE_COPY)
+    encoded = sum(piece_end - piece_start for kind, piece_start, piece_end, _ in pieces if kind == PIECE_ENCODE)
+    return {"copied_s": copied, "encoded_s": encoded, "pieces": len(pieces)}
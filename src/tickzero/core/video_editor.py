@@ -1,20 +1,33 @@
 """
 VideoEditor: FFmpeg-based video processing for creating vertical highlights.
-Converts 16:9 gameplay to 9:16 with simple center crop.
+Converts 16:9 gameplay to 9:16 with simple center crop, or keeps the 16:9
+frame and smart-cuts it (see smart_cut).
 """
 import subprocess
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from .cut_planner import SEEK_UNINDEXED, plan_cut
+from .seek_index import SeekIndex, load_or_build_index
+from .smart_cut import smart_cut
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Render modes
+RENDER_VERTICAL = "vertical"  # 9:16 center crop, fully re-encoded
+RENDER_SMART_CUT = "smart_cut"  # 16:9, whole GOPs stream-copied, only the edges re-encoded
+RENDER_MODES = (RENDER_VERTICAL, RENDER_SMART_CUT)
+
 
 class VideoEditor:
     """Handles video cutting and format conversion using FFmpeg."""
     
-    def __init__(self, source_video, output_dir="highlights", use_gpu=True):
+    def __init__(self, source_video, output_dir="highlights", use_gpu=True, segments=None, cut_tolerance=0.0,
+                 render_mode=RENDER_VERTICAL):
         """
         Initialize Video Editor.
         
@@ -22,10 +35,29 @@ class VideoEditor:
             source_video: Path to source recording (16:9)
             output_dir: Directory to save highlights
             use_gpu: Try to use hardware acceleration (NVENC)
+            segments: Optional segment index of a recording split per round
+                      (dicts with path, start and end offsets in the match
+                      timeline, see MatchDatabase.get_segments); highlight
+                      times are then resolved to the segment file
+            cut_tolerance: Seconds a clip boundary may move to reach a keyframe
+                           (0 = never move); above 0, source videos without a
+                           keyframe index are indexed once and cached on disk
+            render_mode: RENDER_VERTICAL (9:16 crop) or RENDER_SMART_CUT
+                         (16:9 stream copy with re-encoded GOP edges; the
+                         source is indexed once like with cut_tolerance)
         """
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {render_mode} (expected one of {', '.join(RENDER_MODES)})")
         self.source_video = source_video
+        self.segments = sorted(segments or [], key=lambda s: s['start'])
         self.output_dir = output_dir
         self.use_gpu = use_gpu
+        self.cut_tolerance = cut_tolerance
+        self.render_mode = render_mode
+        self._seek_indexes = {}  # video path -> SeekIndex (None if not indexed)
+        self._lock = threading.Lock()
+        self.cut_stats = {"clips": 0, "snapped": 0, "decode_waste_s": 0.0, "unsnapped_waste_s": 0.0,
+                          "copied_s": 0.0, "encoded_s": 0.0}
         
         # Create output directory
         Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -112,9 +144,9 @@ class VideoEditor:
         logger.info("ℹ No GPU encoders available, will use CPU (libx264)")
         return None, None
     
-    def create_highlight(self, start_time, end_time, output_name, label="highlight"):
+    def create_highlight(self, start_time, end_time, output_name, label="highlight", tolerance=None):
         """
-        Create a single vertical highlight clip.
+        Create a single highlight clip.
         
         9:16 CONVERSION PROCESS:
         - Scales 16:9 source to 1920px height (becomes ~3413x1920)
@@ -122,22 +154,65 @@ class VideoEditor:
         - Preserves original audio from recording
         - Clean gameplay without blur effects
         
+        SMART CUT (render_mode=RENDER_SMART_CUT):
+        - Keeps the 16:9 frame and the source's codec
+        - Stream-copies every whole GOP, re-encodes only the partial GOPs at
+          both ends; falls back to a full 16:9 re-encode if that is not possible
+        
         Args:
             start_time: Start timestamp in seconds (from video_time)
             end_time: End timestamp in seconds
             output_name: Name for output file (without extension)
             label: Label/description for the clip
+            tolerance: Seconds the boundaries may move to reach keyframes
+                       (default: cut_tolerance)
             
         Returns:
             str: Path to created highlight, or None if failed
         """
-        duration = end_time - start_time
         output_path = os.path.join(self.output_dir, f"{output_name}.mp4")
         
         logger.info(f"Creating highlight: {label}")
-        logger.info(f"  Time: {start_time:.1f}s → {end_time:.1f}s ({duration:.1f}s)")
+        logger.info(f"  Time: {start_time:.1f}s → {end_time:.1f}s ({end_time - start_time:.1f}s)")
         logger.info(f"  Output: {output_path}")
         
+        source_video, start_time, end_time = self.resolve_segment(start_time, end_time)
+        if source_video != self.source_video:
+            logger.info(f"  Segment: {source_video} @ {start_time:.1f}s")
+        
+        # A prepared recording knows its length without probing the container
+        tolerance = self.cut_tolerance if tolerance is None else tolerance
+        smart = self.render_mode == RENDER_SMART_CUT
+        index = self.get_seek_index(source_video, build=tolerance > 0 or smart)
+        if index is not None and index.duration:
+            if start_time >= index.duration:
+                logger.error(f"  ✗ Highlight starts after the end of the video ({index.duration:.1f}s)")
+                return None
+            end_time = min(end_time, index.duration)
+        
+        # Snap to nearby keyframes and pick the seek strategy (a smart cut
+        # ending on a keyframe has no tail to re-encode)
+        plan = plan_cut(index, start_time, end_time, tolerance, snap_end=smart)
+        self._record_plan(plan)
+        if plan.strategy != SEEK_UNINDEXED:
+            logger.info(f"  Seek: {plan.strategy} @ keyframe {plan.keyframe:.2f}s "
+                        f"({plan.decode_waste:.2f}s decoded and discarded)")
+        duration = plan.duration
+        
+        if smart:
+            logger.info("  ⚙ Smart cut...")
+            stats = smart_cut(source_video, plan.start, plan.end, output_path, index)
+            if stats is not None:
+                with self._lock:
+                    self.cut_stats["copied_s"] += stats["copied_s"]
+                    self.cut_stats["encoded_s"] += stats["encoded_s"]
+                file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
+                logger.info(f"  ✓ Created: {output_path} ({file_size:.1f} MB, {stats['copied_s']:.1f}s copied, "
+                            f"{stats['encoded_s']:.1f}s re-encoded)")
+                return output_path
+            logger.info("  ℹ Smart cut not possible (no whole GOP, unsupported codec or encoder settings), "
+                        "re-encoding the clip")
+        
         # Scale to 1920px height, then crop center 1080x1920 for 9:16
         # Step 1: scale=-1:1920 scales to 1920px height (width auto-calculated)
         # Step 2: crop=1080:1920 takes center 1080x1920 region
@@ -147,15 +222,18 @@ class VideoEditor:
         cmd = ['ffmpeg', '-y']  # -y = overwrite output
         
         # Input configuration
+        cmd.extend(plan.input_args())         # Seek to start (fast seek before input)
         cmd.extend([
-            '-ss', str(start_time),           # Seek to start (fast seek before input)
-            '-i', self.source_video,          # Input file
-            '-t', str(duration),              # Duration to encode
+            '-i', source_video,               # Input file (segment of a split recording)
+            '-t', f"{duration:.6f}",          # Duration to encode
         ])
         
         # Video encoding
-        cmd.extend(['-filter_complex', filter_complex])
-        cmd.extend(['-map', '[v]'])      # Use filtered video output
+        if smart:
+            cmd.extend(['-map', '0:v:0'])    # Keep the 16:9 frame
+        else:
+            cmd.extend(['-filter_complex', filter_complex])
+            cmd.extend(['-map', '[v]'])      # Use filtered video output
         cmd.extend(['-map', '0:a?'])     # Map audio stream if present
         
         # Encoder selection with vendor-specific optimizations
@@ -244,19 +322,127 @@ class VideoEditor:
             logger.error(f"  ✗ Error running FFmpeg: {e}")
             return None
     
-    def create_highlights_batch(self, highlights, prefix="clip"):
+    def get_seek_index(self, video_path=None, build=False):
+        """
+        Get the keyframe index stored next to a video (see seek_index.prepare_recording).
+        
+        Args:
+            video_path: Video file (default: the source video)
+            build: Index the video (and cache the index on disk) if it has
+                   no current index
+            
+        Returns:
+            SeekIndex: The index, or None if the video was not indexed or
+                       changed since
+        """
+        video_path = video_path or self.source_video
+        with self._lock:
+            index = self._seek_indexes.get(video_path)
+            if index is None and (video_path not in self._seek_indexes or build):
+                if build and os.path.exists(video_path):
+                    index = load_or_build_index(video_path)
+                else:
+                    index = SeekIndex.load(video_path)
+                self._seek_indexes[video_path] = index
+            return index
+    
+    def _record_plan(self, plan):
+        """Add a clip's cut plan to the batch statistics."""
+        with self._lock:
+            self.cut_stats["clips"] += 1
+            if plan.start != plan.requested_start or plan.end != plan.requested_end:
+                self.cut_stats["snapped"] += 1
+            if plan.decode_waste is not None:
+                self.cut_stats["decode_waste_s"] += plan.decode_waste
+                self.cut_stats["unsnapped_waste_s"] += plan.unsnapped_waste
+    
+    def get_cut_stats(self):
+        """
+        Get cut planning statistics of the clips created so far.
+        
+        Returns:
+            dict: Clips, clips with snapped boundaries, seconds decoded and
+                  discarded before cut points, the seconds that would have
+                  been discarded without snapping, and the seconds smart cuts
+                  stream-copied and re-encoded
+        """
+        with self._lock:
+            return dict(self.cut_stats)
+    
+    def resolve_segment(self, start_time, end_time):
+        """
+        Map a highlight's match-timeline range to the file that contains it.
+        
+        Args:
+            start_time: Start timestamp in seconds (from video_time)
+            end_time: End timestamp in seconds
+            
+        Returns:
+            tuple: (video path, start, end) with times relative to that file;
+                   the source video and unchanged times without segments
+        """
+        if not self.segments:
+            return self.source_video, start_time, end_time
+        
+        segment = self.segments[0]
+        for candidate in self.segments:
+            if candidate['start'] > start_time:
+                break
+            segment = candidate
+        
+        offset = segment['start']
+        if segment.get('end') is not None and end_time > segment['end']:
+            # Crosses a round boundary: keep the part in this round's file
+            logger.warning(f"  ⚠ Highlight {start_time:.1f}s-{end_time:.1f}s crosses a segment boundary, "
+                           f"clipped at {segment['end']:.1f}s")
+            end_time = segment['end']
+        return segment['path'], max(0.0, start_time - offset), end_time - offset
+    
+    def delete_unused_segments(self, highlights):
+        """
+        Delete segment files that no highlight was cut from.
+        
+        The source video (the last segment, referenced by the match) is kept.
+        
+        Args:
+            highlights: Highlight dicts with 'start' and 'end' keys
+            
+        Returns:
+            list: Paths of the deleted segment files
+        """
+        used = {self.resolve_segment(h.get('start', 0), h.get('end', 0))[0] for h in highlights}
+        deleted = []
+        for segment in self.segments:
+            path = segment['path']
+            if path in used or path == self.source_video or not os.path.exists(path):
+                continue
+            try:
+                os.remove(path)
+                deleted.append(path)
+                if os.path.exists(SeekIndex.index_path(path)):
+                    os.remove(SeekIndex.index_path(path))
+            except OSError as e:
+                logger.warning(f"Could not delete segment {path}: {e}")
+        if deleted:
+            logger.info(f"🗑️  Deleted {len(deleted)} segments without highlights")
+        return deleted
+    
+    def create_highlights_batch(self, highlights, prefix="clip", max_workers=1):
         """
         Create multiple highlights from a list.
         
         Args:
             highlights: List of dicts with 'start', 'end', 'label' keys
+                        (optional 'tolerance' overrides cut_tolerance)
             prefix: Prefix for output filenames
+            max_workers: Clips rendered at once (each in its own FFmpeg process;
+                         most useful with a split recording, where clips read
+                         independent files)
             
         Returns:
-            list: Paths to successfully created highlights
+            list: Paths to successfully created highlights, in input order
         """
-        created_files = []
-        
+        jobs = []
         for i, highlight in enumerate(highlights, 1):
             start = highlight.get('start', 0)
             end = highlight.get('end', 0)
@@ -265,14 +451,24 @@ class VideoEditor:
             
             # Generate filename
             output_name = f"{prefix}_{i:02d}_{label}_p{priority}"
-            
-            # Create the clip
-            result = self.create_highlight(start, end, output_name, label)
-            
-            if result:
-                created_files.append(result)
+            jobs.append((start, end, output_name, label, highlight.get('tolerance')))
+        
+        if max_workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(lambda job: self.create_highlight(*job), jobs))
+        else:
+            results = [self.create_highlight(*job) for job in jobs]
+        created_files = [result for result in results if result]
         
         logger.info(f"✓ Batch complete: {len(created_files)}/{len(highlights)} highlights created")
+        stats = self.get_cut_stats()
+        if stats["snapped"] or stats["unsnapped_waste_s"]:
+            logger.info(f"✓ Cut planning: {stats['snapped']}/{stats['clips']} clips snapped to keyframes, "
+                        f"{stats['decode_waste_s']:.1f}s decoded and discarded "
+                        f"(vs {stats['unsnapped_waste_s']:.1f}s unplanned)")
+        if stats["copied_s"]:
+            logger.info(f"✓ Smart cut: {stats['copied_s']:.1f}s stream-copied, "
+                        f"{stats['encoded_s']:.1f}s re-encoded")
         return created_files
     
     def get_video_info(self):
@@ -0,0 +1,354 @@
+"""
+VideoMarkers: embed match events into the recording as chapters and a text track.
+Rounds and kills become chapters and every logged event a subtitle cue, written
+with a stream-copy remux (no re-encode), so players, editors and clip extraction
+can jump to highlights without the separate match log.
+"""
+import json
+import logging
+import os
+import re
+import subprocess
+from pathlib import Path
+
+from .gsi_server import MULTI_KILL_LABELS
+from .match_log import iter_match_log, read_match_log_header
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Containers that store chapters and a text track (OBS records mkv or mp4)
+SUBTITLE_CODECS = {".mkv": "srt", ".mp4": "mov_text", ".mov": "mov_text", ".m4v": "mov_text"}
+
+KILL_LEAD = 2.0  # Kill chapters start this many seconds before the kill
+CUE_DURATION = 2.0  # Seconds each event cue stays on screen
+
+_TITLE_PATTERN = re.compile(r"^Round (\d+)(?: - Kill (\d+))?")
+
+
+def _weapon_name(weapon):
+    """Display name of a GSI weapon id (weapon_ak47 -> AK47)."""
+    return (weapon or "unknown").replace("weapon_", "").upper()
+
+
+def _describe(event):
+    """One-line description of an event for the text track, None to skip it."""
+    event_type = event.get('type')
+    if event_type == 'kill':
+        return f"Round {event.get('round', 0)} - Kill - {_weapon_name(event.get('weapon'))}" + \
+            (" - HS" if event.get('headshot') else "")
+    if event_type == 'death':
+        return f"Round {event.get('round', 0)} - Death"
+    if event_type == 'round_phase_change':
+        return f"Round {event.get('round', 0)} - {event.get('phase', '')}"
+    return None
+
+
+def build_chapters(events, duration, offset=0.0):
+    """
+    Build a flat chapter list from match events.
+
+    Every round starts a chapter and every kill starts one KILL_LEAD seconds
+    before it (not before its round); each chapter runs until the next one
+    starts.
+
+    Args:
+        events: Match events with video_time (match timeline, pause-aware)
+        duration: Length of the file in seconds
+        offset: Match time at which the file starts (segments of a split
+                recording), subtracted from every event
+
+    Returns:
+        list: Dicts with start, end, title, kind ('start', 'round' or 'kill')
+              and round, times in seconds relative to the file
+    """
+    markers = []
+    round_starts = {}
+    kills_in_round = {}
+    for event in events:
+        time_in_file = event.get('video_time', 0) - offset
+        if time_in_file < 0 or time_in_file >= duration:
+            continue
+        round_number = event.get('round', 0)
+        if round_number not in round_starts:
+            round_starts[round_number] = time_in_file
+            markers.append((time_in_file, f"Round {round_number}", 'round', round_number))
+        if event.get('type') == 'kill':
+            kills_in_round[round_number] = kills_in_round.get(round_number, 0) + 1
+            title = f"Round {round_number} - Kill {kills_in_round[round_number]} - {_weapon_name(event.get('weapon'))}"
+            if event.get('headshot'):
+                title += " - HS"
+            start = max(round_starts[round_number], time_in_file - KILL_LEAD)
+            markers.append((start, title, 'kill', round_number))
+
+    markers.sort(key=lambda marker: marker[0])
+    if not markers or markers[0][0] > 0:
+        markers.insert(0, (0.0, "Start", 'start', None))
+
+    chapters = []
+    for i, (start, title, kind, round_number) in enumerate(markers):
+        end = markers[i + 1][0] if i + 1 < len(markers) else duration
+        if end <= start:
+            continue  # Zero-length: a kill right at the round start
+        chapters.append({"start": start, "end": end, "title": title, "kind": kind, "round": round_number})
+    return chapters
+
+
+def _escape(value):
+    """Escape a value for the FFMETADATA format."""
+    return re.sub(r"([=;#\\\n])", r"\\\1", str(value))
+
+
+def format_ffmetadata(chapters):
+    """
+    Serialize chapters as an FFMETADATA file.
+
+    Args:
+        chapters: Chapter dicts (see build_chapters)
+
+    Returns:
+        str: File contents (millisecond time base)
+    """
+    lines = [";FFMETADATA1"]
+    for chapter in chapters:
+        lines.extend([
+            "[CHAPTER]",
+            "TIMEBASE=1/1000",
+            f"START={int(round(chapter['start'] * 1000))}",
+            f"END={int(round(chapter['end'] * 1000))}",
+            f"title={_escape(chapter['title'])}"
+        ])
+    return "\n".join(lines) + "\n"
+
+
+def _srt_time(seconds):
+    """SRT timestamp (HH:MM:SS,mmm)."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def format_srt(events, duration, offset=0.0):
+    """
+    Serialize events as SRT cues for the recording's text track.
+
+    Args:
+        events: Match events with video_time
+        duration: Length of the file in seconds
+        offset: Match time at which the file starts
+
+    Returns:
+        str: SRT document (empty if no event falls into the file)
+    """
+    cues = []
+    for event in events:
+        text = _describe(event)
+        start = event.get('video_time', 0) - offset
+        if text is None or start < 0 or start >= duration:
+            continue
+        end = min(start + CUE_DURATION, duration)
+        cues.append(f"{len(cues) + 1}\n{_srt_time(start)} --> {_srt_time(end)}\n{text}\n")
+    return "\n".join(cues)
+
+
+def probe_duration(video_path):
+    """
+    Get a file's duration with ffprobe.
+
+    Returns:
+        float: Duration in seconds, or None if it could not be read
+    """
+    cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'json', video_path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode == 0:
+            return float(json.loads(result.stdout)['format']['duration'])
+    except Exception as e:
+        logger.error(f"Error probing {video_path}: {e}")
+    return None
+
+
+def embed_markers(video_path, events, offset=0.0, tags=None, subtitles=True, timeout=600):
+    """
+    Write events into a recording as chapters and a text track.
+
+    Streams are copied into a temporary file next to the recording, which
+    then replaces it (needs free space for one more copy of the file).
+    Existing subtitle and data tracks are dropped, so running it again
+    replaces the markers.
+
+    Args:
+        video_path: Recording (mkv or mp4)
+        events: Match events with video_time
+        offset: Match time at which the file starts (split recordings)
+        tags: Optional global metadata tags (e.g. match id)
+        subtitles: Also add the events as a text track
+        timeout: Seconds the remux may take
+
+    Returns:
+        bool: True if the recording now carries the markers
+    """
+    suffix = Path(video_path).suffix.lower()
+    if suffix not in SUBTITLE_CODECS:
+        logger.warning(f"⚠ Cannot embed markers into {suffix or 'extensionless'} files: {video_path}")
+        return False
+
+    duration = probe_duration(video_path)
+    if not duration:
+        return False
+
+    events = list(events)
+    chapters = build_chapters(events, duration, offset)
+    srt = format_srt(events, duration, offset) if subtitles else ""
+
+    path = Path(video_path)
+    metadata_file = path.with_name(f"{path.stem}.chapters.txt")
+    srt_file = path.with_name(f"{path.stem}.events.srt")
+    temp_file = path.with_name(f"{path.stem}.markers{path.suffix}")
+
+    cmd = ['ffmpeg', '-y', '-i', str(path), '-f', 'ffmetadata', '-i', str(metadata_file)]
+    if srt:
+        cmd.extend(['-f', 'srt', '-i', str(srt_file)])
+    # Drop the text and chapter tracks of an earlier run
+    cmd.extend(['-map', '0', '-map', '-0:s?', '-map', '-0:d?'])
+    if srt:
+        cmd.extend(['-map', '2:0'])
+    cmd.extend(['-map_metadata', '0', '-map_chapters', '1', '-c', 'copy'])
+    if srt:
+        cmd.extend(['-c:s', SUBTITLE_CODECS[suffix], '-metadata:s:s:0', 'title=TickZero events'])
+    for key, value in (tags or {}).items():
+        cmd.extend(['-metadata', f"{key}={value}"])
+    if suffix != ".mkv":
+        # Keep custom tags, and the index up front for seeking (see seek_index)
+        cmd.extend(['-movflags', '+faststart+use_metadata_tags'])
+    # Sparse subtitle packets must not hold back the copied audio/video
+    cmd.extend(['-max_interleave_delta', '0', str(temp_file)])
+
+    try:
+        metadata_file.write_text(format_ffmetadata(chapters), encoding='utf-8')
+        if srt:
+            srt_file.write_text(srt, encoding='utf-8')
+
+        logger.info(f"🔖 Embedding {len(chapters)} chapters into {video_path}...")
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0 or not temp_file.exists():
+            logger.error(f"✗ Marker remux failed: {result.stderr}")
+            return False
+
+        os.replace(temp_file, path)
+        logger.info(f"✓ Embedded {len(chapters)} chapters" + (" and the event track" if srt else ""))
+        return True
+
+    except subprocess.TimeoutExpired:
+        logger.error(f"✗ Marker remux timeout (>{timeout}s)")
+        return False
+    except Exception as e:
+        logger.error(f"✗ Error embedding markers: {e}")
+        return False
+    finally:
+        for leftover in (metadata_file, srt_file, temp_file):
+            if leftover.exists():
+                leftover.unlink()
+
+
+def embed_match_markers(log_path, video_path, segments=None, subtitles=True):
+    """
+    Embed a match log's events into its recording.
+
+    Args:
+        log_path: Match log of the recording
+        video_path: Recording (the last segment of a split recording)
+        segments: Optional segment index (see MatchDatabase.get_segments);
+                  every segment file gets the events of its time range
+        subtitles: Also add the events as a text track
+
+    Returns:
+        int: Number of files that now carry markers
+    """
+    events = list(iter_match_log(log_path))
+    header = read_match_log_header(log_path)
+    tags = {"comment": "TickZero match markers"}
+    if header.get('match_id'):
+        tags["tickzero_match_id"] = header['match_id']
+
+    files = [(s['path'], s['start']) for s in segments] if segments else [(video_path, 0.0)]
+    embedded = 0
+    for path, offset in files:
+        if not os.path.exists(path):
+            logger.warning(f"⚠ Recording not found, no markers embedded: {path}")
+            continue
+        if embed_markers(path, events, offset=offset, tags=tags, subtitles=subtitles):
+            embedded += 1
+    return embedded
+
+
+def read_chapters(video_path):
+    """
+    Read a recording's chapters with ffprobe.
+
+    Args:
+        video_path: Recording with embedded markers
+
+    Returns:
+        list: Dicts with start, end, title, kind and round (parsed from the
+              title), empty if the file has no chapters
+    """
+    cmd = ['ffprobe', '-v', 'error', '-show_chapters', '-of', 'json', video_path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            return []
+        raw_chapters = json.loads(result.stdout).get('chapters', [])
+    except Exception as e:
+        logger.error(f"Error reading chapters of {video_path}: {e}")
+        return []
+
+    chapters = []
+    for raw in raw_chapters:
+        title = raw.get('tags', {}).get('title', '')
+        match = _TITLE_PATTERN.match(title)
+        chapters.append({
+            "start": float(raw['start_time']),
+            "end": float(raw['end_time']),
+            "title": title,
+            "kind": ('kill' if match.group(2) else 'round') if match else 'start',
+            "round": int(match.group(1)) if match else None
+        })
+    return chapters
+
+
+def highlights_from_chapters(chapters, after=3.0, min_kills=1):
+    """
+    Build highlight ranges from kill chapters, one per round.
+
+    Gives VideoEditor.create_highlights_batch something to cut from a marked
+    recording without the match log or AI analysis.
+
+    Args:
+        chapters: Chapter dicts (see read_chapters)
+        after: Seconds kept after a round's last kill
+        min_kills: Rounds with fewer kills are skipped
+
+    Returns:
+        list: Highlight dicts with start, end, label, round and kills
+    """
+    rounds = {}
+    for chapter in chapters:
+        if chapter['kind'] == 'kill':
+            rounds.setdefault(chapter['round'], []).append(chapter['start'])
+
+    highlights = []
+    for round_number, starts in rounds.items():
+        if len(starts) < min_kills:
+            continue
+        label = MULTI_KILL_LABELS.get(len(starts), f"{len(starts)} kills").replace(" ", "_")
+        highlights.append({
+            "start": starts[0],
+            "end": starts[-1] + KILL_LEAD + after,
+            "label": f"round{round_number}_{label}",
+            "round": round_number,
+            "kills": len(starts)
+        })
+    return highlights
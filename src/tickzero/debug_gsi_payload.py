@@ -8,6 +8,8 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 import logging
 from datetime import datetime
 
+from tickzero.core.gsi_replay import GSICaptureWriter
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -15,17 +17,21 @@ logger = logging.getLogger(__name__)
 class DebugGSIHandler(BaseHTTPRequestHandler):
     """HTTP handler that logs all incoming GSI payloads."""
     
-    payloads = []  # Store all received payloads
+    capture = None  # GSICaptureWriter for all received payloads
     
     def do_POST(self):
         """Handle incoming POST requests from CS2 GSI."""
         content_length = int(self.headers['Content-Length'])
         post_data = self.rfile.read(content_length)
+        timestamp = time.time()
         
         try:
+            # Store the raw payload for later analysis / replay
+            if DebugGSIHandler.capture:
+                DebugGSIHandler.capture.write(post_data, timestamp)
+            
             # Parse the payload
             game_state = json.loads(post_data.decode('utf-8'))
-            timestamp = time.time()
             
             # Extract key information
             player_data = game_state.get('player', {})
@@ -63,12 +69,6 @@ class DebugGSIHandler(BaseHTTPRequestHandler):
             
             logger.info("=" * 80)
             
-            # Store payload for later analysis
-            DebugGSIHandler.payloads.append({
-                'timestamp': timestamp,
-                'payload': game_state
-            })
-            
             # Send 200 OK
             self.send_response(200)
             self.end_headers()
@@ -100,6 +100,10 @@ def main():
     print("=" * 80)
     print()
     
+    # Payloads are streamed to a compressed capture file as they arrive
+    output_file = f"gsi_debug_{int(time.time())}.jsonl.gz"
+    DebugGSIHandler.capture = GSICaptureWriter(output_file)
+    
     server = HTTPServer(('', port), DebugGSIHandler)
     
     try:
@@ -107,17 +111,14 @@ def main():
     except KeyboardInterrupt:
         print("\n\nStopping server...")
         server.shutdown()
-        
-        # Save all payloads to file
-        output_file = f"gsi_debug_{int(time.time())}.json"
-        with open(output_file, 'w') as f:
-            json.dump(DebugGSIHandler.payloads, f, indent=2)
+        DebugGSIHandler.capture.close()
         
         print("\n" + "=" * 80)
         print("✓ DEBUG SESSION COMPLETE")
         print("=" * 80)
-        print(f"Total payloads captured: {len(DebugGSIHandler.payloads)}")
+        print(f"Total payloads captured: {DebugGSIHandler.capture.payload_count}")
         print(f"Saved to: {output_file}")
+        print(f"Replay with: python -m tickzero.launcher replay {output_file}")
         print("=" * 80)
 
 
@@ -5,8 +5,11 @@ Uses Typer to manage the application lifecycle.
 Commands:
 - record: Orchestrates OBS recording based on CS2 GSI events.
 - process: Generates highlights using AI Director and Video Editor.
+- markers: Embeds rounds and kills into a recording as chapters.
+- prepare: Remuxes a recording for seeking and indexes its keyframes.
 """
 import typer
+import os
 import sys
 import time
 import logging
@@ -24,7 +27,14 @@ logger = logging.getLogger("Launcher")
 
 # Imports
 from tickzero.core.gsi_server import GSIServer
+from tickzero.core.recording_clock import RecordingClock
+from tickzero.core.gsi_replay import replay_capture
+from tickzero.core.video_markers import embed_match_markers
+from tickzero.core.seek_index import prepare_recording
+from tickzero.core.response_cache import ResponseCache
+from tickzero.core.highlight_scorer import RuleDirector
 from tickzero.obs_controller import OBSClient
+from tickzero.core.obs_async import AsyncOBSClient
 from tickzero.ai_director import AIDirector
 from tickzero.video_editor import VideoEditor
 # We reuse MatchDatabase for retrieving last match info
@@ -37,7 +47,12 @@ def record(
     gsi_port: int = 3000,
     obs_host: str = "localhost", 
     obs_port: int = 4455,
-    obs_auth: str = ""
+    obs_auth: str = "",
+    obs_async: bool = typer.Option(False, "--obs-async", help="Use the event-driven OBS client (requires websockets)"),
+    capture: Optional[str] = typer.Option(None, help="Also record raw GSI payloads to this file (.jsonl.gz) for replay"),
+    replay_buffer: bool = typer.Option(False, "--replay-buffer", help="Save OBS replay buffer clips of kills instead of recording the whole match"),
+    highlight_delay: float = typer.Option(3.0, help="Seconds after a kill before the replay buffer is saved (--replay-buffer)"),
+    pause_downtime: bool = typer.Option(False, "--pause-downtime", help="Pause the recording during warmup, freezetime, timeouts and halftime")
 ):
     """
     Start the Recording Session.
@@ -54,11 +69,22 @@ def record(
     stop_event = threading.Event()
     
     # Initialize OBS Client
-    obs_client = OBSClient(host=obs_host, port=obs_port, password=obs_auth)
+    client_class = AsyncOBSClient if obs_async else OBSClient
+    obs_client = client_class(host=obs_host, port=obs_port, password=obs_auth)
+    
+    # Local model of the recording clock (avoids a GetRecordStatus call per event)
+    recording_clock = RecordingClock(lambda: obs_client.get_current_timestamp(unavailable=None))
+    
+    # Replay buffer clips are registered as highlight sources
+    db = MatchDatabase() if replay_buffer else None
     
     def on_match_start():
         """Callback when match goes live."""
         logger.info("🎮 Signal: Match Started (LIVE)")
+        if replay_buffer:
+            if obs_client.start_replay_buffer():
+                logger.info("⏺️  Replay buffer ARMED")
+            return
         if not recording_active.is_set():
             if obs_client.start_recording():
                 recording_active.set()
@@ -67,6 +93,12 @@ def record(
     def on_match_end():
         """Callback when match ends."""
         logger.info("🏁 Signal: Match Ended")
+        if replay_buffer:
+            obs_client.stop_replay_buffer()
+            match_id = db.save_match(video_path='', log_path=gsi_server.last_completed_log)
+            clips = db.attach_highlight_sources(match_id, gsi_server.last_completed_match_id)
+            logger.info(f"💾 Match #{match_id} saved with {clips} replay clips")
+            return
         if recording_active.is_set():
             path = obs_client.stop_recording()
             recording_active.clear()
@@ -75,13 +107,26 @@ def record(
             # But the prompt implies "cycle", let's assume continuous for now or 
             # if the user wants single match, they can Ctrl+C.
     
+    def on_highlight(highlight):
+        """Callback after a kill or multi-kill (replay buffer mode)."""
+        saved_time = time.time()
+        clip_path = obs_client.save_replay_buffer()
+        if clip_path:
+            db.save_highlight_source(clip_path, highlight, saved_time=saved_time)
+            logger.info(f"🎬 {highlight['label']} (round {highlight['round']}) saved to: {clip_path}")
+    
     # Initialize GSI Server
     # Note: GSIServer expects an object with calculate_video_timestamp (or updated get_current_timestamp compat)
     gsi_server = GSIServer(
         obs_manager=obs_client,
         port=gsi_port,
         on_match_start=on_match_start,
-        on_match_end=on_match_end
+        on_match_end=on_match_end,
+        recording_clock=recording_clock,
+        capture_file=capture,
+        on_highlight=on_highlight if replay_buffer else None,
+        highlight_delay=highlight_delay,
+        pause_downtime=pause_downtime
     )
     
     # Handle Ctrl+C
@@ -95,13 +140,20 @@ def record(
         # Connect OBS
         with obs_client:
             # Start GSI
+            recording_clock.start()
             gsi_server.start()
             
             logger.info("👀 Waiting for CS2 events... (Press Ctrl+C to stop)")
             
-            # Helper: Check periodically if OBS is still connected
+            # The health monitor supervises the OBS link in the background
             while not stop_event.is_set():
                 time.sleep(1)
+            
+            health = obs_client.get_health_stats()
+            if 'rtt' in health:
+                logger.info(f"OBS link: RTT p50 {health['rtt']['p50_ms']:.0f}ms, p99 {health['rtt']['p99_ms']:.0f}ms, "
+                            f"{health['reconnects']} reconnects, {health['downtime_s']:.1f}s down, "
+                            f"{health['unavailable_calls']} calls answered unavailable")
                 
     except Exception as e:
         logger.error(f"Critical Error: {e}")
@@ -113,7 +165,16 @@ def record(
             logger.warning("Force stopping recording...")
             obs_client.stop_recording()
             
+        recording_clock.stop()
+        clock_stats = recording_clock.get_stats()
+        if clock_stats['residual_count']:
+            logger.info(f"Recording clock: RMS error {clock_stats['rms_residual_ms']:.1f}ms, "
+                        f"max {clock_stats['max_residual_ms']:.1f}ms, drift {clock_stats['drift_ppm']:.0f}ppm")
+            
         gsi_server.stop()
+        for name, stats in gsi_server.get_callback_stats().items():
+            logger.info(f"Callback {name}: {stats['calls']} calls, mean {stats['mean_ms']:.0f}ms, "
+                        f"max {stats['max_ms']:.0f}ms, {stats['timeouts']} timeouts")
         logger.info("Bye!")
 
 
@@ -121,9 +182,13 @@ def record(
 def process(
     last: bool = typer.Option(False, "--last", help="Process the last recorded match automatically"),
     video: Optional[str] = typer.Option(None, help="Path to video file"),
-    log: Optional[str] = typer.Option(None, help="Path to match_log.json"),
+    log: Optional[str] = typer.Option(None, help="Path to the match log (match_log.jsonl)"),
     output: str = "highlights",
-    gpu: bool = True
+    gpu: bool = True,
+    cut_tolerance: float = typer.Option(1.0, help="Seconds a clip boundary may move to start on a keyframe"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ask the AI again even if this log was analyzed before"),
+    offline: bool = typer.Option(False, "--offline", help="Use the rule-based director instead of the AI"),
+    min_round_score: int = typer.Option(1, help="Rounds the local pre-scorer rates lower are not sent to the AI")
 ):
     """
     Process highlights from a recording.
@@ -161,8 +226,16 @@ def process(
         
     # 1. AI Analysis
     logger.info("🤖 Starting AI Director analysis...")
-    ai = AIDirector()
+    if offline or not os.getenv("GOOGLE_API_KEY"):
+        if not offline:
+            logger.warning("No GOOGLE_API_KEY set, using the offline rule-based director.")
+        ai = RuleDirector()
+    else:
+        ai = AIDirector(cache=ResponseCache(bypass=no_cache), min_round_score=min_round_score)
     highlights = ai.analyze_match_log(log_path)
+    failed_rounds = getattr(ai, 'failed_rounds', [])
+    if failed_rounds:
+        logger.warning(f"{len(failed_rounds)} rounds were not analyzed (API errors or quota); run process again to retry them.")
     
     if not highlights:
         logger.warning("No highlights found.")
@@ -170,10 +243,82 @@ def process(
         
     # 2. Video Rendering
     logger.info("🎬 Starting Video Editor rendering...")
-    editor = VideoEditor(output_dir=output, use_gpu=gpu)
+    editor = VideoEditor(output_dir=output, use_gpu=gpu, cut_tolerance=cut_tolerance)
     clips = editor.create_highlights_batch(highlights, video_path)
     
     logger.info(f"✨ Done! Created {len(clips)} clips in '{output}/'")
 
+
+@app.command()
+def markers(
+    video: Optional[str] = typer.Option(None, help="Path to the recording (default: last match in the database)"),
+    log: Optional[str] = typer.Option(None, help="Path to the match log (default: log saved with the recording)"),
+    subtitles: bool = typer.Option(True, help="Also add the events as a text track")
+):
+    """
+    Embed a match's rounds and kills into its recording as chapters (no re-encode).
+    """
+    db = MatchDatabase()
+    match = db.get_match_by_video(video) if video else (db.get_all_matches(limit=1) or [None])[0]
+    video_path = video or (match or {}).get('video_path')
+    log_path = log or (match or {}).get('log_path')
+    
+    if not video_path or not log_path or not Path(log_path).exists():
+        logger.error("Missing video or log path. Please specify --video and --log.")
+        raise typer.Exit(code=1)
+    
+    segments = db.get_segments(match['id']) if match else []
+    embedded = embed_match_markers(log_path, video_path, segments=segments, subtitles=subtitles)
+    if not embedded:
+        raise typer.Exit(code=1)
+    logger.info(f"🔖 Markers embedded into {embedded} file(s)")
+
+
+@app.command()
+def prepare(
+    video: Optional[str] = typer.Option(None, help="Path to the recording (default: last match in the database)"),
+    keep_source: bool = typer.Option(True, help="Keep the original file when an MKV is remuxed to MP4")
+):
+    """
+    Remux a recording into a faststart MP4 and index its keyframes (no re-encode).
+    """
+    db = MatchDatabase()
+    match = db.get_match_by_video(video) if video else (db.get_all_matches(limit=1) or [None])[0]
+    video_path = video or (match or {}).get('video_path')
+    
+    if not video_path or not Path(video_path).exists():
+        logger.error("Recording not found. Please specify --video.")
+        raise typer.Exit(code=1)
+    
+    new_path, index = prepare_recording(video_path, keep_source=keep_source)
+    if match and new_path != video_path:
+        db.update_match(match['id'], video_path=new_path)
+        db.update_segment_path(match['id'], video_path, new_path)
+    if index is None:
+        raise typer.Exit(code=1)
+    logger.info(f"🗂️  {new_path}: {len(index.keyframes)} keyframes, {index.duration:.0f}s")
+
+
+@app.command()
+def replay(
+    capture: str = typer.Argument(..., help="Capture file recorded with --capture or debug_gsi_payload"),
+    speed: float = typer.Option(0.0, help="Replay speed multiplier (1 = real time, 0 = as fast as possible)"),
+    log: str = typer.Option("replay_log.jsonl", help="Where to write the replayed match log")
+):
+    """
+    Replay a GSI capture through the event detector (no CS2 or OBS needed).
+    """
+    if not Path(capture).exists():
+        logger.error(f"Capture file does not exist: {capture}")
+        raise typer.Exit(code=1)
+    
+    logger.info(f"⏯️  Replaying {capture} ({f'{speed:g}x' if speed else 'as fast as possible'})...")
+    _, stats = replay_capture(capture, log_file=log, speed=speed or None)
+    
+    logger.info(f"✨ Replayed {stats['payloads']} payloads → {stats['events']} events in {stats['wall_time']:.2f}s")
+    logger.info(f"   Ingest throughput: {stats['payloads_per_second']:.0f} payloads/s")
+    for match_log in stats['logs']:
+        logger.info(f"   Match log: {match_log}")
+
 if __name__ == "__main__":
     app()
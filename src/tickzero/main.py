@@ -2,6 +2,7 @@
 Main orchestration script for CS2 Capture-to-Content Pipeline.
 Coordinates OBS recording, GSI event logging, and post-processing workflow.
 """
+import os
 import sys
 import time
 import logging
@@ -9,9 +10,14 @@ import threading
 from pathlib import Path
 
 from tickzero.core.obs_manager import OBSManager
+from tickzero.core.obs_async import AsyncOBSClient
 from tickzero.core.gsi_server import GSIServer
 from tickzero.core.ai_director import AIDirector
+from tickzero.core.highlight_scorer import RuleDirector
+from tickzero.core.response_cache import ResponseCache
 from tickzero.core.video_editor import VideoEditor
+from tickzero.core.video_markers import embed_match_markers
+from tickzero.core.seek_index import prepare_recording
 from tickzero.web.match_database import MatchDatabase
 
 logging.basicConfig(
@@ -20,6 +26,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Defaults shared by main()'s config and the pipeline's fallbacks for a partial config
+DEFAULT_AI_MIN_ROUND_SCORE = 1  # Rounds the local pre-scorer rates lower skip the LLM
+DEFAULT_CUT_TOLERANCE = 1.0  # Seconds a clip boundary may move to start/end on a keyframe
+
 
 class CS2HighlightPipeline:
     """Main pipeline coordinator."""
@@ -36,23 +46,39 @@ class CS2HighlightPipeline:
         # Initialize database
         self.db = MatchDatabase(self.config.get('db_path', 'matches.db'))
         
-        # Initialize components
-        self.obs = OBSManager(
+        # Initialize components (the async client follows OBS recording events
+        # instead of polling and reports the real output path)
+        obs_class = AsyncOBSClient if self.config.get('obs_async', False) else OBSManager
+        self.obs = obs_class(
             host=self.config.get('obs_host', 'localhost'),
             port=self.config.get('obs_port', 4455),
             password=self.config.get('obs_password', '')
         )
         
+        # "recording" records the whole match; "replay_buffer" only saves the
+        # OBS replay buffer after kills (short clips, no full-match file)
+        self.capture_mode = self.config.get('capture_mode', 'recording')
+        
         # Setup match callbacks
         match_start_callback = self._on_match_start if self.config.get('auto_recording', True) else None
         match_end_callback = self._on_match_end if self.config.get('continuous_mode') else None
+        highlight_callback = self._on_highlight if self.capture_mode == 'replay_buffer' else None
         
         self.gsi = GSIServer(
             obs_manager=self.obs,
             port=self.config.get('gsi_port', 3000),
-            log_file=self.config.get('log_file', 'match_log.json'),
+            log_file=self.config.get('log_file', 'match_log.jsonl'),
+            log_dir=self.config.get('log_dir'),
             on_match_start=match_start_callback,
-            on_match_end=match_end_callback
+            on_match_end=match_end_callback,
+            ingest_mode=self.config.get('gsi_ingest_mode', 'threaded'),
+            max_queue_size=self.config.get('gsi_queue_size', 256),
+            fsync_policy=self.config.get('log_fsync', 'interval'),
+            callback_timeout=self.config.get('callback_timeout', 30.0),
+            on_highlight=highlight_callback,
+            highlight_delay=self.config.get('highlight_delay', 3.0),
+            pause_downtime=self.config.get('pause_downtime', False),
+            split_rounds=self.config.get('split_rounds', False)
         )
         
         self.ai_director = None  # Initialize when needed (requires API key)
@@ -78,7 +104,12 @@ class CS2HighlightPipeline:
         
         # Step 2: Start recording (or wait for match to start)
         logger.info("\n[2/3] Preparing recording...")
-        if self.config.get('auto_recording', True):
+        if self.capture_mode == 'replay_buffer':
+            logger.info("✓ Replay buffer mode: kills are saved as short clips, no full-match recording")
+            if not self.config.get('auto_recording', True) and not self.obs.start_replay_buffer():
+                logger.error("Failed to start the replay buffer. Enable it in OBS output settings.")
+                return False
+        elif self.config.get('auto_recording', True):
             logger.info("✓ Auto-recording enabled")
             logger.info("  Recording will start automatically when match begins")
         else:
@@ -123,6 +154,12 @@ class CS2HighlightPipeline:
         Callback when match starts (first round goes live).
         Triggers automatic recording start.
         """
+        if self.capture_mode == 'replay_buffer':
+            logger.info("🎮 MATCH STARTED - ARMING REPLAY BUFFER")
+            if not self.obs.start_replay_buffer():
+                logger.error("✗ Failed to start replay buffer")
+            return
+        
         logger.info("\n" + "=" * 60)
         logger.info("🎮 MATCH STARTED - BEGINNING RECORDING")
         logger.info("=" * 60)
@@ -138,18 +175,30 @@ class CS2HighlightPipeline:
         """
         Callback when match ends in continuous mode.
         Stops current recording, triggers processing, and prepares for next match.
+        Runs on the GSI lifecycle dispatcher thread, so the sleep and database
+        write below do not delay GSI ingest.
         """
         logger.info("\n" + "=" * 60)
         logger.info("🏁 MATCH ENDED")
         logger.info("=" * 60)
         
-        # Get current recording path and stop recording
-        recording_path = self.obs.get_last_recording_path()
+        # The finished match's log; the GSI server may already be writing the next one
+        log_path = self.gsi.last_completed_log
+        
+        if self.capture_mode == 'replay_buffer':
+            self._finish_replay_buffer_match(log_path)
+            return
         
+        # Stop recording, then ask for the path of the file that was just closed
         if self.obs.is_recording:
             logger.info("Stopping recording...")
             self.obs.stop_recording()
-            time.sleep(1)  # Brief pause for file to be written
+            if hasattr(self.obs, 'wait_for_recording_stopped'):
+                self.obs.wait_for_recording_stopped(timeout=10)
+            else:
+                time.sleep(1)  # Brief pause for file to be written
+        
+        recording_path = self.obs.get_last_recording_path()
         
         if not recording_path:
             logger.warning("Cannot auto-process: recording path unknown")
@@ -160,16 +209,24 @@ class CS2HighlightPipeline:
         # Save match to database
         match_id = self.db.save_match(
             video_path=recording_path,
-            log_path=self.gsi.log_file
+            log_path=log_path
         )
         logger.info(f"✓ Match #{match_id} saved to database")
         
-        # Start processing in background thread if auto-processing is enabled
-        if self.config.get('auto_process', False):
+        # Segment index of a recording split per round (the last file is the one just stopped)
+        segments = self.gsi.last_completed_segments
+        if segments:
+            if not segments[-1]['path']:
+                segments[-1]['path'] = recording_path
+            self.db.save_segments(match_id, segments)
+            logger.info(f"✓ Indexed {len(segments)} recording segments")
+        
+        # Embed markers, prepare and process in a background thread (remux and FFmpeg take a while)
+        if any(self.config.get(key, False) for key in ('embed_markers', 'prepare_recordings', 'auto_process')):
             logger.info("Starting background processing...")
             self.processing_thread = threading.Thread(
                 target=self._background_process,
-                args=(recording_path,),
+                args=(recording_path, log_path, segments, match_id),
                 daemon=True
             )
             self.processing_thread.start()
@@ -179,34 +236,125 @@ class CS2HighlightPipeline:
             logger.info("\n⏳ Ready for next match...")
             logger.info("Recording will start automatically when the next match begins.\n")
     
-    def _background_process(self, video_path):
-        """Process highlights in background while recording continues."""
+    def _on_highlight(self, highlight):
+        """
+        Callback for a kill or multi-kill in replay buffer mode.
+        Saves the OBS replay buffer and registers the clip as a highlight source.
+        Runs on the GSI lifecycle dispatcher thread, after the configured delay.
+        """
+        saved_time = time.time()  # The buffer ends at the save request
+        clip_path = self.obs.save_replay_buffer()
+        if not clip_path:
+            logger.warning(f"✗ Replay buffer clip for the {highlight['label']} in round {highlight['round']} was not saved")
+            return
+        
+        self.db.save_highlight_source(clip_path, highlight, saved_time=saved_time)
+        logger.info(f"🎬 Saved {highlight['label']} (round {highlight['round']}): {clip_path}")
+    
+    def _finish_replay_buffer_match(self, log_path):
+        """Stop the replay buffer and save the match with its clips."""
+        self.obs.stop_replay_buffer()
+        
+        # No full-match video in this mode: the clips are the highlights
+        match_id = self.db.save_match(video_path='', log_path=log_path)
+        clips = self.db.attach_highlight_sources(match_id, self.gsi.last_completed_match_id)
+        logger.info(f"✓ Match #{match_id} saved to database with {clips} replay clips")
+        
+        if self.config.get('continuous_mode'):
+            logger.info("\n⏳ Ready for next match...")
+            logger.info("The replay buffer will start again when the next match begins.\n")
+    
+    def _background_process(self, video_path, log_path=None, segments=None, match_id=None):
+        """Embed markers, prepare and process highlights in background while recording continues."""
         try:
             time.sleep(3)  # Wait for file to be fully written
             
+            if self.config.get('embed_markers', False):
+                self.embed_markers(video_path, log_path=log_path, segments=segments)
+            if self.config.get('prepare_recordings', False):
+                video_path = self.prepare_recording(video_path, match_id=match_id, segments=segments)
+            if not self.config.get('auto_process', False):
+                return
+            
             min_priority = self.config.get('auto_min_priority', 6)
             logger.info(f"\n[Background] Processing highlights from: {video_path}")
             
-            self.run_post_processing(video_path, min_priority=min_priority)
+            self.run_post_processing(video_path, min_priority=min_priority, log_path=log_path)
             
             logger.info("\n[Background] Processing complete!\n")
         except Exception as e:
             logger.error(f"[Background] Processing failed: {e}")
     
+    def embed_markers(self, video_path, log_path=None, segments=None):
+        """
+        Write the match's rounds and kills into its recording as chapters and
+        an event text track (stream copy, no re-encode).
+        
+        Args:
+            video_path: Path to OBS recording
+            log_path: Match log of the recording (default: the GSI server's current log)
+            segments: Segment index of a recording split per round
+            
+        Returns:
+            int: Number of files that now carry markers
+        """
+        log_path = log_path or self.gsi.log_file
+        if not Path(log_path).exists():
+            logger.warning(f"Cannot embed markers: match log not found: {log_path}")
+            return 0
+        return embed_match_markers(log_path, video_path, segments=segments)
+    
+    def prepare_recording(self, video_path, match_id=None, segments=None):
+        """
+        Remux a finished recording into a seek-friendly MP4 and index its
+        keyframes, so clip extraction does not probe the container.
+        
+        Args:
+            video_path: Path to OBS recording
+            match_id: Database match whose paths follow the remuxed files
+            segments: Segment index of a recording split per round (paths
+                      are updated in place)
+            
+        Returns:
+            str: Path of the prepared recording
+        """
+        keep_source = self.config.get('keep_remux_source', True)
+        for segment in segments or []:
+            if segment['path'] == video_path or not Path(segment['path']).exists():
+                continue
+            new_path, _ = prepare_recording(segment['path'], keep_source=keep_source)
+            if new_path != segment['path'] and match_id is not None:
+                self.db.update_segment_path(match_id, segment['path'], new_path)
+            segment['path'] = new_path
+        
+        new_path, _ = prepare_recording(video_path, keep_source=keep_source)
+        if new_path != video_path and match_id is not None:
+            self.db.update_match(match_id, video_path=new_path)
+            self.db.update_segment_path(match_id, video_path, new_path)
+        for segment in segments or []:
+            if segment['path'] == video_path:
+                segment['path'] = new_path
+        return new_path
+    
     def stop_live_logging(self):
         """Stop live logging and save event data."""
         logger.info("\n" + "=" * 60)
         logger.info("Stopping live logging...")
         logger.info("=" * 60)
         
-        # Stop GSI server (this saves logs)
+        # Stop GSI server (this saves logs and saves any pending highlight clip)
         self.gsi.stop()
         
-        # Get the recording file path before stopping
-        recording_path = self.obs.get_last_recording_path()
+        if self.capture_mode == 'replay_buffer':
+            self.obs.stop_replay_buffer()
+            self.obs.disconnect()
+            logger.info("\n✓ Live logging session complete")
+            logger.info(f"✓ Events saved to: {self.gsi.log_file}")
+            return None
         
-        # Stop OBS recording
+        # Stop OBS recording, then get the path of the finished file
         self.obs.stop_recording()
+        recording_path = self.obs.get_last_recording_path()
         
         # Disconnect from OBS
         self.obs.disconnect()
@@ -216,7 +364,7 @@ class CS2HighlightPipeline:
         
         return recording_path
     
-    def run_post_processing(self, source_video, api_key=None, min_priority=6):
+    def run_post_processing(self, source_video, api_key=None, min_priority=6, log_path=None):
         """
         PHASE 2 & 3: Post-processing workflow.
         
@@ -227,6 +375,8 @@ class CS2HighlightPipeline:
             source_video: Path to OBS recording
             api_key: Google API key (or set GOOGLE_API_KEY env variable)
             min_priority: Minimum priority for clips (1-10, default: 6)
+            log_path: Match log to analyze (default: the log saved with this
+                      video in the database, else the GSI server's current log)
         """
         logger.info("\n" + "=" * 60)
         logger.info("CS2 CAPTURE-TO-CONTENT PIPELINE - POST-PROCESSING PHASE")
@@ -241,10 +391,46 @@ class CS2HighlightPipeline:
         logger.info("\n[PHASE 2] AI DIRECTOR - Analyzing match events...")
         logger.info("=" * 60)
         
-        self.ai_director = AIDirector(api_key=api_key)
+        match = self.db.get_match_by_video(source_video)
+        if log_path is None:
+            log_path = match['log_path'] if match else self.gsi.log_file
+        logger.info(f"Match log: {log_path}")
+        
+        # Without an API key the rule-based scorer is the director
+        director = self.config.get('ai_director', 'gemini')
+        if director != 'rules' and not (api_key or os.getenv('GOOGLE_API_KEY')):
+            logger.warning("⚠ No Google API key, using the offline rule-based director")
+            director = 'rules'
+        
+        if director == 'rules':
+            self.ai_director = RuleDirector()
+        else:
+            # Cached round analyses make re-processing (e.g. with another min_priority) free
+            cache = None
+            if self.config.get('ai_cache'):
+                cache = ResponseCache(
+                    self.config['ai_cache'],
+                    max_bytes=self.config.get('ai_cache_max_mb', 64) * 1024 * 1024,
+                    max_age_days=self.config.get('ai_cache_max_age_days', 30),
+                    bypass=self.config.get('ai_cache_bypass', False)
+                )
+            
+            self.ai_director = AIDirector(
+                api_key=api_key,
+                max_workers=self.config.get('ai_workers', 4),
+                rpm=self.config.get('ai_rpm'),
+                tpm=self.config.get('ai_tpm'),
+                cache=cache,
+                min_round_score=self.config.get('ai_min_round_score', DEFAULT_AI_MIN_ROUND_SCORE)
+            )
         
         try:
-            highlights = self.ai_director.analyze_match_log(self.gsi.log_file)
+            highlights = self.ai_director.analyze_match_log(log_path)
+            
+            failed_rounds = getattr(self.ai_director, 'failed_rounds', [])
+            if failed_rounds:
+                logger.warning(f"⚠ {len(failed_rounds)} rounds were not analyzed (API errors or quota); "
+                               f"process the match again to retry them")
             
             if not highlights:
                 logger.warning("No highlights identified by AI Director.")
@@ -265,14 +451,25 @@ class CS2HighlightPipeline:
         logger.info("\n[PHASE 3] VIDEO ENGINE - Creating highlight clips...")
         logger.info("=" * 60)
         
+        # A recording split per round is cut from the segment files
+        segments = self.db.get_segments(match['id']) if match else []
+        
         self.video_editor = VideoEditor(
             source_video=source_video,
             output_dir=self.config.get('output_dir', 'highlights'),
-            use_gpu=self.config.get('use_gpu', True)
+            use_gpu=self.config.get('use_gpu', True),
+            segments=segments,
+            cut_tolerance=self.config.get('cut_tolerance', DEFAULT_CUT_TOLERANCE),
+            render_mode=self.config.get('render_mode', 'vertical')
         )
         
         # Create all highlights
-        created_clips = self.video_editor.create_highlights_batch(highlights)
+        created_clips = self.video_editor.create_highlights_batch(
+            highlights, max_workers=self.config.get('render_workers', 1))
+        
+        if segments and self.config.get('delete_unused_segments', False):
+            deleted = self.video_editor.delete_unused_segments(highlights)
+            self.db.mark_segments_deleted(match['id'], deleted)
         
         logger.info("\n" + "=" * 60)
         logger.info("✓ POST-PROCESSING COMPLETE")
@@ -291,16 +488,46 @@ def main():
         'obs_host': 'localhost',
         'obs_port': 4455,
         'obs_password': '',
+        'obs_async': False,          # Event-driven OBS client (needs the websockets package)
         'gsi_port': 3000,
-        'log_file': 'match_log.json',
+        'gsi_ingest_mode': 'threaded',  # 'async' = acknowledge immediately, process from a bounded queue
+        'log_file': 'match_log.jsonl',
+        'log_dir': 'match_logs',     # One log per match (match_<id>.jsonl); overrides log_file
+        'log_fsync': 'interval',     # Match log durability: 'none', 'interval' or 'event'
+        'callback_timeout': 30.0,    # Seconds a match start/end callback may block its dispatcher
         'output_dir': 'highlights',
         'use_gpu': True,
+        'capture_mode': 'recording', # 'replay_buffer' = only save OBS replay buffer clips of kills
+        'highlight_delay': 3.0,      # Seconds after a kill (spree) before the replay buffer is saved
+        'pause_downtime': False,     # Pause OBS during warmup, freezetime/timeouts and halftime
+        'split_rounds': False,       # New recording file per round (OBS 30+ / obs-websocket 5.5+)
+        'delete_unused_segments': False,  # Delete round files without highlights after processing
+        'ai_director': 'gemini',     # 'rules' = offline rule-based highlights (also used without an API key)
+        'ai_min_round_score': DEFAULT_AI_MIN_ROUND_SCORE,  # Rounds the local pre-scorer rates lower skip the LLM (1 = skip rounds without kills)
+        'ai_workers': 4,             # Rounds analyzed by the LLM at once
+        'ai_rpm': None,              # LLM requests per minute (None = the model's free-tier quota)
+        'ai_tpm': None,              # LLM tokens per minute (None = the model's free-tier quota)
+        'ai_cache': 'ai_cache.db',   # Cache of LLM round analyses (None = disabled)
+        'ai_cache_max_mb': 64,       # Cache size before least recently used entries are evicted
+        'ai_cache_max_age_days': 30, # Cached analyses older than this are not reused
+        'ai_cache_bypass': False,    # Always ask the LLM again (fresh answers still refresh the cache)
+        'render_workers': 1,         # Highlight clips rendered in parallel
+        'cut_tolerance': DEFAULT_CUT_TOLERANCE,  # Seconds a clip boundary may move to start/end on a keyframe
+        'render_mode': 'vertical',   # 'vertical' (9:16 crop) or 'smart_cut' (16:9, copies whole GOPs)
+        'embed_markers': False,      # Write rounds/kills into the recording as chapters (stream-copy remux)
+        'prepare_recordings': False, # Remux recordings into faststart MP4 and index their keyframes
+        'keep_remux_source': True,   # Keep the original MKV after remuxing it to MP4
         'auto_recording': True,      # Automatically start/stop recording based on match detection
         'continuous_mode': True,     # Enable continuous multi-match recording
         'auto_process': True,        # Automatically process highlights after match
         'auto_min_priority': 6       # Minimum priority for auto-processing
     }
     
+    # --no-cache: analyze again even if the rounds are cached
+    if '--no-cache' in sys.argv:
+        sys.argv.remove('--no-cache')
+        config['ai_cache_bypass'] = True
+    
     pipeline = CS2HighlightPipeline(config)
     
     # Mode selection
@@ -318,8 +545,15 @@ def main():
                 except KeyboardInterrupt:
                     recording_path = pipeline.stop_live_logging()
                     
-                    # Auto-process highlights if enabled
-                    if config.get('auto_process', False):
+                    if recording_path and (config.get('embed_markers', False) or config.get('prepare_recordings', False)):
+                        time.sleep(2)  # Brief pause for OBS to finish writing
+                        if config.get('embed_markers', False):
+                            pipeline.embed_markers(recording_path)
+                        if config.get('prepare_recordings', False):
+                            recording_path = pipeline.prepare_recording(recording_path)
+                    
+                    # Auto-process highlights if enabled (replay buffer clips need no cutting)
+                    if config.get('auto_process', False) and pipeline.capture_mode == 'recording':
                         logger.info("\n" + "=" * 60)
                         logger.info("AUTO-PROCESSING ENABLED")
                         logger.info("=" * 60)
@@ -338,8 +572,8 @@ def main():
         
         elif mode == 'process':
             # POST-PROCESSING MODE
-            # Usage: python main.py process <video_path> [api_key] [min_priority]
-            #    OR: python main.py process <video_path> [min_priority]
+            # Usage: python main.py process <video_path> [api_key] [min_priority] [--no-cache]
+            #    OR: python main.py process <video_path> [min_priority] [--no-cache]
             if len(sys.argv) < 3:
                 print("Usage: python main.py process <video_path> [api_key] [min_priority]")
                 print("   OR: python main.py process <video_path> [min_priority]")
@@ -3,13 +3,14 @@ OBS Controller Module.
 
 Handles robust communication with OBS Studio via WebSocket.
 Features:
-- Resilient connection with auto-reconnect
+- Resilient connection with background health checks and reconnection
 - Accurate timecode synchronization
 - Context manager support
 - Safe recording control
 """
 import time
 import logging
+import threading
 from typing import Optional, Dict, Any
 
 # Using imports compatible with generic obs-websocket-py usage
@@ -21,8 +22,11 @@ except ImportError:
     # Fallback or mock for environments without the library (for type checking/planning)
     obsws = Any
     obs_requests = Any
+    obs_events = Any
     ConnectionFailure = Exception
 
+from tickzero.core.obs_health import ConnectionMonitor
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,7 +38,7 @@ class OBSClient:
     """
     
     def __init__(self, host: str = "localhost", port: int = 4455, password: str = "", 
-                 connect_retries: int = 3, retry_delay: int = 2):
+                 connect_retries: int = 3, retry_delay: int = 2, health_check_interval: float = 2.0):
         """
         Initialize OBS Client.
         
@@ -44,6 +48,8 @@ class OBSClient:
             password: OBS WebSocket password.
             connect_retries: Number of retries for initial connection.
             retry_delay: Seconds to wait between retries.
+            health_check_interval: Seconds between background pings once the
+                health monitor runs (started by the context manager).
         """
         self.host = host
         self.port = port
@@ -52,15 +58,104 @@ class OBSClient:
         self.retry_delay = retry_delay
         self.ws: Optional[obsws] = None
         self._is_connected = False
+        self.health_check_interval = health_check_interval
+        self.monitor: Optional[ConnectionMonitor] = None
+        self.current_output_path: Optional[str] = None  # File being recorded (from OBS events)
+        self._file_changed = threading.Event()
         
     def __enter__(self) -> 'OBSClient':
-        """Context manager entry - establishes connection."""
+        """Context manager entry - establishes connection and starts the health monitor."""
         self.connect()
+        self.start_health_monitor()
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit - closes connection."""
+        self.stop_health_monitor()
         self.disconnect()
+    
+    def start_health_monitor(self):
+        """
+        Supervise the connection from a background thread.
+        
+        From now on a lost connection is detected by periodic pings and
+        re-established with backoff in the background; recording calls made
+        while it is down return their "unavailable" value immediately.
+        """
+        if self.monitor:
+            return
+        self.monitor = ConnectionMonitor(
+            connect=self._open_socket,
+            ping=self._ping,
+            on_down=self._drop_socket,
+            interval=self.health_check_interval
+        )
+        self.monitor.start(connected=self._is_connected)
+    
+    def stop_health_monitor(self):
+        """Stop the background health monitor (back to inline reconnects)."""
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor = None
+    
+    def get_health_stats(self) -> Dict[str, Any]:
+        """
+        Get connection health statistics.
+        
+        Returns:
+            Dict[str, Any]: State, ping RTT histogram, reconnects and downtime
+                (just the state when the monitor is not running).
+        """
+        if not self.monitor:
+            return {"state": "connected" if self._is_connected else "disconnected"}
+        return self.monitor.get_stats()
+    
+    def _open_socket(self):
+        """Single connection attempt; raises on failure (used by the monitor)."""
+        ws = obsws(self.host, self.port, self.password)
+        ws.connect()
+        self._register_events(ws)
+        self.ws = ws
+        self._is_connected = True
+    
+    def _ping(self):
+        """Lightweight round trip used as the health check."""
+        if not self.ws:
+            raise ConnectionError("No OBS connection")
+        self.ws.call(obs_requests.GetVersion())
+    
+    def _drop_socket(self):
+        """Forget a dead connection so hot-path calls stop using it."""
+        ws, self.ws = self.ws, None
+        self._is_connected = False
+        if ws:
+            try:
+                ws.disconnect()
+            except Exception:
+                pass
+    
+    def _register_events(self, ws):
+        """Follow the recording file OBS writes to (changes on start and split)."""
+        try:
+            ws.register(self._on_record_state_changed, obs_events.RecordStateChanged)
+            ws.register(self._on_record_file_changed, obs_events.RecordFileChanged)
+        except Exception as e:
+            logger.debug(f"Could not subscribe to recording events: {e}")
+    
+    def _on_record_state_changed(self, event):
+        data = getattr(event, 'datain', None) or {}
+        if data.get('outputState') == "OBS_WEBSOCKET_OUTPUT_STARTED":
+            self.current_output_path = data.get('outputPath') or self.current_output_path
+    
+    def _on_record_file_changed(self, event):
+        data = getattr(event, 'datain', None) or {}
+        self.current_output_path = data.get('newOutputPath')
+        self._file_changed.set()
+    
+    def _call_failed(self):
+        """A request raised: let the monitor re-check the link right away."""
+        if self.monitor:
+            self.monitor.report_failure()
         
     def connect(self) -> bool:
         """
@@ -77,6 +172,7 @@ class OBSClient:
                 logger.debug(f"Connecting to OBS ({self.host}:{self.port}), attempt {attempt}...")
                 self.ws = obsws(self.host, self.port, self.password)
                 self.ws.connect()
+                self._register_events(self.ws)
                 self._is_connected = True
                 logger.info("✓ Connected to OBS WebSocket")
                 return True
@@ -102,23 +198,40 @@ class OBSClient:
                 self.ws = None
                 self._is_connected = False
                 
-    def ensure_connection(self):
-        """Ensure connection is active, reconnecting if necessary."""
-        if not self._is_connected or not self.ws:
-            logger.info("Connection lost, attempting to reconnect...")
-            self.connect()
+    def ensure_connection(self) -> bool:
+        """
+        Ensure connection is active.
+        
+        With the health monitor running this never blocks: it reports whether
+        the link is up and leaves reconnection to the monitor. Without it,
+        reconnects inline (with retries).
+        
+        Returns:
+            bool: True if connected.
+        """
+        if self._is_connected and self.ws:
+            return True
+        if self.monitor:
+            self.monitor.reject()
+            return False
+        logger.info("Connection lost, attempting to reconnect...")
+        return self.connect()
             
-    def get_current_timestamp(self) -> int:
+    def get_current_timestamp(self, unavailable: Optional[int] = 0) -> Optional[int]:
         """
         Get the precise recording timestamp from OBS.
         
+        Args:
+            unavailable: Value returned when OBS cannot be reached (default 0;
+                pass None to tell "unreachable" apart from "not recording").
+        
         Returns:
             int: Current recording timestamps in milliseconds.
-                 Returns 0 if not recording or error.
+                 Returns 0 if not recording, `unavailable` if OBS cannot be
+                 reached or the request fails.
         """
-        self.ensure_connection()
-        if not self.ws:
-            return 0
+        if not self.ensure_connection():
+            return unavailable
             
         try:
             # GetRecordStatus returns outputActive, outputDuration (ms), outputTimecode (str), etc.
@@ -131,7 +244,8 @@ class OBSClient:
                 return 0
         except Exception as e:
             logger.error(f"Error getting timestamp: {e}")
-            return 0
+            self._call_failed()
+            return unavailable
             
     def start_recording(self) -> bool:
         """
@@ -142,8 +256,8 @@ class OBSClient:
         Returns:
             bool: True if recording started or was already active, False on error.
         """
-        self.ensure_connection()
-        if not self.ws:
+        if not self.ensure_connection():
+            logger.error("Cannot start recording: OBS unavailable")
             return False
             
         try:
@@ -158,6 +272,7 @@ class OBSClient:
             return True
         except Exception as e:
             logger.error(f"Error starting recording: {e}")
+            self._call_failed()
             return False
             
     def stop_recording(self) -> Optional[str]:
@@ -167,8 +282,8 @@ class OBSClient:
         Returns:
             Optional[str]: Path to the recording if successful, None otherwise.
         """
-        self.ensure_connection()
-        if not self.ws:
+        if not self.ensure_connection():
+            logger.error("Cannot stop recording: OBS unavailable")
             return None
             
         try:
@@ -198,4 +313,163 @@ class OBSClient:
             return path
         except Exception as e:
             logger.error(f"Error stopping recording: {e}")
+            self._call_failed()
+            return None
+    
+    def pause_recording(self) -> bool:
+        """
+        Pause the active recording.
+        
+        Returns:
+            bool: True if the recording is now paused, False on error.
+        """
+        return self._set_paused(True)
+    
+    def resume_recording(self) -> bool:
+        """
+        Resume a paused recording.
+        
+        Returns:
+            bool: True if the recording is now running, False on error.
+        """
+        return self._set_paused(False)
+    
+    def _set_paused(self, paused: bool) -> bool:
+        """Send PauseRecord/ResumeRecord unless OBS is already in that state."""
+        action = "pause" if paused else "resume"
+        if not self.ensure_connection():
+            logger.error(f"Cannot {action} recording: OBS unavailable")
+            return False
+            
+        try:
+            status = self.ws.call(obs_requests.GetRecordStatus())
+            if not status.getOutputActive():
+                logger.warning(f"OBS is not recording, nothing to {action}")
+                return False
+            if status.getOutputPaused() != paused:
+                self.ws.call(obs_requests.PauseRecord() if paused else obs_requests.ResumeRecord())
+            return True
+        except Exception as e:
+            logger.error(f"Error trying to {action} recording: {e}")
+            self._call_failed()
+            return False
+    
+    def split_recording(self, timeout: float = 5.0) -> Optional[str]:
+        """
+        Close the current recording file and continue in a new one.
+        
+        Requires obs-websocket 5.5+ and an output that supports splitting.
+        
+        Args:
+            timeout: Seconds to wait for OBS to report the new file.
+        
+        Returns:
+            Optional[str]: Path of the new file, None on error or timeout.
+        """
+        if not self.ensure_connection():
+            logger.error("Cannot split recording: OBS unavailable")
+            return None
+            
+        try:
+            self._file_changed.clear()
+            self.ws.call(obs_requests.SplitRecordFile())
+            if not self._file_changed.wait(timeout):
+                logger.warning("⚠ OBS did not report a new recording file (SplitRecordFile unsupported?)")
+                return None
+            return self.current_output_path
+        except Exception as e:
+            logger.error(f"Error splitting recording: {e}")
+            self._call_failed()
+            return None
+    
+    def start_replay_buffer(self) -> bool:
+        """
+        Safely start the OBS replay buffer.
+        
+        Returns:
+            bool: True if the replay buffer started or was already active, False on error.
+        """
+        if not self.ensure_connection():
+            logger.error("Cannot start replay buffer: OBS unavailable")
+            return False
+            
+        try:
+            status = self.ws.call(obs_requests.GetReplayBufferStatus())
+            if status.getOutputActive():
+                logger.info("OBS replay buffer is already active")
+                return True
+                
+            self.ws.call(obs_requests.StartReplayBuffer())
+            logger.info("✓ OBS replay buffer started")
+            return True
+        except Exception as e:
+            logger.error(f"Error starting replay buffer (is it enabled in OBS output settings?): {e}")
+            self._call_failed()
+            return False
+    
+    def stop_replay_buffer(self) -> bool:
+        """
+        Safely stop the OBS replay buffer.
+        
+        Returns:
+            bool: True if the replay buffer was stopped or not running, False on error.
+        """
+        if not self.ensure_connection():
+            logger.error("Cannot stop replay buffer: OBS unavailable")
+            return False
+            
+        try:
+            status = self.ws.call(obs_requests.GetReplayBufferStatus())
+            if status.getOutputActive():
+                self.ws.call(obs_requests.StopReplayBuffer())
+                logger.info("✓ OBS replay buffer stopped")
+            return True
+        except Exception as e:
+            logger.error(f"Error stopping replay buffer: {e}")
+            self._call_failed()
+            return False
+    
+    def save_replay_buffer(self, timeout: float = 5.0) -> Optional[str]:
+        """
+        Save the replay buffer to disk and retrieve the clip path.
+        
+        OBS writes the file asynchronously, so this polls
+        GetLastReplayBufferReplay until the path changes.
+        
+        Args:
+            timeout: Seconds to wait for OBS to report the new file.
+        
+        Returns:
+            Optional[str]: Path of the saved clip, None on error or timeout.
+        """
+        if not self.ensure_connection():
+            logger.error("Cannot save replay buffer: OBS unavailable")
+            return None
+            
+        try:
+            previous = self._last_replay_path()
+            self.ws.call(obs_requests.SaveReplayBuffer())
+            
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                path = self._last_replay_path()
+                if path and path != previous:
+                    logger.info(f"✓ Replay buffer saved: {path}")
+                    return path
+                time.sleep(0.1)
+            logger.warning("⚠ OBS did not report the saved replay in time")
+            return None
+        except Exception as e:
+            logger.error(f"Error saving replay buffer: {e}")
+            self._call_failed()
+            return None
+    
+    def _last_replay_path(self) -> Optional[str]:
+        """Path of the last saved replay (None before the first save)."""
+        try:
+            response = self.ws.call(obs_requests.GetLastReplayBufferReplay())
+        except Exception:
             return None
+        if hasattr(response, 'datain'):
+            return response.datain.get('savedReplayPath')
+        return None
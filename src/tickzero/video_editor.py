@@ -15,6 +15,9 @@ import shutil
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from tickzero.core.cut_planner import plan_cut
+from tickzero.core.seek_index import SeekIndex, load_or_build_index
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -24,17 +27,20 @@ class VideoEditor:
     Handles FFmpeg video processing tasks.
     """
     
-    def __init__(self, output_dir: str = "highlights", use_gpu: bool = True):
+    def __init__(self, output_dir: str = "highlights", use_gpu: bool = True, cut_tolerance: float = 0.0):
         """
         Initialize Video Editor.
         
         Args:
             output_dir: Directory to save processed clips.
             use_gpu: Whether to attempt GPU acceleration.
+            cut_tolerance: Seconds a clip boundary may move to reach a keyframe
+                           (above 0, sources are indexed once and cached on disk).
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.use_gpu = use_gpu
+        self.cut_tolerance = cut_tolerance
         self.hw_config = self.detect_hardware() if use_gpu else self._get_cpu_config()
         
     def detect_hardware(self) -> Dict[str, Any]:
@@ -151,7 +157,14 @@ class VideoEditor:
         3. FG: Scale to width (1080x~608)
         4. Overlay FG onto BG at center
         """
-        duration = end_time - start_time
+        # A prepared recording knows its length without probing the container
+        index = load_or_build_index(source) if self.cut_tolerance > 0 else SeekIndex.load(source)
+        if index is not None and index.duration:
+            end_time = min(end_time, index.duration)
+        
+        # Snap to nearby keyframes and pick the seek strategy
+        plan = plan_cut(index, start_time, end_time, self.cut_tolerance)
+        duration = plan.duration
         if duration <= 0:
             logger.error("Invalid clip duration")
             return False
@@ -182,8 +195,8 @@ class VideoEditor:
         
         cmd.extend(self.hw_config.get('input_args', []))
         
-        cmd.extend(['-ss', str(start_time)])
-        cmd.extend(['-t', str(duration)])
+        cmd.extend(plan.input_args())
+        cmd.extend(['-t', f"{duration:.6f}"])
         cmd.extend(['-i', source])
         
         cmd.extend(['-filter_complex', filtergraph])
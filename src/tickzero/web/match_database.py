@@ -3,12 +3,13 @@ MatchDatabase: SQLite database manager for CS2 match history.
 Stores match metadata, video paths, statistics, and generated highlights.
 """
 import sqlite3
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 
+from tickzero.core.match_log import iter_match_log, read_match_log_header, read_match_log_summary
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -67,10 +68,52 @@ class MatchDatabase:
             )
         ''')
         
+        # Create highlight sources table (replay buffer clips saved live;
+        # match_id is filled in once the match itself is saved)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS highlight_sources (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                match_id INTEGER,
+                log_match_id TEXT,
+                clip_path TEXT NOT NULL,
+                round INTEGER,
+                kills INTEGER DEFAULT 0,
+                headshots INTEGER DEFAULT 0,
+                label TEXT,
+                first_kill_time REAL,
+                last_kill_time REAL,
+                saved_time REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (match_id) REFERENCES matches(id)
+            )
+        ''')
+        
+        # Create recording segments table (one file per round when the
+        # recording is split; start/end are offsets in the match timeline)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS recording_segments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                match_id INTEGER NOT NULL,
+                segment_index INTEGER NOT NULL,
+                round INTEGER,
+                path TEXT NOT NULL,
+                start_time REAL NOT NULL,
+                end_time REAL,
+                deleted BOOLEAN DEFAULT 0,
+                FOREIGN KEY (match_id) REFERENCES matches(id)
+            )
+        ''')
+        
         # Create index for faster queries
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_match_date ON matches(match_date DESC)
         ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_highlight_sources_match ON highlight_sources(match_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_recording_segments_match ON recording_segments(match_id, segment_index)
+        ''')
         
         conn.commit()
         conn.close()
@@ -81,7 +124,7 @@ class MatchDatabase:
         
         Args:
             video_path: Path to recorded video file
-            log_path: Path to match_log.json file
+            log_path: Path to the match log file
             match_stats: Dictionary with match statistics
             
         Returns:
@@ -120,43 +163,53 @@ class MatchDatabase:
     
     def _parse_match_log(self, log_path: str) -> Dict[str, Any]:
         """
-        Parse match_log.json to extract statistics.
+        Parse a match log to extract statistics.
         
         Args:
-            log_path: Path to match log JSON file
+            log_path: Path to match log file
             
         Returns:
             dict: Extracted statistics
         """
         try:
-            with open(log_path, 'r') as f:
-                data = json.load(f)
-            
-            events = data.get('events', [])
+            header = read_match_log_header(log_path)
             
-            # Count kills and find player info
-            kills = [e for e in events if e.get('type') == 'kill']
-            rounds = set(e.get('round', 0) for e in events if 'round' in e)
+            # Finished logs end with per-round summaries: no need to read the events
+            summary = read_match_log_summary(log_path)
+            if summary is not None:
+                rounds = summary.get('rounds', [])
+                return {
+                    'total_kills': sum(r.get('kills', 0) for r in rounds),
+                    'total_deaths': sum(r.get('deaths', 0) for r in rounds),
+                    'total_rounds': len(rounds),
+                    'duration_seconds': summary.get('duration', 0),
+                    'map_name': None,  # Not tracked yet
+                    'player_steamid': header.get('player_steamid'),
+                    'player_name': None
+                }
             
-            # Calculate duration from last event
+            # Single streaming pass: count kills, rounds and track the last video time
+            kills = 0
+            deaths = 0
+            rounds = set()
             duration = 0
-            if events:
-                last_event = events[-1]
-                duration = last_event.get('video_time', 0)
-            
-            # Extract player info (from first event if available)
-            player_steamid = None
-            player_name = None
-            # This would need to be added to GSI server in future
+            for event in iter_match_log(log_path):
+                if event.get('type') == 'kill':
+                    kills += 1
+                elif event.get('type') == 'death':
+                    deaths += 1
+                if 'round' in event:
+                    rounds.add(event.get('round', 0))
+                duration = event.get('video_time', 0)
             
             return {
-                'total_kills': len(kills),
-                'total_deaths': 0,  # Not tracked yet
+                'total_kills': kills,
+                'total_deaths': deaths,
                 'total_rounds': len(rounds),
                 'duration_seconds': duration,
                 'map_name': None,  # Not tracked yet
-                'player_steamid': player_steamid,
-                'player_name': player_name
+                'player_steamid': header.get('player_steamid'),
+                'player_name': None
             }
             
         except Exception as e:
@@ -209,6 +262,26 @@ class MatchDatabase:
         conn.close()
         return dict(row) if row else None
     
+    def get_match_by_video(self, video_path: str) -> Optional[Dict]:
+        """
+        Get the most recent match recorded to a video file.
+        
+        Args:
+            video_path: Path to the recorded video
+            
+        Returns:
+            dict: Match data (including its log_path) or None if not found
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT * FROM matches WHERE video_path = ? ORDER BY id DESC LIMIT 1", (video_path,))
+        row = cursor.fetchone()
+        
+        conn.close()
+        return dict(row) if row else None
+    
     def get_match_events(self, match_id: int) -> List[Dict]:
         """
         Get all events for a specific match from its log file.
@@ -224,9 +297,7 @@ class MatchDatabase:
             return []
         
         try:
-            with open(match['log_path'], 'r') as f:
-                data = json.load(f)
-            return data.get('events', [])
+            return list(iter_match_log(match['log_path']))
         except Exception as e:
             logger.error(f"Error loading match events: {e}")
             return []
@@ -244,7 +315,7 @@ class MatchDatabase:
         
         # Whitelist of allowed columns to prevent SQL injection
         allowed_columns = {
-            'processed', 'highlights_generated', 'notes', 
+            'processed', 'highlights_generated', 'notes', 'video_path',
             'total_kills', 'total_deaths', 'total_rounds',
             'duration_seconds', 'map_name', 'player_steamid', 'player_name'
         }
@@ -304,6 +375,176 @@ class MatchDatabase:
         conn.commit()
         conn.close()
     
+    def save_highlight_source(self, clip_path: str, highlight: Dict[str, Any],
+                              saved_time: Optional[float] = None, match_id: Optional[int] = None) -> int:
+        """
+        Register a replay buffer clip saved during a match.
+        
+        Args:
+            clip_path: Path of the clip written by OBS
+            highlight: Highlight dict from GSIServer (round, kills, headshots,
+                       label, first/last kill time and match_id of the log)
+            saved_time: System time the replay buffer was saved; the kill is
+                        (saved_time - first_kill_time) seconds before the clip end
+            match_id: Database match ID if the match is already saved
+            
+        Returns:
+            int: ID of the highlight source
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO highlight_sources (
+                match_id, log_match_id, clip_path, round, kills, headshots,
+                label, first_kill_time, last_kill_time, saved_time
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            match_id,
+            highlight.get('match_id'),
+            clip_path,
+            highlight.get('round'),
+            highlight.get('kills', 0),
+            highlight.get('headshots', 0),
+            highlight.get('label'),
+            highlight.get('first_kill_time'),
+            highlight.get('last_kill_time'),
+            saved_time
+        ))
+        
+        source_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return source_id
+    
+    def attach_highlight_sources(self, match_id: int, log_match_id: Optional[str] = None) -> int:
+        """
+        Link highlight sources saved during a match to its database entry.
+        
+        Args:
+            match_id: Database match ID
+            log_match_id: Match ID from the match log (None links every
+                          unattached source)
+            
+        Returns:
+            int: Number of sources linked
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        if log_match_id is None:
+            cursor.execute("UPDATE highlight_sources SET match_id = ? WHERE match_id IS NULL", (match_id,))
+        else:
+            cursor.execute("UPDATE highlight_sources SET match_id = ? WHERE match_id IS NULL AND log_match_id = ?",
+                           (match_id, log_match_id))
+        count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return count
+    
+    def get_highlight_sources(self, match_id: int) -> List[Dict]:
+        """
+        Get the replay buffer clips of a match.
+        
+        Args:
+            match_id: Match ID
+            
+        Returns:
+            list: Highlight source dictionaries ordered by kill time
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT * FROM highlight_sources WHERE match_id = ? ORDER BY first_kill_time", (match_id,))
+        sources = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        return sources
+    
+    def save_segments(self, match_id: int, segments: List[Dict[str, Any]]):
+        """
+        Store the segment index of a split recording.
+        
+        Args:
+            match_id: Match ID
+            segments: Segment dicts from GSIServer (index, round, path,
+                      start and end offsets in seconds; end None for the last)
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO recording_segments (match_id, segment_index, round, path, start_time, end_time)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(match_id, s['index'], s.get('round'), s['path'], s['start'], s.get('end')) for s in segments if s.get('path')])
+        
+        conn.commit()
+        conn.close()
+    
+    def get_segments(self, match_id: int, include_deleted: bool = False) -> List[Dict]:
+        """
+        Get the segment index of a match's recording.
+        
+        Args:
+            match_id: Match ID
+            include_deleted: Also return segments whose file was deleted
+            
+        Returns:
+            list: Dicts with index, round, path, start, end and deleted,
+                  ordered by start offset (empty if the recording was not split)
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        query = '''
+            SELECT segment_index AS "index", round, path, start_time AS start, end_time AS "end", deleted
+            FROM recording_segments WHERE match_id = ?
+        '''
+        if not include_deleted:
+            query += " AND deleted = 0"
+        cursor.execute(query + " ORDER BY segment_index", (match_id,))
+        segments = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        return segments
+    
+    def mark_segments_deleted(self, match_id: int, paths: List[str]):
+        """
+        Record that segment files were deleted.
+        
+        Args:
+            match_id: Match ID
+            paths: Paths of the deleted segment files
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany("UPDATE recording_segments SET deleted = 1 WHERE match_id = ? AND path = ?",
+                           [(match_id, path) for path in paths])
+        
+        conn.commit()
+        conn.close()
+    
+    def update_segment_path(self, match_id: int, old_path: str, new_path: str):
+        """
+        Point a segment at its file's new location (e.g. after a remux).
+        
+        Args:
+            match_id: Match ID
+            old_path: Path stored for the segment
+            new_path: New path of the segment file
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("UPDATE recording_segments SET path = ? WHERE match_id = ? AND path = ?",
+                       (new_path, match_id, old_path))
+        
+        conn.commit()
+        conn.close()
+    
     def delete_match(self, match_id: int):
         """
         Delete match and associated highlights.
@@ -316,6 +557,8 @@ class MatchDatabase:
         
         # Delete highlights first (foreign key)
         cursor.execute("DELETE FROM highlights WHERE match_id = ?", (match_id,))
+        cursor.execute("DELETE FROM highlight_sources WHERE match_id = ?", (match_id,))
+        cursor.execute("DELETE FROM recording_segments WHERE match_id = ?", (match_id,))
         # Delete match
         cursor.execute("DELETE FROM matches WHERE id = ?", (match_id,))
         
@@ -21,12 +21,28 @@ static_dir = project_root / 'static'
 app = Flask(__name__, 
             template_folder=str(template_dir),
             static_folder=str(static_dir))
-db = MatchDatabase()
+_db = None  # Opened on first use, so importing the package never creates or migrates matches.db
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """
+    Get the match database, opening it on first use.
+    
+    Returns:
+        MatchDatabase: Shared database instance
+    """
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = MatchDatabase()
+        return _db
 
 
 @app.route('/')
 def index():
     """Main dashboard with recent matches and statistics."""
+    db = get_db()
     recent_matches = db.get_all_matches(limit=10)
     stats = db.get_statistics()
     return render_template('index.html', matches=recent_matches, stats=stats)
@@ -35,18 +51,18 @@ def index():
 @app.route('/matches')
 def match_list():
     """Full match history page."""
-    all_matches = db.get_all_matches(limit=100)
+    all_matches = get_db().get_all_matches(limit=100)
     return render_template('match_list.html', matches=all_matches)
 
 
 @app.route('/match/<int:match_id>')
 def match_detail(match_id):
     """Detailed view of a specific match."""
-    match = db.get_match(match_id)
+    match = get_db().get_match(match_id)
     if not match:
         return "Match not found", 404
     
-    events = db.get_match_events(match_id)
+    events = get_db().get_match_events(match_id)
     
     # Filter to show only kill events for timeline
     kill_events = [e for e in events if e.get('type') == 'kill']
@@ -58,7 +74,7 @@ def match_detail(match_id):
 def generate_highlights(match_id):
     """API endpoint to trigger highlight generation for a match."""
     try:
-        match = db.get_match(match_id)
+        match = get_db().get_match(match_id)
         if not match:
             return jsonify({"status": "error", "message": "Match not found"}), 404
         
@@ -115,7 +131,7 @@ def _process_match_highlights(match_id, video_path, log_path, min_priority):
         
         if result.returncode == 0:
             # Mark match as processed
-            db.update_match(match_id, processed=True)
+            get_db().update_match(match_id, processed=True)
             logger.info(f"✓ Successfully processed match #{match_id}")
         else:
             logger.error(f"✗ Processing failed for match #{match_id}: {result.stderr}")
@@ -128,7 +144,7 @@ def _process_match_highlights(match_id, video_path, log_path, min_priority):
 def delete_match(match_id):
     """API endpoint to delete a match."""
     try:
-        db.delete_match(match_id)
+        get_db().delete_match(match_id)
         return jsonify({"status": "success", "message": f"Match #{match_id} deleted"})
     except Exception as e:
         logger.error(f"Error deleting match #{match_id}: {e}")
@@ -138,7 +154,7 @@ def delete_match(match_id):
 @app.route('/api/stats')
 def get_stats():
     """API endpoint for statistics."""
-    stats = db.get_statistics()
+    stats = get_db().get_statistics()
     return jsonify(stats)
 
 
@@ -0,0 +1,64 @@
+"""
+Shared test helpers: a minimal CS2 GSI payload builder and an OBS stand-in.
+The test scripts import them with `from conftest import ...`, which works
+both under pytest and when a script is run directly from this directory.
+"""
+import sys
+from pathlib import Path
+
+# Running a script from elsewhere (python tests/test_x.py) still finds this module
+sys.path.insert(0, str(Path(__file__).parent))
+
+STEAMID = "76561198000000000"
+
+
+def make_payload(map_phase="live", round_phase="live", round_number=1, kills=0, headshots=0, deaths=0,
+                 health=100, weapon="weapon_ak47", steamid=STEAMID):
+    """
+    Minimal CS2 GSI payload with the fields GSIServer and GameSnapshot read.
+
+    Args:
+        map_phase: map.phase ("warmup", "live", "intermission", "gameover")
+        round_phase: round.phase ("freezetime", "live", "over")
+        round_number: Round number (map.round and round.round)
+        kills: Player's total kills this match
+        headshots: Player's total headshot kills
+        deaths: Player's total deaths
+        health: Player's health
+        weapon: Active weapon (a holstered knife is always carried too)
+        steamid: Player whose payload this is (provider = main player by default)
+
+    Returns:
+        dict: GSI payload
+    """
+    return {
+        "map": {"phase": map_phase, "round": round_number},
+        "round": {"phase": round_phase, "round": round_number},
+        "player": {
+            "steamid": steamid,
+            "name": "TestPlayer",
+            "state": {"health": health},
+            "weapons": {
+                "weapon_0": {"name": "weapon_knife", "state": "holstered"},
+                "weapon_1": {"name": weapon, "state": "active"}
+            },
+            "match_stats": {"kills": kills, "headshot_kills": headshots, "deaths": deaths, "assists": 0}
+        }
+    }
+
+
+class MockOBSManager:
+    """OBS stand-in that only converts event times to video timestamps."""
+
+    def __init__(self, recording_start_time=None):
+        """
+        Args:
+            recording_start_time: System time the recording started (None =
+                                  not recording, every timestamp is 0.0)
+        """
+        self.recording_start_time = recording_start_time
+
+    def calculate_video_timestamp(self, event_time):
+        if self.recording_start_time is None:
+            return 0.0
+        return event_time - self.recording_start_time
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Test script for keyframe-aware cut planning.
+Checks how clip boundaries snap to keyframes within the tolerance, the seek
+strategy and FFmpeg arguments chosen for each clip, and (when ffmpeg is
+installed) the cut statistics of a VideoEditor batch.
+"""
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tickzero.core.cut_planner import SEEK_DECODE, SEEK_KEYFRAME, SEEK_UNINDEXED, plan_cut
+from tickzero.core.seek_index import SeekIndex
+from tickzero.core.video_editor import VideoEditor
+
+# Keyframes every 2 seconds in a 10 second video
+INDEX = SeekIndex("match.mp4", 0, 0, 10.0, [(float(t), None, t * 15) for t in range(0, 10, 2)])
+
+
+def test_start_snaps_within_tolerance():
+    """Earlier keyframes are preferred; without one in reach the seek decodes."""
+    plan = plan_cut(INDEX, 2.6, 5.0, tolerance=1.0)
+    assert plan.strategy == SEEK_KEYFRAME and plan.start == 2.0 and plan.end == 5.0
+    assert plan.decode_waste == 0.0 and abs(plan.unsnapped_waste - 0.6) < 1e-9
+    assert plan.input_args() == ['-noaccurate_seek', '-ss', '2.001000']
+
+    forward = plan_cut(INDEX, 3.9, 5.0, tolerance=0.5)
+    assert forward.strategy == SEEK_KEYFRAME and forward.start == 4.0
+
+    exact = plan_cut(INDEX, 3.5, 5.0)
+    assert exact.strategy == SEEK_DECODE and exact.start == 3.5 and exact.keyframe == 2.0
+    assert exact.decode_waste == 1.5
+    assert exact.input_args() == ['-ss', '3.500000']
+
+
+def test_end_snapping_and_unindexed_videos():
+    """The end only moves on request, and the end of the file counts as a boundary."""
+    assert plan_cut(INDEX, 2.0, 7.5, tolerance=1.0).end == 7.5
+    assert plan_cut(INDEX, 2.0, 7.5, tolerance=1.0, snap_end=True).end == 8.0
+    assert plan_cut(INDEX, 2.0, 9.5, tolerance=1.0, snap_end=True).end == 10.0
+
+    plan = plan_cut(None, 3.5, 5.0, tolerance=1.0)
+    assert plan.strategy == SEEK_UNINDEXED and plan.decode_waste is None
+    assert plan.input_args() == ['-ss', '3.500000']
+
+
+@pytest.mark.skipif(not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="ffmpeg not installed")
+def test_editor_batch_builds_index_and_snaps():
+    """With a tolerance the editor indexes the source once and cuts on keyframes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = str(Path(tmp) / "match.mp4")
+        subprocess.run(['ffmpeg', '-y', '-f', 'lavfi', '-i', 'testsrc2=s=320x180:r=10:d=12',
+                        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '30', source],
+                       capture_output=True, check=True)
+
+        editor = VideoEditor(source, output_dir=str(Path(tmp) / "out"), use_gpu=False, cut_tolerance=1.0)
+        clips = editor.create_highlights_batch([
+            {"start": 3.5, "end": 5.0, "label": "snapped"},
+            {"start": 7.5, "end": 9.0, "label": "decoded", "tolerance": 0.0},
+        ])
+
+        assert len(clips) == 2
+        assert Path(SeekIndex.index_path(source)).exists()
+        stats = editor.get_cut_stats()
+        assert stats["clips"] == 2 and stats["snapped"] == 1
+        assert abs(stats["decode_waste_s"] - 1.5) < 0.01 and abs(stats["unsnapped_waste_s"] - 2.0) < 0.01
+
+
+if __name__ == '__main__':
+    test_start_snaps_within_tolerance()
+    test_end_snapping_and_unindexed_videos()
+    if shutil.which('ffmpeg') and shutil.which('ffprobe'):
+        test_editor_batch_builds_index_and_snaps()
+    print("SUCCESS: ALL TESTS PASSED!")
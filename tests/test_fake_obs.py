@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Test script for the fake obs-websocket v5 server.
+Drives it with AsyncOBSClient: recording lifecycle and events, pause-aware
+duration, file splits, the replay buffer, injected latency and disconnects,
+and (when ffmpeg is installed) rendered output files.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+
+from tickzero.core.fake_obs import FakeOBSServer
+from tickzero.core.obs_async import AsyncOBSClient
+
+pytest.importorskip("websockets")
+
+
+def connect(server, **kwargs):
+    client = AsyncOBSClient(port=server.port, password=server.password, connect_retries=0, **kwargs)
+    assert client.connect()
+    return client
+
+
+def wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true (events arrive after the request's response)."""
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_recording_lifecycle():
+    """Start, pause, split and stop produce the states and paths OBS would report."""
+    server = FakeOBSServer(password="secret", output_dir="/videos")
+    server.start()
+    client = connect(server)
+    try:
+        assert client.start_recording()
+        assert client.is_recording
+        assert wait_for(lambda: client.current_output_path)
+        first_file = client.current_output_path
+        assert first_file.startswith("/videos/")
+
+        assert client.pause_recording()
+        time.sleep(0.3)
+        assert client.resume_recording()
+        assert client.get_current_timestamp() < 200  # Paused time is not recorded
+
+        second_file = client.split_recording()
+        assert second_file and second_file != first_file
+
+        assert client.stop_recording() == second_file
+        assert client.wait_for_recording_stopped(timeout=2)
+        assert client.get_last_recording_path() == second_file
+
+        assert client.start_replay_buffer()
+        replay = client.save_replay_buffer()
+        assert os.path.basename(replay).startswith("Replay ")
+        assert client.stop_replay_buffer()
+    finally:
+        client.disconnect()
+        server.stop()
+
+    counts = server.get_stats()["request_counts"]
+    assert counts["StartRecord"] == 1 and counts["SplitRecordFile"] == 1
+
+
+def test_injected_latency_is_per_request():
+    """Each request pays the latency once; pipelined requests overlap."""
+    server = FakeOBSServer(latency=0.05, jitter=0.01, seed=1)
+    server.start()
+    client = connect(server)
+    try:
+        start = time.perf_counter()
+        client.call("GetVersion")
+        single = time.perf_counter() - start
+        assert 0.05 <= single < 0.5
+
+        start = time.perf_counter()
+        futures = [client.call_nowait("GetRecordStatus") for _ in range(10)]
+        for future in futures:
+            future.result(timeout=5)
+        assert time.perf_counter() - start < 0.3
+    finally:
+        client.disconnect()
+        server.stop()
+
+
+def test_injected_disconnect():
+    """A dropped connection fails the request and the client can reconnect."""
+    server = FakeOBSServer(disconnect_every=3)
+    server.start()
+    client = connect(server)  # Request 1: GetRecordStatus on connect
+    try:
+        client.call("GetVersion")
+        with pytest.raises(Exception):
+            client.call("GetVersion")
+        time.sleep(0.1)
+        assert not client.is_connected
+        assert client.connect()
+        assert server.get_stats()["disconnects"] == 1
+        assert server.get_stats()["connections"] == 2
+    finally:
+        client.disconnect()
+        server.stop()
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+def test_renders_recording_with_ffmpeg():
+    """With ffmpeg the stopped recording exists before the STOPPED event."""
+    with tempfile.TemporaryDirectory() as tmp:
+        server = FakeOBSServer(output_dir=tmp, use_ffmpeg=True, resolution="320x240", fps=10)
+        server.start()
+        client = connect(server)
+        try:
+            client.start_recording()
+            time.sleep(1.0)
+            path = client.stop_recording()
+            assert client.wait_for_recording_stopped(timeout=30)
+            assert os.path.getsize(path) > 0
+        finally:
+            client.disconnect()
+            server.stop()
+
+
+if __name__ == '__main__':
+    test_recording_lifecycle()
+    test_injected_latency_is_per_request()
+    test_injected_disconnect()
+    if shutil.which('ffmpeg'):
+        test_renders_recording_with_ffmpeg()
+    print("SUCCESS: ALL TESTS PASSED!")
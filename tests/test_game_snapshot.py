@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Test script for GameSnapshot and the snapshot-driven detectors in GSIServer.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from conftest import MockOBSManager, make_payload
+from tickzero.core.game_snapshot import COMPARED_FIELDS, GameSnapshot
+from tickzero.core.gsi_server import GSIServer
+
+
+def test_snapshot_fields_and_diff():
+    """Snapshot extracts the compared fields and diff reports what changed."""
+    before = GameSnapshot.from_payload(make_payload(round_number=3, kills=1))
+    after = GameSnapshot.from_payload(make_payload(round_number=3, kills=2, headshots=1, health=40))
+
+    assert after.active_weapon == "weapon_ak47"
+    assert after.round == 3
+    assert after.diff(before) == {"kills", "headshot_kills", "health"}
+    assert after.diff(after) == set()
+    assert before.diff(None) == set(COMPARED_FIELDS)
+
+    # Missing match_stats is distinguishable from zero kills
+    assert GameSnapshot.from_payload({"player": {}}).kills is None
+
+
+def test_spectating_teammate_does_not_log_kills():
+    """Switching back from a spectated teammate with fewer kills is not a kill."""
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=MockOBSManager(time.time()), log_file=str(Path(tmp) / "log.jsonl"))
+        gsi.process_game_state(make_payload(kills=10))
+        gsi.process_game_state(make_payload(kills=11, headshots=1))
+        gsi.process_game_state(make_payload(kills=11, deaths=1, health=0))
+        gsi.process_game_state(make_payload(steamid="76561198000000001", kills=3))
+        gsi.process_game_state(make_payload(kills=11, deaths=1))
+        gsi.save_logs()
+
+    kills = [e for e in gsi.match_events if e['type'] == 'kill']
+    deaths = [e for e in gsi.match_events if e['type'] == 'death']
+    assert [k['total_kills'] for k in kills] == [11]
+    assert kills[0]['headshot'] is True
+    assert len(deaths) == 1
+
+
+
+def test_unchanged_payloads_skip_detectors():
+    """Heartbeats with only a new provider timestamp are counted and skipped."""
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=MockOBSManager(time.time()), log_file=str(Path(tmp) / "log.jsonl"))
+        for heartbeat in range(5):
+            payload = make_payload(kills=2)
+            payload["provider"] = {"timestamp": 1700000000 + heartbeat * 30}
+            gsi.process_game_state(payload)
+        gsi.process_game_state(make_payload(kills=3))
+        gsi.process_game_state(make_payload(kills=3))
+        gsi.save_logs()
+
+    stats = gsi.get_ingest_stats()
+    assert stats['snapshots_processed'] == 2
+    assert stats['snapshots_skipped'] == 5
+    assert [e['total_kills'] for e in gsi.match_events if e['type'] == 'kill'] == [3]
+    assert GameSnapshot.from_payload(make_payload()).fingerprint() == \
+        GameSnapshot.from_payload(make_payload()).fingerprint()
+
+
+if __name__ == '__main__':
+    test_snapshot_fields_and_diff()
+    test_spectating_teammate_does_not_log_kills()
+    test_unchanged_payloads_skip_detectors()
+    print("SUCCESS: ALL TESTS PASSED!")
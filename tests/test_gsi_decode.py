@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Test script for the GSI payload decoders: every available backend must
+produce the same GameSnapshot as GameSnapshot.from_payload.
+"""
+import json
+
+from tickzero.core.game_snapshot import GameSnapshot
+from tickzero.core.gsi_decode import DECODERS, decode_snapshot
+
+PAYLOADS = [
+    {
+        "provider": {"name": "Counter-Strike: Global Offensive", "appid": 730, "timestamp": 1700000000},
+        "map": {"mode": "competitive", "name": "de_dust2", "phase": "live", "round": 5,
+                "team_ct": {"score": 3}, "team_t": {"score": 2}},
+        "round": {"phase": "live", "round": 5},
+        "player": {
+            "steamid": "76561198000000000",
+            "name": "Player",
+            "state": {"health": 64, "armor": 100, "helmet": True, "money": 2400},
+            "weapons": {
+                "weapon_0": {"name": "weapon_knife", "type": "Knife", "state": "holstered"},
+                "weapon_1": {"name": "weapon_ak47", "type": "Rifle", "ammo_clip": 30, "state": "active"}
+            },
+            "match_stats": {"kills": 7, "assists": 1, "deaths": 3, "mvps": 1, "score": 16, "headshot_kills": 4}
+        }
+    },
+    # Menu / loading screen: no player, map or round data
+    {"provider": {"name": "Counter-Strike: Global Offensive", "appid": 730}},
+    # Spectating without match_stats
+    {"map": {"phase": "warmup"}, "player": {"steamid": "76561198000000001", "weapons": {}}},
+    # Unexpected value types fall back to the tolerant dict path
+    {"round": {"phase": "over", "round": 2}, "player": {"state": {"health": "100"}}},
+]
+
+
+def test_backends_match_reference():
+    """Every backend decodes bytes and str bodies to the reference snapshot."""
+    for payload in PAYLOADS:
+        body = json.dumps(payload)
+        expected = GameSnapshot.from_payload(payload)
+        for name, decoder in DECODERS.items():
+            assert decoder(body.encode('utf-8')) == expected, name
+            assert decoder(body) == expected, name
+            assert decoder(body).player_name == expected.player_name, name
+
+
+def test_malformed_body_raises_value_error():
+    """Malformed JSON surfaces as ValueError regardless of the backend."""
+    for name, decoder in DECODERS.items():
+        try:
+            decoder(b'{"player": ')
+        except ValueError:
+            continue
+        raise AssertionError(f"{name} accepted malformed JSON")
+
+    assert decode_snapshot(b'{}').round == 0
+
+
+if __name__ == '__main__':
+    print(f"Backends: {', '.join(DECODERS)}")
+    test_backends_match_reference()
+    test_malformed_body_raises_value_error()
+    print("SUCCESS: ALL TESTS PASSED!")
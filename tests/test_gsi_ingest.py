@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Test script for the async GSI ingest mode.
+Verifies that POSTs are acknowledged immediately while a slow consumer
+processes payloads in order, and that a full queue drops the oldest payload.
+"""
+import json
+import threading
+import time
+import urllib.request
+
+from tickzero.core.gsi_ingest import AsyncGSIIngest
+
+
+def post_payload(port, payload):
+    """POST a JSON payload and return (status, seconds until the response)."""
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}",
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status, time.perf_counter() - start
+
+
+def test_acknowledges_before_processing():
+    """A slow consumer must not delay the HTTP response."""
+    processed = []
+
+    def slow_process(payload, received_at):
+        time.sleep(0.2)
+        processed.append(payload['seq'])
+
+    ingest = AsyncGSIIngest(slow_process, port=0, max_queue_size=16)
+    ingest.start()
+    try:
+        latencies = []
+        for seq in range(5):
+            status, latency = post_payload(ingest.port, {'seq': seq})
+            assert status == 200
+            latencies.append(latency)
+        assert max(latencies) < 0.15, latencies
+    finally:
+        ingest.stop()
+
+    assert processed == [0, 1, 2, 3, 4]
+    stats = ingest.get_stats()
+    assert stats['received'] == 5
+    assert stats['processed'] == 5
+    assert stats['dropped'] == 0
+
+
+def test_full_queue_drops_oldest():
+    """When the queue is full the oldest waiting payload is dropped."""
+    release = threading.Event()
+    processed = []
+
+    def blocked_process(payload, received_at):
+        release.wait(timeout=5)
+        processed.append(payload['seq'])
+
+    ingest = AsyncGSIIngest(blocked_process, port=0, max_queue_size=2)
+    ingest.start()
+    try:
+        for seq in range(6):
+            post_payload(ingest.port, {'seq': seq})
+        stats = ingest.get_stats()
+        assert stats['queue_depth'] == 2
+        assert stats['dropped'] == 3  # One payload is in the consumer, two are queued
+    finally:
+        release.set()
+        ingest.stop()
+
+    # The newest payloads survive
+    assert processed[-2:] == [4, 5]
+
+
+if __name__ == '__main__':
+    test_acknowledges_before_processing()
+    test_full_queue_drops_oldest()
+    print("SUCCESS: ALL TESTS PASSED!")
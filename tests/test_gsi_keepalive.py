@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Test script for HTTP/1.1 keep-alive in both GSI ingest modes.
+Verifies that many payloads are served over one connection and that the
+connection vs request counters reflect the reuse.
+"""
+import http.client
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from conftest import MockOBSManager
+from tickzero.core.gsi_server import GSIServer
+
+
+def post_over_one_connection(port, count):
+    """POST count payloads on a single connection; return the statuses."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    statuses = []
+    try:
+        for n in range(count):
+            body = json.dumps({"round": {"phase": "live", "round": n}}).encode('utf-8')
+            conn.request('POST', '/', body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            assert not response.will_close, "server closed a keep-alive connection"
+            statuses.append(response.status)
+    finally:
+        conn.close()
+    return statuses
+
+
+def check_mode(ingest_mode):
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=MockOBSManager(time.time()), port=0, log_file=str(Path(tmp) / "log.jsonl"),
+                        ingest_mode=ingest_mode)
+        gsi.start()
+        try:
+            port = gsi.ingest.port if gsi.ingest else gsi.port
+            assert post_over_one_connection(port, 10) == [200] * 10
+            assert post_over_one_connection(port, 5) == [200] * 5
+            stats = gsi.get_ingest_stats()
+        finally:
+            gsi.stop()
+
+    assert stats['requests'] == 15, stats
+    assert stats['connections'] == 2, stats
+    assert stats['requests_per_connection'] == 7.5
+    assert stats['requests_per_s'] > stats['connections_per_s']
+
+
+def test_threaded_keep_alive():
+    """The threaded handler speaks HTTP/1.1 and keeps connections open."""
+    check_mode("threaded")
+
+
+def test_async_keep_alive():
+    """The async ingest reports the same connection statistics."""
+    check_mode("async")
+
+
+if __name__ == '__main__':
+    test_threaded_keep_alive()
+    test_async_keep_alive()
+    print("SUCCESS: ALL TESTS PASSED!")
@@ -4,6 +4,7 @@ Test script to verify GSI map.phase detection works correctly.
 Simulates GSI payloads with different map phases.
 """
 import json
+import tempfile
 import time
 from pathlib import Path
 import sys
@@ -87,11 +88,12 @@ def test_map_phase_detection():
         match_ended = True
         print("[OK] Match end callback triggered!")
     
-    # Create GSI server
+    # Create GSI server (logging into a temporary directory, not the working tree)
+    log_dir = tempfile.TemporaryDirectory()
     gsi = GSIServer(
         obs_manager=obs,
         port=3000,
-        log_file="test_gsi_log.json",
+        log_file=str(Path(log_dir.name) / "test_gsi_log.json"),
         on_match_start=on_start,
         on_match_end=on_end
     )
@@ -163,6 +165,8 @@ def test_map_phase_detection():
     for event in gsi.match_events:
         print(f"  - {event['type']:20s} | Round {event.get('round', 0):2d} | {event.get('phase', 'N/A'):10s}")
     
+    gsi.stop()
+    log_dir.cleanup()
     return all_passed
 
 if __name__ == '__main__':
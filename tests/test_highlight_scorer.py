@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Test script for the rule-based highlight scorer.
+Checks multi-kill windows, headshot streaks, low-HP and knife/zeus kills,
+pruning of dead rounds, the offline RuleDirector, and (when google-genai is
+installed) that the AI Director never sends pruned rounds to Gemini.
+"""
+import json
+import os
+import tempfile
+
+import pytest
+
+from tickzero.core.highlight_scorer import RuleDirector, find_windows, prune_rounds, rate_window, score_round
+from tickzero.core.match_log import MatchLogWriter
+
+
+def kill(video_time, round_num=1, headshot=False, health=100, weapon="weapon_ak47"):
+    """A kill event as logged by the GSI server."""
+    return {"type": "kill", "round": round_num, "video_time": video_time, "weapon": weapon,
+            "headshot": headshot, "health": health, "total_kills": 0}
+
+
+def phase(video_time, round_num, name):
+    """A round phase change event."""
+    return {"type": "round_phase_change", "round": round_num, "video_time": video_time, "phase": name}
+
+
+def test_kill_windows():
+    """Kills more than 10 seconds apart start a new window; streaks reset on body shots."""
+    events = [phase(0.0, 1, "live"), kill(10.0, headshot=True), kill(14.0, headshot=True),
+              kill(20.0), kill(23.0, headshot=True), kill(40.0, health=12)]
+    windows = find_windows(events)
+    assert [w['kills'] for w in windows] == [4, 1]
+    assert windows[0]['best_streak'] == 2 and windows[0]['headshots'] == 3
+    assert windows[1]['low_hp'] and not windows[0]['low_hp']
+
+
+def test_window_ratings():
+    """Multi-kills dominate; all-headshot, low-HP and knife/zeus kills add to the rating."""
+    assert rate_window(find_windows([kill(1.0)])[0]) == (3, "1k")
+    assert rate_window(find_windows([kill(1.0, headshot=True)])[0]) == (3, "1k_headshot")
+    assert rate_window(find_windows([kill(t, headshot=True) for t in (1, 2, 3)])[0]) == (8, "3k_headshot")
+    streak = [kill(1.0)] + [kill(t, headshot=True) for t in (2, 3, 4)]
+    assert rate_window(find_windows(streak)[0]) == (10, "4k_hs_streak")
+    assert rate_window(find_windows([kill(1.0, health=5)])[0]) == (4, "1k_lowhp")
+    assert rate_window(find_windows([kill(1.0, weapon="weapon_knife_karambit")])[0]) == (6, "1k_knife")
+    assert rate_window(find_windows([kill(1.0, weapon="weapon_taser")])[0]) == (6, "1k_zeus")
+    ace = [kill(t, headshot=True, health=10) for t in range(5)]
+    assert rate_window(find_windows(ace)[0])[0] == 10
+
+
+def test_round_scores_and_pruning():
+    """Rounds without kills score 0 and are pruned; clips get the lead, tail and minimum length."""
+    score, highlights = score_round(3, [kill(50.0), kill(53.0, headshot=True)])
+    assert score == 5
+    assert highlights == [{"start": 47.0, "end": 56.0, "label": "2k", "priority": 5, "round": 3}]
+    assert score_round(4, [phase(60.0, 4, "live"), phase(90.0, 4, "over")]) == (0, [])
+
+    rounds = {1: [phase(0.0, 1, "live")], 2: [kill(30.0, 2)], 3: [kill(t, 3) for t in (60, 62, 64)]}
+    kept, pruned = prune_rounds(rounds, 1)
+    assert list(kept) == [2, 3] and pruned == [1]
+    assert list(prune_rounds(rounds, 6)[0]) == [3]
+
+
+def test_rule_director_offline():
+    """The offline director returns highlights in round order from a match log."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "match.jsonl")
+        writer = MatchLogWriter(log_path, fsync_policy="none")
+        for event in [kill(130.0, 2, headshot=True), kill(132.0, 2, headshot=True), phase(100.0, 1, "over"),
+                      kill(20.0, 1, weapon="weapon_taser")]:
+            writer.append(event)
+        writer.close()
+
+        director = RuleDirector()
+        highlights = director.analyze_match_log(log_path)
+        assert [(h['round'], h['label']) for h in highlights] == [(1, "1k_zeus"), (2, "2k_headshot")]
+        assert len(director.filter_highlights_by_priority(highlights, 6)) == 2
+
+
+def test_director_skips_pruned_rounds():
+    """Dead rounds never reach Gemini."""
+    pytest.importorskip("google.genai")
+    from tickzero.core.ai_director import AIDirector
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "match.jsonl")
+        writer = MatchLogWriter(log_path, fsync_policy="none")
+        for event in [phase(0.0, 1, "live"), phase(80.0, 1, "over"), kill(110.0, 2), phase(190.0, 3, "live")]:
+            writer.append(event)
+        writer.close()
+
+        prompts = []
+
+        class Models:
+            def generate_content(self, model, contents, config):
+                prompts.append(contents)
+                response = type("Response", (), {})()
+                response.text = json.dumps({"highlights": []})
+                response.usage_metadata = None
+                return response
+
+        director = AIDirector(api_key="test", rpm=6000, min_round_score=1)
+        director.client = type("Client", (), {"models": Models()})()
+        director.analyze_match_log(log_path)
+        assert len(prompts) == 1 and "**ROUND 2 ANALYSIS**" in prompts[0]
+
+
+if __name__ == '__main__':
+    test_kill_windows()
+    test_window_ratings()
+    test_round_scores_and_pruning()
+    test_rule_director_offline()
+    try:
+        import google.genai  # noqa: F401
+        test_director_skips_pruned_rounds()
+    except ImportError:
+        pass
+    print("SUCCESS: ALL TESTS PASSED!")
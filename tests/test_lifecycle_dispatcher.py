@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Test script for the lifecycle callback dispatcher.
+Verifies ordering, timeouts and that slow match callbacks no longer block
+GSI payload processing.
+"""
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from conftest import MockOBSManager, make_payload
+from tickzero.core.gsi_server import GSIServer
+from tickzero.core.lifecycle_dispatcher import LifecycleDispatcher
+from tickzero.core.match_log import read_match_log_header
+
+
+def test_callbacks_run_in_order_with_stats():
+    """Callbacks run one at a time in dispatch order and are timed."""
+    calls = []
+    dispatcher = LifecycleDispatcher(timeout=2.0)
+    dispatcher.dispatch("match_start", lambda: (time.sleep(0.1), calls.append("start")))
+    dispatcher.dispatch("match_end", lambda: calls.append("end"), on_done=lambda: calls.append("done"))
+    assert dispatcher.wait_idle(timeout=5)
+    dispatcher.stop()
+
+    assert calls == ["start", "end", "done"]
+    stats = dispatcher.get_stats()
+    assert stats["match_start"]["calls"] == 1
+    assert stats["match_start"]["max_ms"] >= 100
+    assert stats["match_end"]["max_queue_ms"] >= 100  # Waited for the start callback
+
+
+def test_timeout_and_errors_do_not_stall_the_queue():
+    """A slow or failing callback is counted and the next one still runs."""
+    calls = []
+
+    def fail():
+        raise RuntimeError("OBS unavailable")
+
+    dispatcher = LifecycleDispatcher(timeout=0.2)
+    dispatcher.dispatch("slow", lambda: time.sleep(0.4), on_done=lambda: calls.append("slow done"))
+    dispatcher.dispatch("fail", fail, on_done=lambda: calls.append("fail done"))
+    dispatcher.dispatch("ok", lambda: calls.append("ok"))
+    assert dispatcher.wait_idle(timeout=5)
+    dispatcher.stop()
+
+    stats = dispatcher.get_stats()
+    assert stats["slow"]["timeouts"] == 1
+    assert stats["fail"]["errors"] == 1
+    assert calls == ["slow done", "ok"]
+
+
+def test_timed_out_callback_still_blocks_the_next_one():
+    """A callback past its timeout is reported, but the next one waits for it."""
+    release = threading.Event()
+    running = threading.Event()
+    overlapped = []
+
+    def hang():
+        running.set()
+        release.wait(5)
+        running.clear()
+
+    dispatcher = LifecycleDispatcher(timeout=0.1)
+    dispatcher.dispatch("match_end", hang)
+    dispatcher.dispatch("match_start", lambda: overlapped.append(running.is_set()))
+
+    # Well past the timeout the second callback has still not started
+    time.sleep(0.4)
+    assert dispatcher.get_stats()["match_end"]["timeouts"] == 1
+    assert overlapped == []
+    assert not dispatcher.wait_idle(timeout=0.1)
+
+    release.set()
+    assert dispatcher.wait_idle(timeout=5)
+    dispatcher.stop()
+    assert overlapped == [False]
+
+
+def test_slow_match_start_does_not_block_ingest():
+    """process_game_state returns while on_match_start is still running."""
+    obs = MockOBSManager()
+
+    def slow_start():
+        time.sleep(0.3)
+        obs.recording_start_time = time.time()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "log.jsonl")
+        gsi = GSIServer(obs_manager=obs, log_file=log_file, on_match_start=slow_start)
+        gsi.process_game_state(make_payload("warmup", "freezetime"))
+        start = time.perf_counter()
+        gsi.process_game_state(make_payload("live", "live"))
+        assert time.perf_counter() - start < 0.2
+
+        assert gsi.dispatcher.wait_idle(timeout=5)
+        gsi.process_game_state(make_payload("live", "over"))
+        gsi.stop()
+
+        # The recording start time reached the log once the callback finished
+        header = read_match_log_header(log_file)
+        assert header["recording_start_time"] == obs.recording_start_time
+        assert gsi.get_callback_stats()["match_start"]["calls"] == 1
+
+
+if __name__ == '__main__':
+    test_callbacks_run_in_order_with_stats()
+    test_timeout_and_errors_do_not_stall_the_queue()
+    test_timed_out_callback_still_blocks_the_next_one()
+    test_slow_match_start_does_not_block_ingest()
+    print("SUCCESS: ALL TESTS PASSED!")
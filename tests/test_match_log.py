@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Test script for the streaming JSONL match log.
+Covers append/read round trips, crash tolerance and legacy JSON logs.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from conftest import MockOBSManager, make_payload
+from tickzero.core.gsi_server import GSIServer
+from tickzero.core.match_log import MatchLogWriter, iter_match_log, read_match_log_header
+
+EXAMPLE_LOG = Path(__file__).parent.parent / "examples" / "example_match_log.json"
+
+
+def test_round_trip():
+    """Events come back in order and metadata records update the header."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "match_log.jsonl")
+        writer = MatchLogWriter(path, fsync_policy="event")
+        writer.open({"recording_start_time": None})
+        for i in range(3):
+            writer.append({"type": "kill", "round": 1, "video_time": float(i)})
+        writer.write_metadata({"recording_start_time": 1700000000.0})
+        writer.append({"type": "round_phase_change", "round": 2, "video_time": 3.0})
+        writer.close()
+
+        events = list(iter_match_log(path))
+        assert [e['video_time'] for e in events] == [0.0, 1.0, 2.0, 3.0]
+
+        header = read_match_log_header(path)
+        assert header['format'] == "tickzero-jsonl"
+        assert header['recording_start_time'] == 1700000000.0
+
+
+def test_truncated_last_line_is_skipped():
+    """A crash while writing loses at most the last event."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "match_log.jsonl"
+        writer = MatchLogWriter(str(path), fsync_policy="none")
+        writer.append({"type": "kill", "round": 1})
+        writer.append({"type": "kill", "round": 2})
+        writer.close()
+
+        with open(path, 'a') as f:
+            f.write('{"type": "kill", "rou')
+
+        assert [e['round'] for e in iter_match_log(str(path))] == [1, 2]
+
+
+def test_reads_legacy_json_log():
+    """Logs written by older versions (single JSON document) are still readable."""
+    events = list(iter_match_log(str(EXAMPLE_LOG)))
+    assert events
+    assert 'recording_start_time' in read_match_log_header(str(EXAMPLE_LOG))
+
+
+
+def test_atomic_writer_publishes_on_close():
+    """In atomic mode the final path only appears once the log is complete."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "match.jsonl"
+        writer = MatchLogWriter(str(path), atomic=True)
+        writer.append({"type": "kill", "round": 1})
+        assert not path.exists()
+        assert Path(writer.write_path).exists()
+        writer.close()
+        assert path.exists()
+        assert not Path(writer.write_path).exists()
+        assert len(list(iter_match_log(str(path)))) == 1
+
+
+def test_one_log_per_match():
+    """With log_dir every match gets its own log, published at match end."""
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=MockOBSManager(time.time()), log_dir=tmp, callback_mode="inline")
+        logs = []
+        for match in range(2):
+            gsi.process_game_state(make_payload("warmup", "freezetime", 0, 0))
+            gsi.process_game_state(make_payload("live", "live", 1, 0))
+            gsi.process_game_state(make_payload("live", "live", 1, 1))
+            current = Path(gsi.log_file)
+            assert not current.exists()  # Still being written as .partial
+            gsi.process_game_state(make_payload("gameover", "over", 1, 1))
+            assert gsi.last_completed_log == str(current)
+            assert current.exists()
+            logs.append(current)
+        gsi.stop()
+
+        assert logs[0] != logs[1]
+        assert not list(Path(tmp).glob("*.partial"))
+        for log in logs:
+            header = read_match_log_header(str(log))
+            assert log.name == f"match_{header['match_id']}.jsonl"
+            kills = [e for e in iter_match_log(str(log)) if e['type'] == 'kill']
+            assert len(kills) == 1
+
+
+def test_fixed_log_file_keeps_earlier_match():
+    """Without log_dir a new match never truncates the previous match's log."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "match_log.jsonl")
+        gsi = GSIServer(obs_manager=MockOBSManager(time.time()), log_file=log_file, on_match_end=lambda: None,
+                        callback_mode="inline")
+        logs = []
+        for kills in (1, 2):
+            gsi.process_game_state(make_payload("warmup", "freezetime", kills=0))
+            gsi.process_game_state(make_payload("live", "live", kills=0))
+            for total in range(1, kills + 1):
+                gsi.process_game_state(make_payload("live", "live", kills=total))
+            gsi.process_game_state(make_payload("gameover", "over", kills=kills))
+            logs.append(gsi.last_completed_log)
+        gsi.stop()
+
+        assert logs[0] == log_file and logs[1] != log_file
+        assert Path(logs[1]).name.startswith("match_log_") and logs[1].endswith(".jsonl")
+        for kills, log in zip((1, 2), logs):
+            assert len([e for e in iter_match_log(log) if e['type'] == 'kill']) == kills
+
+
+if __name__ == '__main__':
+    test_round_trip()
+    test_truncated_last_line_is_skipped()
+    test_reads_legacy_json_log()
+    test_atomic_writer_publishes_on_close()
+    test_one_log_per_match()
+    test_fixed_log_file_keeps_earlier_match()
+    print("SUCCESS: ALL TESTS PASSED!")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Test script for the event-driven async OBS client.
+Runs a minimal obs-websocket v5 server in-process and verifies
+authentication, request pipelining, pushed recording state and the
+output path reported by OBS.
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from tickzero.core.obs_async import AsyncOBSClient, auth_response
+
+websockets = pytest.importorskip("websockets")
+
+PASSWORD = "secret"
+SALT = "c2FsdA=="
+CHALLENGE = "Y2hhbGxlbmdl"
+
+
+class MiniOBS:
+    """Just enough of obs-websocket v5 to exercise the client."""
+
+    def __init__(self, response_delay=0.0):
+        self.response_delay = response_delay
+        self.report_path = True  # False: StopRecord and the STOPPED event carry no outputPath
+        self.recording = False
+        self.requests = []
+        self.port = None
+        self.loop = None
+        self._ready = threading.Event()
+
+    async def handler(self, ws):
+        await ws.send(json.dumps({"op": 0, "d": {"rpcVersion": 1, "authentication":
+                                                 {"salt": SALT, "challenge": CHALLENGE}}}))
+        identify = json.loads(await ws.recv())["d"]
+        if identify.get("authentication") != auth_response(PASSWORD, SALT, CHALLENGE):
+            await ws.close(4009, "Authentication failed")
+            return
+        await ws.send(json.dumps({"op": 2, "d": {"negotiatedRpcVersion": 1}}))
+        async for raw in ws:
+            request = json.loads(raw)["d"]
+            asyncio.ensure_future(self.respond(ws, request))
+
+    async def respond(self, ws, request):
+        self.requests.append(request["requestType"])
+        await asyncio.sleep(self.response_delay)
+        data, ok, code = {}, True, 100
+        kind = request["requestType"]
+        if kind == "GetRecordStatus":
+            data = {"outputActive": self.recording, "outputPaused": False, "outputDuration": 1500 if self.recording else 0}
+        elif kind == "StartRecord":
+            self.recording = True
+            await self.event(ws, "RecordStateChanged", {"outputActive": True, "outputState": "OBS_WEBSOCKET_OUTPUT_STARTED",
+                                                        "outputPath": "/videos/match.mkv"})
+        elif kind == "StopRecord":
+            self.recording = False
+            data = {"outputPath": "/videos/match.mkv"} if self.report_path else {}
+        await ws.send(json.dumps({"op": 7, "d": {"requestType": kind, "requestId": request["requestId"],
+                                                 "requestStatus": {"result": ok, "code": code},
+                                                 "responseData": data}}))
+        if kind == "StopRecord":
+            stopped = {"outputActive": False, "outputState": "OBS_WEBSOCKET_OUTPUT_STOPPED"}
+            if self.report_path:
+                stopped["outputPath"] = "/videos/match.mkv"
+            await self.event(ws, "RecordStateChanged", stopped)
+
+    async def event(self, ws, event_type, data):
+        await ws.send(json.dumps({"op": 5, "d": {"eventType": event_type, "eventIntent": 64, "eventData": data}}))
+
+    def start(self):
+        def run():
+            self.loop = asyncio.new_event_loop()
+
+            async def serve():
+                server = await websockets.serve(self.handler, "127.0.0.1", 0)
+                self.port = server.sockets[0].getsockname()[1]
+                self._ready.set()
+                await asyncio.Future()
+
+            try:
+                self.loop.run_until_complete(serve())
+            except RuntimeError:
+                pass
+
+        threading.Thread(target=run, daemon=True).start()
+        self._ready.wait(5)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def test_recording_state_comes_from_events():
+    """Start/stop take one round trip each and the path is pushed by OBS."""
+    obs = MiniOBS()
+    obs.start()
+    try:
+        with AsyncOBSClient(port=obs.port, password=PASSWORD) as client:
+            assert client.start_recording() is True
+            assert client.is_recording
+            assert client.start_recording() is True  # Already recording: no request sent
+            assert client.get_current_timestamp() == 1500
+            assert client.stop_recording() == "/videos/match.mkv"
+            assert client.wait_for_recording_stopped(timeout=2)
+            assert client.get_last_recording_path() == "/videos/match.mkv"
+            assert client.get_current_timestamp() == 0  # Not recording: no request sent
+        assert obs.requests == ["GetRecordStatus", "StartRecord", "GetRecordStatus", "StopRecord"]
+    finally:
+        obs.stop()
+
+
+def test_stop_without_output_path_returns_none():
+    """A StopRecord response without outputPath never returns the previous file."""
+    obs = MiniOBS()
+    obs.start()
+    try:
+        with AsyncOBSClient(port=obs.port, password=PASSWORD) as client:
+            assert client.start_recording() is True
+            assert client.stop_recording() == "/videos/match.mkv"
+            assert client.wait_for_recording_stopped(timeout=2)
+
+            obs.report_path = False
+            assert client.start_recording() is True
+            assert client.stop_recording() is None
+    finally:
+        obs.stop()
+
+
+def test_requests_are_pipelined():
+    """Many requests in flight share one connection and overlap."""
+    obs = MiniOBS(response_delay=0.1)
+    obs.start()
+    try:
+        with AsyncOBSClient(port=obs.port, password=PASSWORD) as client:
+            start = time.perf_counter()
+            futures = [client.call_nowait("GetRecordStatus") for _ in range(10)]
+            results = [f.result(timeout=5) for f in futures]
+            elapsed = time.perf_counter() - start
+        assert all(r["outputActive"] is False for r in results)
+        assert elapsed < 0.5, elapsed  # Sequential would take >= 1s
+    finally:
+        obs.stop()
+
+
+def test_wrong_password_fails_to_connect():
+    """Identify with a bad password is rejected."""
+    obs = MiniOBS()
+    obs.start()
+    try:
+        client = AsyncOBSClient(port=obs.port, password="wrong", connect_retries=0)
+        assert client.connect() is False
+        client.disconnect()
+    finally:
+        obs.stop()
+
+
+if __name__ == '__main__':
+    test_recording_state_comes_from_events()
+    test_stop_without_output_path_returns_none()
+    test_requests_are_pipelined()
+    test_wrong_password_fails_to_connect()
+    print("SUCCESS: ALL TESTS PASSED!")
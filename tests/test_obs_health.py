@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Test script for the OBS connection health monitor.
+Uses fake connect/ping callables to check reconnection with backoff, the
+RTT histogram, non-blocking hot-path calls while OBS is down and that the
+recording clock keeps its model through unreachable samples.
+"""
+import time
+
+from tickzero.core.obs_health import ConnectionMonitor, RTTHistogram
+from tickzero.core.recording_clock import RecordingClock
+from tickzero.obs_controller import OBSClient
+
+
+class FlakyLink:
+    """Connection that fails a configurable number of reconnects."""
+
+    def __init__(self, failed_connects=0):
+        self.up = True
+        self.failed_connects = failed_connects
+        self.connects = 0
+        self.drops = 0
+
+    def connect(self):
+        self.connects += 1
+        if self.connects <= self.failed_connects:
+            raise ConnectionError("refused")
+        self.up = True
+
+    def ping(self):
+        if not self.up:
+            raise ConnectionError("broken pipe")
+
+    def drop(self):
+        self.drops += 1
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_rtt_histogram_percentiles():
+    """Percentiles resolve to bucket upper bounds."""
+    histogram = RTTHistogram()
+    for rtt in [0.5] * 90 + [15.0] * 9 + [3000.0]:
+        histogram.add(rtt)
+
+    assert histogram.percentile(50) == 1.0
+    assert histogram.percentile(95) == 20.0
+    assert histogram.percentile(100) == 3000.0
+    stats = histogram.to_dict()
+    assert stats["count"] == 100
+    assert stats["buckets"]["<=1ms"] == 90
+    assert stats["buckets"][">2000ms"] == 1
+
+
+def test_reconnects_with_backoff():
+    """A dead link is detected, dropped and restored after failed attempts."""
+    link = FlakyLink(failed_connects=2)
+    monitor = ConnectionMonitor(link.connect, link.ping, on_down=link.drop, interval=0.02,
+                                backoff_initial=0.01, backoff_max=0.05)
+    monitor.start(connected=True)
+    try:
+        assert wait_for(lambda: monitor.pings >= 3)
+        assert monitor.available
+
+        link.up = False
+        monitor.report_failure()
+        assert wait_for(lambda: not monitor.available)
+        assert wait_for(lambda: monitor.available)
+    finally:
+        monitor.stop()
+
+    stats = monitor.get_stats()
+    assert link.drops == 1
+    assert stats["reconnect_attempts"] == 3
+    assert stats["reconnects"] == 1
+    assert stats["ping_failures"] >= 1
+    assert stats["downtime_s"] > 0
+    assert stats["rtt"]["count"] == stats["pings"]
+
+
+def test_unavailable_calls_do_not_block():
+    """With the monitor running, calls while OBS is down return at once."""
+    client = OBSClient(connect_retries=3, retry_delay=1)
+    client.monitor = ConnectionMonitor(connect=lambda: None, ping=lambda: None)
+
+    start = time.monotonic()
+    assert client.get_current_timestamp(unavailable=None) is None
+    assert client.get_current_timestamp() == 0
+    assert client.start_recording() is False
+    assert client.stop_recording() is None
+    assert time.monotonic() - start < 0.5
+    assert client.get_health_stats()["unavailable_calls"] == 4
+
+
+def test_clock_keeps_model_while_unreachable():
+    """None samples are counted but leave the fitted model in place."""
+    durations = iter([12000, None, None])
+    clock = RecordingClock(sample_source=lambda: next(durations))
+
+    assert clock.sample()
+    assert not clock.sample()
+    assert not clock.sample()
+    assert clock.video_time() is not None
+    assert clock.get_stats()["unavailable_samples"] == 2
+
+
+if __name__ == '__main__':
+    test_rtt_histogram_percentiles()
+    test_reconnects_with_backoff()
+    test_unavailable_calls_do_not_block()
+    test_clock_keeps_model_while_unreachable()
+    print("SUCCESS: ALL TESTS PASSED!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Test script for pause-aware recording.
+Checks the wall-clock to video position mapping of PauseTimeMap and that
+GSIServer pauses OBS during freezetime and stamps events with positions in
+the paused file.
+"""
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from conftest import MockOBSManager, make_payload
+from tickzero.core.gsi_server import GSIServer
+from tickzero.core.match_log import read_match_log_summary
+from tickzero.core.obs_manager import OBSManager
+from tickzero.core.pause_time_map import PauseTimeMap
+
+
+def test_video_time_skips_pauses():
+    """Time spent paused is subtracted; events during a pause map to its start."""
+    time_map = PauseTimeMap(start_time=1000.0)
+    time_map.pause(1010.0)
+    time_map.resume(1025.0)
+    time_map.pause(1030.0)
+
+    assert time_map.video_time_at(1005.0) == 5.0
+    assert time_map.video_time_at(1020.0) == 10.0  # Paused: frozen at the pause point
+    assert time_map.video_time_at(1027.0) == 12.0
+    assert time_map.video_time_at(1040.0) == 15.0
+    assert time_map.is_paused
+    assert time_map.paused_seconds() == 15.0
+    assert time_map.paused_seconds(1040.0) == 25.0
+
+    time_map.resume(1050.0)
+    assert time_map.video_time_at(1060.0) == 25.0
+    assert time_map.to_list() == [{"video_time": 10.0, "duration": 15.0}, {"video_time": 15.0, "duration": 20.0}]
+
+    assert PauseTimeMap().video_time_at(1000.0) is None
+
+
+def test_gsi_pauses_recording_in_freezetime():
+    """Freezetime pauses OBS, live resumes it and kills land at paused-file positions."""
+    class MockOBSClient(MockOBSManager):
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        def start_recording(self):
+            self.recording_start_time = time.time()
+
+        def pause_recording(self):
+            self.calls.append("pause")
+            return True
+
+        def resume_recording(self):
+            self.calls.append("resume")
+            return True
+
+    obs = MockOBSClient()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "log.jsonl")
+        gsi = GSIServer(obs_manager=obs, log_file=log_file, on_match_start=obs.start_recording,
+                        callback_mode="inline", pause_downtime=True)
+        gsi.process_game_state(make_payload("warmup", "freezetime"))
+        gsi.process_game_state(make_payload(round_phase="freezetime"))
+        time.sleep(0.3)
+        gsi.process_game_state(make_payload(round_phase="live"))
+        time.sleep(0.1)
+        gsi.process_game_state(make_payload(round_phase="live", kills=1))
+        gsi.process_game_state(make_payload(round_phase="freezetime", kills=1))
+        gsi.save_logs()
+        summary = read_match_log_summary(log_file)
+
+    assert obs.calls == ["pause", "resume", "pause"]
+    kill = [e for e in gsi.match_events if e['type'] == 'kill'][0]
+    assert abs(kill['video_time'] - 0.1) < 0.05, kill['video_time']
+    assert len(summary['recording_pauses']) == 2
+    assert abs(summary['recording_pauses'][0]['duration'] - 0.3) < 0.05
+
+
+def test_refused_pause_is_not_reported_as_paused():
+    """A PauseRecord/ResumeRecord request OBS refuses makes the call return False."""
+    class RefusingWebSocket:
+        def __init__(self):
+            self.requests = []
+
+        def call(self, request):
+            self.requests.append(request.name)
+            return SimpleNamespace(status=False, datain={"comment": "Recording is not active."})
+
+    obs = OBSManager()
+    obs.ws = RefusingWebSocket()
+    assert obs.pause_recording() is False
+    assert obs.resume_recording() is False
+    assert obs.ws.requests == ["PauseRecord", "ResumeRecord"]
+
+    # GSIServer keeps the time map unpaused when OBS did not pause
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=obs, log_file=str(Path(tmp) / "log.jsonl"),
+                        callback_mode="inline", pause_downtime=True)
+        gsi.process_game_state(make_payload("warmup", "freezetime"))
+        gsi.process_game_state(make_payload(round_phase="freezetime"))
+        assert obs.ws.requests[-1] == "PauseRecord"
+        assert not gsi.time_map.is_paused
+        gsi.stop()
+
+
+if __name__ == '__main__':
+    test_video_time_skips_pauses()
+    test_gsi_pauses_recording_in_freezetime()
+    test_refused_pause_is_not_reported_as_paused()
+    print("SUCCESS: ALL TESTS PASSED!")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Test script for the LLM rate limiter and concurrent round analysis.
+Checks that the request and token buckets never exceed their per-minute
+limits, that 429 errors are recognized with their retry delay, and (when
+google-genai is installed) that the AI Director analyzes rounds in parallel,
+retries rate-limited rounds and returns the highlights in round order.
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from tickzero.core.match_log import MatchLogWriter
+from tickzero.core.rate_limiter import RateLimiter, estimate_tokens, is_rate_limited, is_retryable, retry_delay
+
+
+class FakeClock:
+    """Clock that only moves when the limiter sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeAPIError(Exception):
+    """API error carrying an HTTP status code like google.genai.errors.APIError."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+def test_requests_per_minute_window():
+    """No 60 second window admits more requests than the limit."""
+    clock = FakeClock()
+    limiter = RateLimiter(10, clock=clock, sleep=clock.sleep)
+
+    times = []
+    for _ in range(40):
+        limiter.acquire()
+        times.append(clock.now)
+
+    for i, start in enumerate(times):
+        assert sum(1 for t in times[i:] if t < start + 60.0) <= 10
+    assert times[-1] < 60.0 * 40 / 9 + 1  # Sustained rate of limit - burst per minute
+    assert limiter.get_stats()["requests"] == 40
+
+
+def test_tokens_per_minute_and_settle():
+    """Large requests wait for the token budget; real usage corrects the estimate."""
+    clock = FakeClock()
+    limiter = RateLimiter(1000, tpm=60_000, clock=clock, sleep=clock.sleep)
+
+    assert limiter.acquire(6_000) == 0.0
+    waited = limiter.acquire(6_000)
+    assert waited == pytest.approx(6_000 / 54_000 * 60, rel=1e-6)
+
+    # The first request really used 12k tokens: the next one waits for them too
+    limiter.settle(6_000, 12_000)
+    assert limiter.acquire(6_000) == pytest.approx(12_000 / 54_000 * 60, rel=1e-6)
+
+
+def test_pause_holds_back_every_caller():
+    """After a 429 nobody sends until the pause is over."""
+    clock = FakeClock()
+    limiter = RateLimiter(600, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.pause(17.0)
+    limiter.acquire()
+    assert clock.now >= 17.0 and limiter.get_stats()["pauses"] == 1
+
+
+def test_error_classification():
+    """429 and 5xx are retried, with the delay from the error's RetryInfo."""
+    error = FakeAPIError(429, "RESOURCE_EXHAUSTED. {'details': [{'retryDelay': '17s'}]}")
+    assert is_rate_limited(error) and is_retryable(error) and retry_delay(error) == 17.0
+    assert is_retryable(FakeAPIError(503, "UNAVAILABLE")) and not is_rate_limited(FakeAPIError(503, "UNAVAILABLE"))
+    assert not is_retryable(FakeAPIError(400, "INVALID_ARGUMENT")) and retry_delay(ValueError("x")) is None
+    assert estimate_tokens("x" * 400, 100) == 201
+
+
+def test_director_concurrent_rounds_in_order(tmp_path):
+    """Rounds overlap, a 429 is retried instead of dropped, results keep round order."""
+    pytest.importorskip("google.genai")
+    from tickzero.core.ai_director import AIDirector
+
+    log_path = tmp_path / "match.jsonl"
+    writer = MatchLogWriter(str(log_path), fsync_policy="none")
+    for round_num in range(6, 0, -1):  # Logged out of order on purpose
+        writer.append({"type": "kill", "round": round_num, "video_time": round_num * 100.0,
+                       "weapon": "ak47", "headshot": True, "health": 100, "total_kills": 1})
+    writer.close()
+
+    class Response:
+        def __init__(self, round_num):
+            start = round_num * 100.0
+            self.text = json.dumps({"highlights": [{"start": start, "end": start + 5, "label": f"r{round_num}"}]})
+            self.usage_metadata = None
+
+    class Models:
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.active = 0
+            self.max_active = 0
+            self.calls = 0
+            self.failed = set()
+
+        def generate_content(self, model, contents, config):
+            round_num = int(contents.split("**ROUND ")[1].split(" ")[0])
+            with self.lock:
+                self.calls += 1
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                fail = round_num == 1 and round_num not in self.failed
+                self.failed.add(round_num)
+            try:
+                time.sleep(0.05 * (7 - round_num))  # Early rounds finish last
+                if fail:
+                    raise FakeAPIError(429, "RESOURCE_EXHAUSTED {'retryDelay': '0.05s'}")
+                return Response(round_num)
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+    director = AIDirector(api_key="test", max_workers=3, rpm=6000, tpm=10_000_000)
+    models = Models()
+    director.client = type("Client", (), {"models": models})()
+
+    highlights = director.analyze_match_log(str(log_path))
+    assert [h["label"] for h in highlights] == [f"r{n}" for n in range(1, 7)]
+    assert models.max_active == 3 and models.calls == 7
+    assert director.rate_limiter.get_stats()["pauses"] == 1
+
+
+def test_director_reports_failed_rounds(tmp_path):
+    """A round still rate limited after its retries is reported as failed, not as no highlights."""
+    pytest.importorskip("google.genai")
+    from tickzero.core.ai_director import AIDirector
+
+    log_path = tmp_path / "match.jsonl"
+    writer = MatchLogWriter(str(log_path), fsync_policy="none")
+    for round_num in (1, 2, 3):
+        writer.append({"type": "kill", "round": round_num, "video_time": round_num * 100.0,
+                       "weapon": "ak47", "headshot": True, "health": 100, "total_kills": 1})
+    writer.close()
+
+    class Models:
+        def generate_content(self, model, contents, config):
+            round_num = int(contents.split("**ROUND ")[1].split(" ")[0])
+            if round_num == 2:
+                raise FakeAPIError(429, "RESOURCE_EXHAUSTED {'retryDelay': '0.01s'}")
+            response = type("Response", (), {})()
+            response.text = json.dumps({"highlights": [{"start": round_num * 100.0, "end": round_num * 100.0 + 5}]})
+            response.usage_metadata = None
+            return response
+
+    director = AIDirector(api_key="test", rpm=6000, max_retries=2)
+    director.client = type("Client", (), {"models": Models()})()
+
+    highlights = director.analyze_match_log(str(log_path))
+    assert [h["start"] for h in highlights] == [100.0, 300.0]
+    assert director.failed_rounds == [2]
+    assert director.rate_limiter.get_stats()["pauses"] == 2
+
+
+if __name__ == '__main__':
+    import tempfile
+    from pathlib import Path
+
+    test_requests_per_minute_window()
+    test_tokens_per_minute_and_settle()
+    test_pause_holds_back_every_caller()
+    test_error_classification()
+    try:
+        import google.genai  # noqa: F401
+        with tempfile.TemporaryDirectory() as tmp:
+            test_director_concurrent_rounds_in_order(Path(tmp))
+        with tempfile.TemporaryDirectory() as tmp:
+            test_director_reports_failed_rounds(Path(tmp))
+    except ImportError:
+        pass
+    print("SUCCESS: ALL TESTS PASSED!")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Test script for recordings split at round boundaries.
+Checks the segment index GSIServer builds from SplitRecordFile, how
+VideoEditor resolves highlight times to segment files, and the segment
+table in MatchDatabase.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import MockOBSManager, make_payload
+from tickzero.core.gsi_server import GSIServer
+from tickzero.core.video_editor import VideoEditor
+from tickzero.web.match_database import MatchDatabase
+
+
+class MockOBSClient(MockOBSManager):
+    """Records into numbered files; every split starts the next one."""
+
+    def __init__(self):
+        super().__init__()
+        self.current_output_path = None
+
+    def start_recording(self):
+        self.recording_start_time = time.time() - 10.0
+        self.current_output_path = "/videos/match.mkv"
+
+    def split_recording(self):
+        self.current_output_path = f"/videos/match_{int(time.time() * 1000)}.mkv"
+        return self.current_output_path
+
+
+def test_gsi_splits_at_round_boundaries():
+    """Each new round's freezetime starts a segment at the current video time."""
+    obs = MockOBSClient()
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=obs, log_dir=tmp, on_match_start=obs.start_recording,
+                        on_match_end=lambda: None, callback_mode="inline", split_rounds=True)
+        gsi.process_game_state(make_payload("warmup", "freezetime", 0))
+        gsi.process_game_state(make_payload("live", "freezetime", 1))
+        gsi.process_game_state(make_payload("live", "live", 1))
+        gsi.process_game_state(make_payload("live", "over", 1))
+        gsi.process_game_state(make_payload("live", "freezetime", 2))
+        gsi.process_game_state(make_payload("live", "live", 2))
+        gsi.process_game_state(make_payload("live", "freezetime", 3))
+        gsi.process_game_state(make_payload("gameover", "over", 3))
+        gsi.stop()
+
+    segments = gsi.last_completed_segments
+    assert [s['round'] for s in segments] == [1, 2, 3]
+    assert segments[0]['path'] == "/videos/match.mkv"
+    assert segments[0]['start'] == 0.0
+    assert abs(segments[1]['start'] - 10.0) < 0.5
+    assert segments[0]['end'] == segments[1]['start']
+    assert segments[2]['end'] is None
+    assert gsi.recording_segments == []
+
+
+def test_obs_manager_splits_at_round_boundaries():
+    """The default OBSManager splits through SplitRecordFile and reports every segment file."""
+    pytest.importorskip("websockets")
+    pytest.importorskip("obswebsocket")
+    from tickzero.core.fake_obs import FakeOBSServer
+    from tickzero.core.obs_manager import OBSManager
+
+    server = FakeOBSServer(output_dir="/videos")
+    server.start()
+    obs = OBSManager(port=server.port)
+    assert obs.connect()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            gsi = GSIServer(obs_manager=obs, log_dir=tmp, on_match_start=obs.start_recording,
+                            on_match_end=obs.stop_recording, callback_mode="inline", split_rounds=True)
+            assert gsi.split_rounds
+            gsi.process_game_state(make_payload("warmup", "freezetime", 0))
+            gsi.process_game_state(make_payload("live", "freezetime", 1))
+            gsi.process_game_state(make_payload("live", "live", 1))
+            gsi.process_game_state(make_payload("live", "freezetime", 2))
+            gsi.process_game_state(make_payload("gameover", "over", 2))
+            gsi.stop()
+    finally:
+        obs.disconnect()
+        server.stop()
+
+    segments = gsi.last_completed_segments
+    assert [s['round'] for s in segments] == [1, 2]
+    assert all(s["path"] and s["path"].startswith("/videos/") for s in segments), segments
+    assert segments[0]['path'] != segments[1]['path']
+    assert segments[1]['path'] == obs.last_recording_path
+    assert server.get_stats()['request_counts']['SplitRecordFile'] == 1
+
+
+def test_split_rounds_needs_a_splitting_client():
+    """A client without split_recording turns splitting off instead of indexing nothing."""
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=MockOBSManager(), log_file=str(Path(tmp) / "log.jsonl"), split_rounds=True)
+    assert not gsi.split_rounds
+
+
+def test_editor_resolves_and_prunes_segments():
+    """Highlight times map to the segment file; unused segments can be deleted."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [str(Path(tmp) / f"round_{i}.mkv") for i in range(3)]
+        for path in paths:
+            Path(path).write_bytes(b"")
+        segments = [
+            {"path": paths[1], "start": 95.0, "end": 180.0},
+            {"path": paths[0], "start": 0.0, "end": 95.0},
+            {"path": paths[2], "start": 180.0, "end": None},
+        ]
+        editor = VideoEditor(paths[2], output_dir=str(Path(tmp) / "out"), use_gpu=False, segments=segments)
+
+        assert editor.resolve_segment(100.0, 110.0) == (paths[1], 5.0, 15.0)
+        assert editor.resolve_segment(200.0, 210.0) == (paths[2], 20.0, 30.0)
+        assert editor.resolve_segment(170.0, 190.0) == (paths[1], 75.0, 85.0)  # Clipped at the boundary
+
+        deleted = editor.delete_unused_segments([{"start": 100.0, "end": 110.0}])
+        assert deleted == [paths[0]]
+        assert not Path(paths[0]).exists() and Path(paths[2]).exists()
+
+        unsplit = VideoEditor(paths[2], output_dir=str(Path(tmp) / "out"), use_gpu=False)
+        assert unsplit.resolve_segment(100.0, 110.0) == (paths[2], 100.0, 110.0)
+
+
+def test_database_segment_index():
+    """Segments are stored per match and deleted files are hidden."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MatchDatabase(str(Path(tmp) / "matches.db"))
+        match_id = db.save_match(video_path="/videos/c.mkv", log_path=str(Path(tmp) / "missing.jsonl"))
+        db.save_segments(match_id, [
+            {"index": 0, "round": 1, "path": "/videos/a.mkv", "start": 0.0, "end": 95.0},
+            {"index": 1, "round": 2, "path": "/videos/b.mkv", "start": 95.0, "end": 180.0},
+            {"index": 2, "round": 3, "path": "/videos/c.mkv", "start": 180.0, "end": None},
+        ])
+
+        segments = db.get_segments(match_id)
+        assert [s['round'] for s in segments] == [1, 2, 3]
+        assert segments[1]['start'] == 95.0 and segments[2]['end'] is None
+
+        db.mark_segments_deleted(match_id, ["/videos/a.mkv"])
+        assert [s['path'] for s in db.get_segments(match_id)] == ["/videos/b.mkv", "/videos/c.mkv"]
+        assert len(db.get_segments(match_id, include_deleted=True)) == 3
+
+
+if __name__ == '__main__':
+    test_gsi_splits_at_round_boundaries()
+    try:
+        import obswebsocket  # noqa: F401
+        import websockets  # noqa: F401
+        test_obs_manager_splits_at_round_boundaries()
+    except ImportError:
+        pass
+    test_split_rounds_needs_a_splitting_client()
+    test_editor_resolves_and_prunes_segments()
+    test_database_segment_index()
+    print("SUCCESS: ALL TESTS PASSED!")
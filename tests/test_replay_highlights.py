@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Test script for replay buffer highlight capture.
+Checks that kills within one round are merged into a single multi-kill
+highlight triggered after the configured delay, and that saved clips are
+registered as highlight sources in MatchDatabase.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from conftest import MockOBSManager, make_payload
+from tickzero.core.gsi_server import GSIServer
+from tickzero.web.match_database import MatchDatabase
+
+
+def test_multi_kill_fires_once_after_delay():
+    """Kills in one round extend one highlight; a new round fires the previous one."""
+    highlights = []
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=MockOBSManager(), log_file=str(Path(tmp) / "log.jsonl"),
+                        callback_mode="inline", on_highlight=highlights.append, highlight_delay=3.0)
+        gsi.process_game_state(make_payload(round_number=3, kills=0), event_time=100.0)
+        gsi.process_game_state(make_payload(round_number=3, kills=1, headshots=1), event_time=101.0)
+        gsi.process_game_state(make_payload(round_number=3, kills=2, headshots=1), event_time=102.5)
+        gsi.process_game_state(make_payload(round_number=3, kills=3, headshots=2), event_time=104.0)
+        assert highlights == []  # Still within the delay of the last kill
+
+        gsi.process_game_state(make_payload(kills=3, headshots=2, round_number=4), event_time=107.5)
+        assert len(highlights) == 1
+
+        gsi.process_game_state(make_payload(kills=4, headshots=2, round_number=4), event_time=110.0)
+        gsi.process_game_state(make_payload(kills=5, headshots=2, round_number=5), event_time=111.0)
+        assert len(highlights) == 2  # Round change fires the pending kill early
+        gsi.stop()
+
+    assert [h['kills'] for h in highlights] == [3, 1, 1]
+    assert highlights[0]['label'] == "triple kill"
+    assert highlights[0]['headshots'] == 2
+    assert highlights[0]['first_kill_time'] == 101.0
+    assert highlights[0]['last_kill_time'] == 104.0
+    assert highlights[1]['round'] == 4
+    assert gsi.highlights_triggered == 3
+
+
+def test_timer_triggers_without_further_payloads():
+    """In executor mode the delay runs on a timer, off the ingest thread."""
+    highlights = []
+    with tempfile.TemporaryDirectory() as tmp:
+        gsi = GSIServer(obs_manager=MockOBSManager(), log_file=str(Path(tmp) / "log.jsonl"),
+                        on_highlight=highlights.append, highlight_delay=0.1, highlight_min_kills=2)
+        gsi.process_game_state(make_payload(round_number=3, kills=0))
+        gsi.process_game_state(make_payload(round_number=3, kills=1))
+        time.sleep(0.3)
+        gsi.process_game_state(make_payload(kills=1, round_number=4))
+        gsi.process_game_state(make_payload(kills=2, round_number=4))
+        gsi.process_game_state(make_payload(kills=3, round_number=4))
+        time.sleep(0.3)
+        assert gsi.dispatcher.wait_idle(timeout=5)
+        gsi.stop()
+
+    # The single kill is below highlight_min_kills
+    assert [h['label'] for h in highlights] == ["double kill"]
+
+
+def test_clips_registered_as_highlight_sources():
+    """Saved clips are stored unattached and linked when the match is saved."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MatchDatabase(str(Path(tmp) / "matches.db"))
+        highlight = {"round": 7, "kills": 2, "headshots": 1, "label": "double kill",
+                     "first_kill_time": 100.0, "last_kill_time": 101.5, "match_id": "20260101_120000"}
+        db.save_highlight_source("/videos/Replay 1.mkv", highlight, saved_time=104.5)
+        db.save_highlight_source("/videos/Replay 2.mkv", dict(highlight, match_id="other"), saved_time=200.0)
+
+        match_id = db.save_match(video_path='', log_path=str(Path(tmp) / "missing.jsonl"))
+        assert db.attach_highlight_sources(match_id, "20260101_120000") == 1
+
+        sources = db.get_highlight_sources(match_id)
+        assert len(sources) == 1
+        assert sources[0]['clip_path'] == "/videos/Replay 1.mkv"
+        assert sources[0]['kills'] == 2
+        assert sources[0]['saved_time'] - sources[0]['first_kill_time'] == 4.5
+
+        db.delete_match(match_id)
+        assert db.get_highlight_sources(match_id) == []
+
+
+if __name__ == '__main__':
+    test_multi_kill_fires_once_after_delay()
+    test_timer_triggers_without_further_payloads()
+    test_clips_registered_as_highlight_sources()
+    print("SUCCESS: ALL TESTS PASSED!")
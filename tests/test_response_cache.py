@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Test script for the AI response cache.
+Checks content-addressed keys, hit/miss statistics, age- and size-based LRU
+eviction, the bypass flag, and (when google-genai is installed) that the AI
+Director answers a re-processed match from the cache without calling Gemini.
+"""
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from tickzero.core.match_log import MatchLogWriter
+from tickzero.core.response_cache import ResponseCache, make_key
+
+
+def test_keys_are_content_addressed():
+    """Equal inputs share a key regardless of dict order; model and prompt version change it."""
+    key = make_key("gemini-2.5-flash", 1, {"round": 3, "events": [["kill", 12.5, "ak47"]]})
+    assert key == make_key("gemini-2.5-flash", 1, {"events": [["kill", 12.5, "ak47"]], "round": 3})
+    assert key != make_key("gemini-2.5-pro", 1, {"round": 3, "events": [["kill", 12.5, "ak47"]]})
+    assert key != make_key("gemini-2.5-flash", 2, {"round": 3, "events": [["kill", 12.5, "ak47"]]})
+
+
+def test_hits_misses_and_bypass():
+    """Stored responses are hits; with bypass every lookup misses but writes still land."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        cache = ResponseCache(path)
+        assert cache.get("a") is None
+        cache.put("a", '{"highlights": []}', model="m")
+        assert cache.get("a") == '{"highlights": []}'
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["writes"] == 1 and stats["entries"] == 1
+
+        bypass = ResponseCache(path, bypass=True)
+        assert bypass.get("a") is None
+        bypass.put("a", '{"highlights": [1]}')
+        assert bypass.get_stats()["bypassed"] == 1
+        assert ResponseCache(path).get("a") == '{"highlights": [1]}'
+
+
+def test_lru_and_age_eviction():
+    """Over the size limit the least recently used entries go first; old entries expire."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "cache.db"), max_bytes=250)
+        for key in ("a", "b", "c"):
+            cache.put(key, "x" * 100)
+            time.sleep(0.01)
+        assert cache.get("a") is None  # Evicted when c pushed the total over 250 bytes
+        assert cache.get("b") is not None  # b is now the most recently used
+
+        cache.put("d", "x" * 100)
+        assert cache.get("c") is None and cache.get("b") is not None and cache.get("d") is not None
+        assert cache.get_stats()["evictions"] == 2
+
+        expiring = ResponseCache(os.path.join(tmp, "cache.db"), max_age_days=1e-6)  # ~0.09 seconds
+        time.sleep(0.2)
+        assert expiring.get("b") is None and expiring.get_stats()["entries"] == 1
+
+
+def test_director_reprocessing_hits_cache():
+    """A second analysis of the same log makes no API calls; unrelated fields don't change the key."""
+    pytest.importorskip("google.genai")
+    from tickzero.core.ai_director import AIDirector
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "match.jsonl")
+
+        class Models:
+            calls = 0
+
+            def generate_content(self, model, contents, config):
+                Models.calls += 1
+                start = float(contents.split("[")[-1].split("s]")[0])
+                response = type("Response", (), {})()
+                response.text = json.dumps({"highlights": [{"start": start, "end": start + 5, "priority": 7}]})
+                response.usage_metadata = None
+                return response
+
+        cache_path = os.path.join(tmp, "cache.db")
+        results = []
+        for attempt in range(2):
+            # Re-logged with other wall-clock times: same rounds for the prompt
+            writer = MatchLogWriter(log_path, fsync_policy="none")
+            for round_num in (1, 2):
+                writer.append({"type": "kill", "round": round_num, "video_time": round_num * 100.0,
+                               "weapon": "ak47", "headshot": True, "health": 100, "total_kills": 1,
+                               "timestamp": time.time() + attempt})
+            writer.close()
+
+            director = AIDirector(api_key="test", rpm=6000, cache=ResponseCache(cache_path))
+            director.client = type("Client", (), {"models": Models()})()
+            results.append(director.analyze_match_log(log_path))
+
+        assert Models.calls == 2 and results[0] == results[1]
+        assert director.cache.get_stats()["hits"] == 2
+
+
+if __name__ == '__main__':
+    test_keys_are_content_addressed()
+    test_hits_misses_and_bypass()
+    test_lru_and_age_eviction()
+    try:
+        import google.genai  # noqa: F401
+        test_director_reprocessing_hits_cache()
+    except ImportError:
+        pass
+    print("SUCCESS: ALL TESTS PASSED!")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Test script for the round index and the per-round summaries exported with the match log.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from conftest import MockOBSManager
+from tickzero.core.gsi_server import GSIServer
+from tickzero.core.match_log import read_match_log_summary
+from tickzero.core.round_index import RoundIndex
+
+EVENTS = [
+    {"type": "round_phase_change", "round": 1, "video_time": 10.0, "phase": "live"},
+    {"type": "kill", "round": 1, "video_time": 20.0, "headshot": True, "health": 80},
+    {"type": "kill", "round": 1, "video_time": 23.5, "headshot": False, "health": 12},
+    {"type": "round_phase_change", "round": 1, "video_time": 60.0, "phase": "over"},
+    {"type": "round_phase_change", "round": 2, "video_time": 75.0, "phase": "live"},
+    {"type": "death", "round": 2, "video_time": 90.0},
+]
+
+
+def test_summaries():
+    """Per-round statistics are accumulated as events are added."""
+    index = RoundIndex()
+    for i, event in enumerate(EVENTS):
+        index.add(i, event)
+
+    first, second = index.summaries()
+    assert first['kills'] == 2 and first['headshots'] == 1
+    assert first['lowest_hp'] == 12
+    assert (first['first_kill_time'], first['last_kill_time']) == (20.0, 23.5)
+    assert (first['first_event'], first['last_event']) == (0, 3)
+    assert second['kills'] == 0 and second['deaths'] == 1 and second['lowest_hp'] is None
+    assert [e['video_time'] for e in index.events(EVENTS, 2)] == [75.0, 90.0]
+    assert index.events(EVENTS, 7) == []
+
+
+def test_summary_exported_with_log():
+    """save_logs appends the summaries, readable without reading the events."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "match_log.jsonl")
+        gsi = GSIServer(obs_manager=MockOBSManager(time.time()), log_file=log_file)
+        for event in EVENTS:
+            gsi._append_event(dict(event))
+        gsi.save_logs()
+
+        summary = read_match_log_summary(log_file)
+        assert summary['total_events'] == len(EVENTS)
+        assert summary['duration'] == 90.0
+        assert [r['round'] for r in summary['rounds']] == [1, 2]
+        assert len(gsi.get_events_by_round(1)) == 4
+
+
+if __name__ == '__main__':
+    test_summaries()
+    test_summary_exported_with_log()
+    print("SUCCESS: ALL TESTS PASSED!")
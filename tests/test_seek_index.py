@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Test script for the post-recording seek index.
+Checks keyframe lookups, the index file next to the video and its staleness
+check, faststart detection, and (when ffmpeg is installed) the remux of an
+MKV recording into an indexed faststart MP4.
+"""
+import shutil
+import struct
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tickzero.core.seek_index import SeekIndex, is_faststart, prepare_recording
+from tickzero.core.video_editor import VideoEditor
+
+
+def box(box_type, payload=b""):
+    """One MP4 box."""
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def test_keyframe_lookup_and_persistence():
+    """Lookups bisect the keyframe list; the index is dropped once the video changes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        video = Path(tmp) / "match.mp4"
+        video.write_bytes(b"\0" * 1000)
+        stat = video.stat()
+        keyframes = [(0.0, 48, 0), (2.0, 400, 60), (4.0, 800, 120)]
+        index = SeekIndex(str(video), stat.st_size, stat.st_mtime, 5.0, keyframes, packets=150)
+
+        assert index.keyframe_before(3.9) == 2.0
+        assert index.keyframe_before(4.0) == 4.0
+        assert index.keyframe_before(-1.0) == 0.0
+        assert index.keyframe_after(2.1) == 4.0
+        assert index.keyframe_after(4.5) is None
+
+        assert Path(index.save()).name == "match.mp4.seekidx.json"
+        loaded = SeekIndex.load(str(video))
+        assert loaded.keyframes == keyframes and loaded.packets == 150
+
+        with open(video, 'ab') as f:
+            f.write(b"\0")
+        assert SeekIndex.load(str(video)) is None
+
+
+def test_faststart_detection():
+    """moov before mdat is faststart; 64-bit box sizes are followed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "a.mp4"
+        path.write_bytes(box(b'ftyp', b'isom') + box(b'moov') + box(b'mdat', b'\0' * 16))
+        assert is_faststart(path)
+
+        path.write_bytes(box(b'ftyp', b'isom') + box(b'mdat', b'\0' * 16) + box(b'moov'))
+        assert not is_faststart(path)
+
+        large_free = struct.pack('>I4sQ', 1, b'free', 24) + b'\0' * 8
+        path.write_bytes(box(b'ftyp') + large_free + box(b'moov'))
+        assert is_faststart(path)
+
+
+def test_editor_clamps_to_indexed_duration():
+    """Clips past the end of an indexed video are skipped without running FFmpeg."""
+    with tempfile.TemporaryDirectory() as tmp:
+        video = Path(tmp) / "match.mp4"
+        video.write_bytes(b"\0" * 100)
+        stat = video.stat()
+        SeekIndex(str(video), stat.st_size, stat.st_mtime, 60.0, [(0.0, 0, 0)]).save()
+
+        editor = VideoEditor(str(video), output_dir=str(Path(tmp) / "out"), use_gpu=False)
+        assert editor.get_seek_index().duration == 60.0
+        assert editor.create_highlight(70.0, 80.0, "late") is None
+
+
+@pytest.mark.skipif(not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="ffmpeg not installed")
+def test_prepare_mkv_recording():
+    """An MKV becomes a faststart MP4 with a keyframe index next to it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "match.mkv"
+        subprocess.run(['ffmpeg', '-y', '-f', 'lavfi', '-i', 'testsrc2=s=160x120:r=10:d=10',
+                        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '30', str(source)],
+                       capture_output=True, check=True)
+
+        path, index = prepare_recording(str(source), keep_source=False)
+        assert path == str(Path(tmp) / "match.mp4")
+        assert is_faststart(path) and not source.exists()
+        assert [round(k[0], 1) for k in index.keyframes] == [0.0, 3.0, 6.0, 9.0]
+        assert index.packets == 100 and abs(index.duration - 10.0) < 0.2
+
+        # Already prepared: no second remux, the stored index is reused
+        assert prepare_recording(path)[1].keyframes == index.keyframes
+
+
+if __name__ == '__main__':
+    test_keyframe_lookup_and_persistence()
+    test_faststart_detection()
+    test_editor_clamps_to_indexed_duration()
+    if shutil.which('ffmpeg') and shutil.which('ffprobe'):
+        test_prepare_mkv_recording()
+    print("SUCCESS: ALL TESTS PASSED!")
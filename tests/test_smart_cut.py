@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Test script for smart-cut rendering.
+Checks how a clip is split into re-encoded edge fragments and stream-copied
+GOPs, the fragment encoder settings derived from the source stream, and (when
+ffmpeg is installed) that the clip decodes cleanly, its copied frames are
+identical to the source and sources whose settings cannot be reproduced are
+not smart-cut.
+"""
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tickzero.core.seek_index import SeekIndex, load_or_build_index
+from tickzero.core.smart_cut import (
+    PIECE_COPY, PIECE_ENCODE, fragment_encoder_args, plan_pieces, smart_cut, source_encoder_options
+)
+from tickzero.core.video_editor import RENDER_SMART_CUT, VideoEditor
+
+# 30 fps, keyframes every 2 seconds (60 packets) in a 10 second video
+STREAM = {"codec_name": "h264", "profile": "Main", "level": 40, "refs": 1, "avg_frame_rate": "30/1",
+          "pix_fmt": "yuv420p", "color_space": "bt709", "color_range": "tv", "color_transfer": "unknown"}
+INDEX = SeekIndex("match.mp4", 0, 0, 10.0, [(float(t), None, t * 30) for t in range(0, 10, 2)],
+                  packets=300, stream=STREAM)
+
+has_ffmpeg = bool(shutil.which('ffmpeg') and shutil.which('ffprobe'))
+
+
+def video_md5s(path, *args):
+    """Per-frame MD5s of a video's first video stream."""
+    result = subprocess.run(['ffmpeg', '-v', 'error', *args, '-i', str(path), '-map', '0:v:0', '-f', 'framemd5', '-'],
+                            capture_output=True, text=True, check=True)
+    return [line.rsplit(',', 1)[1].strip() for line in result.stdout.splitlines() if not line.startswith('#')]
+
+
+def decode_errors(path):
+    """Errors FFmpeg reports decoding a whole file."""
+    result = subprocess.run(['ffmpeg', '-v', 'error', '-i', str(path), '-f', 'null', '-'],
+                            capture_output=True, text=True)
+    return result.stderr.strip() or (f"exit code {result.returncode}" if result.returncode else "")
+
+
+def encode_source(path, *args):
+    """12 second 30 fps x264 test video with audio and keyframes every 2 seconds."""
+    subprocess.run(['ffmpeg', '-y', '-f', 'lavfi', '-i', 'testsrc2=s=320x180:r=30:d=12',
+                    '-f', 'lavfi', '-i', 'sine=d=12', '-c:v', 'libx264', '-preset', 'ultrafast',
+                    '-g', '60', '-bf', '2', '-pix_fmt', 'yuv420p', '-c:a', 'aac', *args, str(path)],
+                   capture_output=True, check=True)
+
+
+def test_pieces_split_at_keyframes():
+    """Partial GOPs at both ends are encoded, everything in between is copied."""
+    assert plan_pieces(INDEX, 1.5, 7.0) == [
+        (PIECE_ENCODE, 1.5, 2.0, None),
+        (PIECE_COPY, 2.0, 6.0, 120),
+        (PIECE_ENCODE, 6.0, 7.0, None),
+    ]
+    # On keyframes at both ends nothing is re-encoded
+    assert plan_pieces(INDEX, 2.0, 6.0) == [(PIECE_COPY, 2.0, 6.0, 120)]
+    # The last GOP runs to the end of the file, so it is copied whole
+    assert plan_pieces(INDEX, 7.0, 10.0) == [(PIECE_ENCODE, 7.0, 8.0, None), (PIECE_COPY, 8.0, 10.0, 60)]
+    # No whole GOP inside the clip
+    assert plan_pieces(INDEX, 2.5, 3.5) is None
+    assert plan_pieces(INDEX, 2.5, 4.5) is None
+
+
+def test_fragment_encoder_matches_source():
+    """Fragments use the source codec, profile, level, refs, pixel format and known colour parameters."""
+    args = fragment_encoder_args(STREAM)
+    assert args[:2] == ['-c:v', 'libx264']
+    assert args[args.index('-profile:v') + 1] == 'main'
+    assert args[args.index('-pix_fmt') + 1] == 'yuv420p'
+    assert args[args.index('-colorspace') + 1] == 'bt709'
+    assert '-color_trc' not in args
+    assert args[args.index('-crf') + 1] == '16'
+    assert args[args.index('-x264-params') + 1] == 'level=4.0:ref=1:repeat-headers=1'
+
+    hevc = fragment_encoder_args({"codec_name": "hevc", "profile": "Main 10", "level": 120})
+    assert hevc[:2] == ['-c:v', 'libx265']
+    assert hevc[hevc.index('-profile:v') + 1] == 'main10'
+    assert hevc[hevc.index('-x265-params') + 1] == 'level-idc=4.0:repeat-headers=1'
+    assert fragment_encoder_args({"codec_name": "av1"}) is None
+
+
+def test_fragment_encoder_reuses_x264_settings():
+    """The header-shaping x264 settings and rate control of the source replace the defaults."""
+    options = {"cabac": "1", "ref": "3", "analyse": "0x3:0x113", "bframes": "3", "b_pyramid": "2",
+               "keyint": "250", "chroma_qp_offset": "-2", "rc": "crf", "crf": "23.0"}
+    args = fragment_encoder_args(STREAM, options)
+    params = dict(param.split('=') for param in args[args.index('-x264-params') + 1].split(':'))
+    assert params == {"level": "4.0", "ref": "3", "psy": "0", "cabac": "1", "bframes": "3", "b-pyramid": "2",
+                      "keyint": "250", "chroma-qp-offset": "-2", "crf": "23.0", "repeat-headers": "1"}
+    assert '-crf' not in args
+
+    cbr = fragment_encoder_args(STREAM, {"rc": "cbr", "bitrate": "6000", "vbv_maxrate": "6000",
+                                         "vbv_bufsize": "6000", "nal_hrd": "cbr"})
+    assert cbr[cbr.index('-x264-params') + 1].endswith(
+        "nal-hrd=cbr:vbv-maxrate=6000:vbv-bufsize=6000:bitrate=6000:repeat-headers=1")
+
+
+@pytest.mark.skipif(not has_ffmpeg, reason="ffmpeg not installed")
+def test_smart_cut_copies_whole_gops():
+    """The clip decodes cleanly, has the requested frames and its copied GOPs decode exactly like the source."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "match.mp4"
+        encode_source(source)
+        index = load_or_build_index(str(source))
+        assert source_encoder_options(str(source), index.stream)["keyint"] == "60"
+
+        output = Path(tmp) / "clip.mp4"
+        stats = smart_cut(str(source), 1.5, 7.0, str(output), index)
+        assert stats == {"copied_s": 4.0, "encoded_s": 1.5, "pieces": 3}
+        assert decode_errors(output) == ""
+
+        clip = video_md5s(output)
+        assert len(clip) == 165
+        assert clip[15:135] == video_md5s(source, '-ss', '1.999')[:120]
+
+
+@pytest.mark.skipif(not has_ffmpeg, reason="ffmpeg not installed")
+def test_smart_cut_needs_matching_parameter_sets():
+    """Without the x264 settings in the stream the fragments' parameter sets differ, so the clip is not smart-cut."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "match.mp4"
+        encode_source(source, '-bsf:v', 'filter_units=remove_types=6')  # Drop the SEI (as from a hardware encoder)
+        index = load_or_build_index(str(source))
+        assert source_encoder_options(str(source), index.stream) is None
+
+        assert smart_cut(str(source), 1.5, 7.0, str(Path(tmp) / "clip.mp4"), index) is None
+        # Cut on keyframes nothing is re-encoded, so the copied GOPs alone are fine
+        output = Path(tmp) / "gops.mp4"
+        assert smart_cut(str(source), 2.0, 6.0, str(output), index) == {"copied_s": 4.0, "encoded_s": 0, "pieces": 1}
+        assert decode_errors(output) == ""
+
+
+@pytest.mark.skipif(not has_ffmpeg, reason="ffmpeg not installed")
+def test_editor_smart_cut_mode():
+    """The editor smart-cuts when it can and re-encodes 16:9 when the clip has no whole GOP."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "match.mp4"
+        subprocess.run(['ffmpeg', '-y', '-f', 'lavfi', '-i', 'testsrc2=s=320x180:r=10:d=12',
+                        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '30', str(source)],
+                       capture_output=True, check=True)
+
+        editor = VideoEditor(str(source), output_dir=str(Path(tmp) / "out"), use_gpu=False,
+                             render_mode=RENDER_SMART_CUT)
+        clips = editor.create_highlights_batch([
+            {"start": 2.0, "end": 8.5, "label": "long"},
+            {"start": 3.5, "end": 4.5, "label": "short"},
+        ])
+
+        assert len(clips) == 2
+        stats = editor.get_cut_stats()
+        assert abs(stats["copied_s"] - 3.0) < 0.01 and abs(stats["encoded_s"] - 3.5) < 0.01
+        for clip in clips:
+            probe = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries',
+                                    'stream=width,height', '-of', 'csv=p=0', clip],
+                                   capture_output=True, text=True, check=True)
+            assert probe.stdout.strip() == "320,180"
+
+        with pytest.raises(ValueError):
+            VideoEditor(str(source), output_dir=str(Path(tmp) / "out"), use_gpu=False, render_mode="square")
+
+
+if __name__ == '__main__':
+    test_pieces_split_at_keyframes()
+    test_fragment_encoder_matches_source()
+    test_fragment_encoder_reuses_x264_settings()
+    if has_ffmpeg:
+        test_smart_cut_copies_whole_gops()
+        test_smart_cut_needs_matching_parameter_sets()
+        test_editor_smart_cut_mode()
+    print("SUCCESS: ALL TESTS PASSED!")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Test script for recording markers.
+Checks the chapters, FFMETADATA and SRT built from match events, the
+highlights recovered from chapters, and (when ffmpeg is installed) the
+stream-copy remux that embeds them.
+"""
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tickzero.core.video_markers import (
+    build_chapters, embed_markers, format_ffmetadata, format_srt, highlights_from_chapters, read_chapters
+)
+
+EVENTS = [
+    {"type": "round_phase_change", "round": 1, "phase": "freezetime", "video_time": 10.0},
+    {"type": "kill", "round": 1, "weapon": "weapon_ak47", "headshot": True, "video_time": 30.0},
+    {"type": "kill", "round": 1, "weapon": "weapon_ak47", "headshot": False, "video_time": 33.0},
+    {"type": "round_phase_change", "round": 2, "phase": "freezetime", "video_time": 100.0},
+    {"type": "kill", "round": 2, "weapon": "weapon_deagle", "headshot": True, "video_time": 101.0},
+    {"type": "death", "round": 2, "video_time": 120.0},
+]
+
+
+def test_chapters_from_events():
+    """Rounds and kills become consecutive chapters; kills start KILL_LEAD early."""
+    chapters = build_chapters(EVENTS, duration=150.0)
+    assert [c['title'] for c in chapters] == [
+        "Start", "Round 1", "Round 1 - Kill 1 - AK47 - HS", "Round 1 - Kill 2 - AK47",
+        "Round 2 - Kill 1 - DEAGLE - HS"
+    ]
+    assert chapters[2]['start'] == 28.0 and chapters[2]['end'] == 31.0
+    assert chapters[4]['start'] == 100.0  # Not before its round (zero-length round chapter dropped)
+    assert chapters[-1]['end'] == 150.0
+
+    # A segment of a split recording only gets its own range, relative to the file
+    segment = build_chapters(EVENTS, duration=60.0, offset=95.0)
+    assert [c['title'] for c in segment] == ["Start", "Round 2 - Kill 1 - DEAGLE - HS"]
+    assert segment[1]['start'] == 5.0
+
+    metadata = format_ffmetadata(chapters)
+    assert metadata.startswith(";FFMETADATA1\n")
+    assert "START=28000\nEND=31000\ntitle=Round 1 - Kill 1 - AK47 - HS" in metadata
+    assert format_ffmetadata([{"start": 0, "end": 1, "title": "a=b;c"}]).endswith("title=a\\=b\\;c\n")
+
+    srt = format_srt(EVENTS, duration=150.0)
+    assert srt.startswith("1\n00:00:10,000 --> 00:00:12,000\nRound 1 - freezetime\n")
+    assert "00:02:00,000 --> 00:02:02,000\nRound 2 - Death" in srt
+
+
+def test_highlights_from_chapters():
+    """Kill chapters of a round collapse into one highlight."""
+    highlights = highlights_from_chapters(build_chapters(EVENTS, duration=150.0), after=3.0)
+    assert [h['label'] for h in highlights] == ["round1_double_kill", "round2_kill"]
+    assert highlights[0]['start'] == 28.0 and highlights[0]['end'] == 36.0
+    assert highlights_from_chapters(build_chapters(EVENTS, duration=150.0), min_kills=2)[0]['round'] == 1
+
+
+@pytest.mark.skipif(not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="ffmpeg not installed")
+def test_embed_markers_with_ffmpeg():
+    """The remux keeps the file name and adds chapters and the event track."""
+    with tempfile.TemporaryDirectory() as tmp:
+        video = str(Path(tmp) / "match.mkv")
+        subprocess.run(['ffmpeg', '-y', '-f', 'lavfi', '-i', 'testsrc2=s=160x120:r=10:d=150',
+                        '-c:v', 'libx264', '-preset', 'ultrafast', video], capture_output=True, check=True)
+
+        assert embed_markers(video, EVENTS, tags={"tickzero_match_id": "m1"})
+        chapters = read_chapters(video)
+        assert [c['kind'] for c in chapters] == ['start', 'round', 'kill', 'kill', 'kill']
+        assert abs(chapters[2]['start'] - 28.0) < 0.01
+        assert embed_markers(video, EVENTS)  # Running again replaces the markers
+        assert len(read_chapters(video)) == 5
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["match.mkv"]
+
+
+if __name__ == '__main__':
+    test_chapters_from_events()
+    test_highlights_from_chapters()
+    if shutil.which('ffmpeg') and shutil.which('ffprobe'):
+        test_embed_markers_with_ffmpeg()
+    print("SUCCESS: ALL TESTS PASSED!")